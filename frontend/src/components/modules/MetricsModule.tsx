@@ -27,7 +27,10 @@ const MetricsModule = () => {
     setError('')
 
     try {
-      const stats = await apiService.getStatistics()
+      const [stats, summary] = await Promise.all([
+        apiService.getStatistics(),
+        apiService.getAnalyticsSummary()
+      ])
       setMetrics({
         total_pqrs: stats.data_statistics?.pqrs_total || 51588,
         active_pqrs: stats.data_statistics?.pqrs_active || 12543,
@@ -39,7 +42,7 @@ const MetricsModule = () => {
           'en proceso': 3456,
           'pendiente': 3544
         },
-        pqrs_by_month: {
+        pqrs_by_month: Object.keys(summary.by_month).length ? summary.by_month : {
           'Ene': 4200, 'Feb': 3800, 'Mar': 4100, 'Abr': 3900,
           'May': 4300, 'Jun': 3800, 'Jul': 4200, 'Ago': 4100,
           'Sep': 4000, 'Oct': 3900, 'Nov': 3800, 'Dic': 4200
@@ -37,6 +37,7 @@ export interface PQRSRecord {
   numero_radicado_respuesta?: string
   estado: string
   dias_transcurridos?: number
+  dias_restantes?: number
   fecha_radicacion?: string
   fecha_entrada_sif?: string
   fecha_radicado_respuesta?: string
@@ -59,7 +60,7 @@ export interface PQRSRecord {
 
 export interface QueryRequest {
   query: string
-  query_type?: 'semantic' | 'radicado' | 'advanced'
+  query_type?: 'semantic' | 'radicado' | 'advanced' | 'filter'
   filters?: Record<string, any>
   limit?: number
 }
@@ -91,6 +92,20 @@ export interface AssignmentResponse {
   unassigned: string[]
 }
 
+export type AssignmentStreamEvent =
+  | { type: 'assignment'; index: number; total: number; assignment: AssignmentResponse['assignments'][number] }
+  | { type: 'unassigned'; index: number; total: number; pqrs_id: string; reason: string }
+  | { type: 'summary'; total_requested: number; total_assigned: number; unassigned: string[]; elapsed_seconds: number }
+  | { type: 'error'; error: string }
+
+export interface AnalyticsSummary {
+  total: number
+  by_status: Record<string, number>
+  by_type: Record<string, number>
+  by_commune: Record<string, number>
+  by_month: Record<string, number>
+}
+
 export interface HealthResponse {
   status: string
   version: string
@@ -134,6 +149,41 @@ class APIService {
     return response.data.result
   }
 
+  // Streams each assignment decision as NDJSON so results render before the batch finishes
+  async streamAssignments(
+    request: AssignmentRequest,
+    onEvent: (event: AssignmentStreamEvent) => void
+  ): Promise<void> {
+    const response = await fetch(`${API_BASE_URL}/api/assignment/assign-pqrs/stream`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(request),
+    })
+
+    if (!response.ok || !response.body) {
+      throw new Error(`Assignment stream failed: ${response.status}`)
+    }
+
+    const reader = response.body.getReader()
+    const decoder = new TextDecoder()
+    let buffer = ''
+
+    while (true) {
+      const { done, value } = await reader.read()
+      if (done) break
+
+      buffer += decoder.decode(value, { stream: true })
+      const lines = buffer.split('\n')
+      buffer = lines.pop() ?? ''
+
+      for (const line of lines) {
+        if (line.trim()) onEvent(JSON.parse(line))
+      }
+    }
+
+    if (buffer.trim()) onEvent(JSON.parse(buffer))
+  }
+
   // Data management
   async reloadData(): Promise<any> {
     const response = await api.post('/api/agent/process', {
@@ -155,6 +205,22 @@ class APIService {
     return response.data.result
   }
 
+  // Aggregated counts for the metrics dashboard
+  async getAnalyticsSummary(filters: Record<string, string | number> = {}): Promise<AnalyticsSummary> {
+    const response = await api.get('/api/analytics/summary', { params: filters })
+    return response.data
+  }
+
+  async getAnalytics(
+    groupBy: string[],
+    filters: Record<string, string | number> = {}
+  ): Promise<{ groups: Array<Record<string, any> & { count: number }>; total: number }> {
+    const response = await api.get('/api/analytics/pqrs', {
+      params: { group_by: groupBy.join(','), ...filters }
+    })
+    return response.data
+  }
+
   // Direct API calls for specific endpoints (fallback)
   async directQuery(request: QueryRequest): Promise<QueryResponse> {
     const response = await api.post('/api/query/pqrs', request)
@@ -1,10 +1,11 @@
 """Assignment Agent - handles AI-powered assignment of PQRS to resources."""
 
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, Iterator
 from datetime import datetime
 
 from ..services.assignment_service import assignment_service
+from ..services.job_service import job_service, JobCancelled, JobContext
 
 logger = logging.getLogger(__name__)
 
@@ -15,13 +16,14 @@ class AssignmentAgent:
     def __init__(self):
         self.assignment_service = assignment_service
 
-    def assign_resources(self, pqrs_ids: List[str], zone_filter: Optional[str] = None) -> Dict[str, Any]:
+    def assign_resources(self, pqrs_ids: List[str], zone_filter: Optional[str] = None,
+                         progress_callback: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
         """Assign resources to PQRS requests."""
         try:
             logger.info(f"Assignment Agent: Processing {len(pqrs_ids)} PQRS assignments")
 
             # Use the assignment service
-            result = self.assignment_service.assign_pqrs_resources(pqrs_ids)
+            result = self.assignment_service.assign_pqrs_resources(pqrs_ids, progress_callback)
 
             # Add agent metadata
             result["agent"] = "assignment_agent"
@@ -30,6 +32,9 @@ class AssignmentAgent:
             logger.info(f"Assignment Agent: Completed {result['total_assigned']} assignments")
             return result
 
+        except JobCancelled:
+            raise
+
         except Exception as e:
             logger.error(f"Assignment Agent error: {e}")
             return {
@@ -40,6 +45,43 @@ class AssignmentAgent:
                 "unassigned": pqrs_ids
             }
 
+    def stream_assignments(self, pqrs_ids: List[str], zone_filter: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Yield assignment events as they are decided, ending with a summary."""
+        logger.info(f"Assignment Agent: Streaming {len(pqrs_ids)} PQRS assignments")
+
+        try:
+            for event in self.assignment_service.iter_assignments(pqrs_ids):
+                if event["type"] == "summary":
+                    event["agent"] = "assignment_agent"
+                    event["processed_at"] = datetime.now().isoformat()
+                    logger.info(f"Assignment Agent: Streamed {event['total_assigned']} assignments")
+                yield event
+
+        except Exception as e:
+            logger.error(f"Assignment stream error: {e}")
+            yield {
+                "type": "error",
+                "error": str(e),
+                "agent": "assignment_agent"
+            }
+
+    def submit_assignment_job(self, pqrs_ids: List[str], zone_filter: Optional[str] = None,
+                              priority: int = 5) -> Dict[str, Any]:
+        """Queue a batch assignment to run in the background job service."""
+        return job_service.submit(
+            "assignment_batch",
+            {"pqrs_ids": pqrs_ids, "zone_filter": zone_filter},
+            priority
+        )
+
+    def run_assignment_job(self, parameters: Dict[str, Any], context: JobContext) -> Dict[str, Any]:
+        """Job handler for queued batch assignments."""
+        return self.assign_resources(
+            parameters.get("pqrs_ids", []),
+            parameters.get("zone_filter"),
+            progress_callback=context.report_progress
+        )
+
     def generate_schedule(self, zone: Optional[str] = None, days: int = 7) -> Dict[str, Any]:
         """Generate assignment schedule."""
         try:
@@ -58,6 +100,38 @@ class AssignmentAgent:
                 "agent": "assignment_agent"
             }
 
+    def add_to_schedule(self, pqrs_id: str, days: int = 7) -> Dict[str, Any]:
+        """Insert a new PQRS into the current schedule."""
+        try:
+            return {
+                "agent": "assignment_agent",
+                "result": self.assignment_service.add_pqrs_to_schedule(pqrs_id, days),
+                "updated_at": datetime.now().isoformat()
+            }
+
+        except Exception as e:
+            logger.error(f"Schedule update error: {e}")
+            return {
+                "error": str(e),
+                "agent": "assignment_agent"
+            }
+
+    def get_urgent_pqrs(self, zone: Optional[str] = None, limit: int = 10,
+                        include_assigned: bool = False) -> Dict[str, Any]:
+        """Next most urgent active PQRS for dispatchers."""
+        try:
+            return {
+                "agent": "assignment_agent",
+                "result": self.assignment_service.get_most_urgent(zone, limit, include_assigned)
+            }
+
+        except Exception as e:
+            logger.error(f"Urgent PQRS lookup error: {e}")
+            return {
+                "error": str(e),
+                "agent": "assignment_agent"
+            }
+
     def optimize_assignments(self, assignment_data: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Optimize existing assignments."""
         try:
@@ -92,4 +166,5 @@ class AssignmentAgent:
 
 
 # Global instance
-assignment_agent = AssignmentAgent()
\ No newline at end of file
+assignment_agent = AssignmentAgent()
+job_service.register_handler("assignment_batch", assignment_agent.run_assignment_job)
\ No newline at end of file
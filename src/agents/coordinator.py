@@ -13,6 +13,7 @@ from ..models.api import AgentTaskRequest, AgentTaskResponse
 from .assignment_agent import assignment_agent
 from .query_agent import query_agent
 from .data_agent import data_agent
+from ..services.job_service import job_service, JobContext
 
 logger = logging.getLogger(__name__)
 
@@ -58,6 +59,24 @@ class AgentCoordinator:
                 execution_time=execution_time
             )
 
+    def submit_request(self, request: AgentTaskRequest, priority: int = 5) -> AgentTaskResponse:
+        """Queue a request to be processed by the background job service."""
+        job = job_service.submit("agent_task", request.dict(), priority)
+
+        return AgentTaskResponse(
+            task_id=job["task_id"],
+            status=job["status"]
+        )
+
+    def run_agent_job(self, parameters: Dict[str, Any], context: JobContext) -> Dict[str, Any]:
+        """Job handler for queued agent requests."""
+        response = self.process_request(AgentTaskRequest(**parameters))
+
+        if response.status == "failed":
+            raise RuntimeError(response.error)
+
+        return response.result
+
     def _analyze_request(self, request: AgentTaskRequest) -> Dict[str, Any]:
         """Analyze the request to determine intent and required agents."""
         prompt = ChatPromptTemplate.from_template("""
@@ -127,6 +146,16 @@ class AgentCoordinator:
             if not pqrs_ids:
                 return {"error": "No PQRS IDs provided for assignment"}
 
+            # Large batches run in the background instead of holding the request
+            if len(pqrs_ids) > settings.assignment_async_threshold:
+                job = assignment_agent.submit_assignment_job(pqrs_ids, zone_filter)
+                return {
+                    "agent": "assignment_agent",
+                    "status": "queued",
+                    "task_id": job["task_id"],
+                    "queued_at": job["created_at"]
+                }
+
             result = assignment_agent.assign_resources(pqrs_ids, zone_filter)
             return result
 
@@ -158,9 +187,11 @@ class AgentCoordinator:
             action = request.parameters.get("action", "status")
 
             if action == "reload":
-                result = data_agent.reload_data()
+                result = data_agent.submit_job("reload_data")
             elif action == "rebuild_index":
-                result = data_agent.rebuild_search_index()
+                result = data_agent.submit_job("rebuild_index")
+            elif action == "ingest":
+                result = data_agent.submit_job("ingest_delta")
             elif action == "statistics":
                 result = data_agent.get_statistics()
             else:
@@ -207,13 +238,20 @@ class AgentCoordinator:
                 "description": "Data loading, indexing, and maintenance",
                 "capabilities": [
                     "Data reloading",
+                    "Incremental ingestion",
                     "Index rebuilding",
                     "Statistics generation",
+                    "Aggregated analytics",
                     "Health monitoring"
                 ]
+            },
+            "jobs": {
+                "description": "Background execution of long-running tasks",
+                "capabilities": job_service.get_job_types()
             }
         }
 
 
 # Global instance
-agent_coordinator = AgentCoordinator()
\ No newline at end of file
+agent_coordinator = AgentCoordinator()
+job_service.register_handler("agent_task", agent_coordinator.run_agent_job)
\ No newline at end of file
@@ -1,11 +1,15 @@
 """Data Agent - handles data loading, indexing, and maintenance."""
 
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 
 from ..services.data_service import data_service
 from ..services.rag_service import rag_service
+from ..services.assignment_service import assignment_service
+from ..services.spatial_index import spatial_index
+from ..services.job_service import job_service, JobContext
+from ..services.ingest_service import ingest_service
 
 logger = logging.getLogger(__name__)
 
@@ -22,16 +26,22 @@ class DataAgent:
         try:
             logger.info("Data Agent: Reloading data from Excel files")
 
-            stats = self.data_service.load_all_data()
+            # Build the new generation off to the side; requests keep reading
+            # the current one until it is swapped in
+            with self.data_service.updating():
+                snapshot, stats = self.data_service.load_snapshot()
+                snapshot = self.rag_service.with_vectorstore(snapshot)
+                self.data_service.publish(snapshot)
 
-            # Reinitialize RAG service with new data
-            self.rag_service.initialize_vectorstore()
+            assignment_service.invalidate_schedules()
+            spatial_index.invalidate()
 
             return {
                 "agent": "data_agent",
                 "action": "reload_data",
                 "status": "completed",
                 "statistics": stats,
+                "generation": snapshot.generation,
                 "rag_index_updated": True,
                 "completed_at": datetime.now().isoformat()
             }
@@ -45,9 +55,106 @@ class DataAgent:
                 "error": str(e)
             }
 
-    def rebuild_search_index(self) -> Dict[str, Any]:
-        """Rebuild the search index."""
+    def refresh_dataset(self, dataset: str) -> Dict[str, Any]:
+        """Reload one workbook into a new generation, leaving the other datasets as they are.
+
+        A PQRS export that only adds or changes rows is applied as an upsert
+        of those rows; otherwise the PQRS dataset is rebuilt. Out of core, the
+        PQRS sources are always streamed into a new partitioned version.
+        """
+        try:
+            logger.info(f"Data Agent: Refreshing {dataset} dataset")
+
+            frame = None
+            if not (dataset == "pqrs" and self.data_service.out_of_core):
+                frame = self.data_service.read_dataset(dataset)
+                if frame is None:
+                    raise FileNotFoundError(f"Workbook for the {dataset} dataset not found")
+
+            # The workbook was read above; only diffing against and replacing the published generation is serialized
+            with self.data_service.updating() as base:
+                if frame is None:
+                    # The workbook is one source of the partitioned table; stream them all into a new version
+                    snapshot = self.data_service.stream_pqrs(base)
+                    if snapshot is None:
+                        raise FileNotFoundError("No PQRS workbook or archive files found")
+                    self.data_service.publish(snapshot)
+                    # Diffing the whole archive is not affordable here; the index is rebuilt in the background
+                    index_job = job_service.submit("rebuild_index", {}, priority=3)
+                    mode, details = "full", {"records": snapshot.cube.total(), "index_job": index_job["task_id"]}
+                else:
+                    mode, details = "full", {}
+                    if dataset == "pqrs":
+                        delta = self.data_service.changed_pqrs_rows(frame)
+                        if delta is not None:
+                            mode = "incremental"
+                            details = ingest_service.ingest_frame(delta, source="data_watcher") if len(delta) else {}
+
+                    if mode == "full" and dataset == "pqrs":
+                        snapshot, details = self._replace_pqrs(frame)
+                    elif mode == "full":
+                        snapshot = self.data_service.replace_dataset(dataset, frame)
+                        self.data_service.publish(snapshot)
+                        details = {"records": len(frame)}
+
+            assignment_service.invalidate_schedules()
+            if dataset == "zoning":
+                spatial_index.invalidate()
+
+            return {
+                "agent": "data_agent",
+                "action": "refresh_dataset",
+                "status": "completed",
+                "dataset": dataset,
+                "mode": mode,
+                **details,
+                "generation": self.data_service.generation,
+                "completed_at": datetime.now().isoformat()
+            }
+
+        except Exception as e:
+            logger.error(f"Dataset refresh error: {e}")
+            return {
+                "agent": "data_agent",
+                "action": "refresh_dataset",
+                "status": "failed",
+                "dataset": dataset,
+                "error": str(e)
+            }
+
+    def _replace_pqrs(self, frame) -> tuple:
+        """Publish a full PQRS export, re-indexing the PQRS it adds, changes or drops first.
+
+        Must run under ``data_service.updating()``. The chunks are updated in
+        the vector index the published generation shares, as ingests do.
+        """
+        changed, removed = self.data_service.pqrs_changes(frame)
+        snapshot = self.data_service.replace_dataset("pqrs", frame)
+
+        previous = {r.numero_radicado_entrada: r
+                    for r in self.data_service.get_pqrs_records({"numero_radicado_entrada": changed})}
+        with self.data_service.reading(snapshot):
+            records = self.data_service.get_pqrs_records({"numero_radicado_entrada": changed})
+        vector = self.rag_service.upsert_records(snapshot.vectorstore, records, previous, removed)
+
+        self.data_service.publish(snapshot)
+        return snapshot, {"records": len(frame), "changed": len(changed), **vector}
+
+    def rebuild_search_index(self, partition: Optional[Any] = None) -> Dict[str, Any]:
+        """Rebuild the search index, or only one partition (year or comuna) of a partitioned index."""
         try:
+            if partition is not None:
+                logger.info(f"Data Agent: Rebuilding search index partition {partition}")
+                rebuilt = self.rag_service.rebuild_partition(partition)
+                return {
+                    "agent": "data_agent",
+                    "action": "rebuild_index",
+                    "status": "completed",
+                    "message": f"Search index partition {rebuilt['partition']} rebuilt successfully",
+                    **rebuilt,
+                    "completed_at": datetime.now().isoformat()
+                }
+
             logger.info("Data Agent: Rebuilding search index")
 
             self.rag_service.rebuild_index()
@@ -69,6 +176,111 @@ class DataAgent:
                 "error": str(e)
             }
 
+    def ingest_records(self, records: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Upsert new and updated PQRS by radicado without a full reload."""
+        try:
+            logger.info(f"Data Agent: Ingesting {len(records)} PQRS records")
+            result = ingest_service.ingest_records(records)
+
+            return {
+                "agent": "data_agent",
+                "action": "ingest",
+                "status": "completed",
+                **result,
+                "completed_at": datetime.now().isoformat()
+            }
+
+        except Exception as e:
+            logger.error(f"Ingestion error: {e}")
+            return {
+                "agent": "data_agent",
+                "action": "ingest",
+                "status": "failed",
+                "error": str(e)
+            }
+
+    def ingest_file(self, content: bytes, filename: str) -> Dict[str, Any]:
+        """Upsert the PQRS of an uploaded CSV, XLSX or NDJSON delta file."""
+        try:
+            logger.info(f"Data Agent: Ingesting delta file {filename}")
+            result = ingest_service.ingest_file(content, filename)
+
+            return {
+                "agent": "data_agent",
+                "action": "ingest",
+                "status": "completed",
+                **result,
+                "completed_at": datetime.now().isoformat()
+            }
+
+        except Exception as e:
+            logger.error(f"Ingestion error: {e}")
+            return {
+                "agent": "data_agent",
+                "action": "ingest",
+                "status": "failed",
+                "error": str(e)
+            }
+
+    def ingest_drop_directory(self) -> Dict[str, Any]:
+        """Ingest the delta files waiting in the drop directory."""
+        try:
+            files = ingest_service.scan_drop_directory()
+
+            return {
+                "agent": "data_agent",
+                "action": "ingest_drop_directory",
+                "status": "completed",
+                "files": files,
+                "files_processed": len(files),
+                "completed_at": datetime.now().isoformat()
+            }
+
+        except Exception as e:
+            logger.error(f"Drop directory ingestion error: {e}")
+            return {
+                "agent": "data_agent",
+                "action": "ingest_drop_directory",
+                "status": "failed",
+                "error": str(e)
+            }
+
+    def submit_job(self, action: str, priority: int = 5) -> Dict[str, Any]:
+        """Queue a reload, index rebuild or drop-directory ingestion in the background job service."""
+        job = job_service.submit(action, {}, priority)
+
+        return {
+            "agent": "data_agent",
+            "action": action,
+            "status": "queued",
+            "task_id": job["task_id"],
+            "queued_at": job["created_at"]
+        }
+
+    def run_reload_job(self, parameters: Dict[str, Any], context: JobContext) -> Dict[str, Any]:
+        """Job handler for queued data reloads."""
+        return self._raise_on_failure(self.reload_data())
+
+    def run_rebuild_index_job(self, parameters: Dict[str, Any], context: JobContext) -> Dict[str, Any]:
+        """Job handler for queued index rebuilds; ``partition`` limits the rebuild to one partition."""
+        return self._raise_on_failure(self.rebuild_search_index(parameters.get("partition")))
+
+    def run_refresh_job(self, parameters: Dict[str, Any], context: JobContext) -> Dict[str, Any]:
+        """Job handler for dataset refreshes queued by the data directory watcher."""
+        return self._raise_on_failure(self.refresh_dataset(parameters["dataset"]))
+
+    def run_ingest_job(self, parameters: Dict[str, Any], context: JobContext) -> Dict[str, Any]:
+        """Job handler for queued ingestion of given records or of the drop directory."""
+        if parameters.get("records"):
+            return self._raise_on_failure(self.ingest_records(parameters["records"]))
+        return self._raise_on_failure(self.ingest_drop_directory())
+
+    def _raise_on_failure(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Turn a failed action result into an exception so the job is marked failed."""
+        if result.get("status") == "failed":
+            raise RuntimeError(result.get("error", "Data action failed"))
+        return result
+
     def get_statistics(self) -> Dict[str, Any]:
         """Get comprehensive data statistics."""
         try:
@@ -92,6 +304,34 @@ class DataAgent:
                 "error": str(e)
             }
 
+    def get_analytics(self, group_by: List[str], filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Group-by/roll-up counts from the storage backend (the aggregate cube in memory)."""
+        groups = self.data_service.aggregate_pqrs(group_by, filters)
+
+        return {
+            "agent": "data_agent",
+            "group_by": group_by,
+            "filters": filters or {},
+            "groups": groups,
+            "total": sum(g["count"] for g in groups),
+            "generated_at": datetime.now().isoformat()
+        }
+
+    def get_analytics_summary(self, filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Dashboard breakdowns by status, type, commune and month."""
+        cube = self.data_service.cube
+
+        return {
+            "agent": "data_agent",
+            "filters": filters or {},
+            "total": cube.total(filters),
+            "by_status": cube.counts_by("estado", filters),
+            "by_type": cube.counts_by("tipo_solicitud", filters),
+            "by_commune": cube.counts_by("comuna_hecho", filters),
+            "by_month": cube.counts_by_month(filters),
+            "generated_at": datetime.now().isoformat()
+        }
+
     def get_status(self) -> Dict[str, Any]:
         """Get agent status and data health."""
         try:
@@ -104,6 +344,7 @@ class DataAgent:
                 "rag_initialized": self.rag_service._initialized,
                 "capabilities": [
                     "Data reloading",
+                    "Incremental ingestion",
                     "Index rebuilding",
                     "Statistics generation",
                     "Health monitoring"
@@ -144,14 +385,15 @@ class DataAgent:
                 issues.append("No vehicle data loaded")
 
             # Check for data quality issues
-            if self.data_service._pqrs_data is not None:
+            pqrs = self.data_service.snapshot.pqrs
+            if pqrs is not None:
                 # Check for missing radicados
-                missing_radicados = self.data_service._pqrs_data['numero_radicado_entrada'].isna().sum()
+                missing_radicados = pqrs['numero_radicado_entrada'].isna().sum()
                 if missing_radicados > 0:
                     issues.append(f"{missing_radicados} PQRS records missing radicado numbers")
 
                 # Check for duplicate radicados
-                duplicates = self.data_service._pqrs_data['numero_radicado_entrada'].duplicated().sum()
+                duplicates = pqrs['numero_radicado_entrada'].duplicated().sum()
                 if duplicates > 0:
                     issues.append(f"{duplicates} duplicate radicado numbers found")
 
@@ -199,4 +441,8 @@ class DataAgent:
 
 
 # Global instance
-data_agent = DataAgent()
\ No newline at end of file
+data_agent = DataAgent()
+job_service.register_handler("reload_data", data_agent.run_reload_job)
+job_service.register_handler("rebuild_index", data_agent.run_rebuild_index_job)
+job_service.register_handler("ingest_delta", data_agent.run_ingest_job)
+job_service.register_handler("refresh_dataset", data_agent.run_refresh_job)
\ No newline at end of file
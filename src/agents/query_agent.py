@@ -1,9 +1,10 @@
 """Query Agent - handles intelligent querying of PQRS data."""
 
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from datetime import datetime
 
+from ..config import settings
 from ..services.rag_service import rag_service
 from ..services.data_service import data_service
 from ..models.api import PQRSResponse
@@ -19,32 +20,55 @@ class QueryAgent:
         self.data_service = data_service
 
     def process_query(self, query: str, query_type: str = "semantic",
-                     filters: Optional[Dict[str, Any]] = None, limit: int = 10) -> Dict[str, Any]:
-        """Process a query and return relevant PQRS information."""
+                     filters: Optional[Dict[str, Any]] = None, limit: int = 10,
+                     collapse_duplicates: bool = False) -> Dict[str, Any]:
+        """Process a query and return relevant PQRS information.
+
+        With ``collapse_duplicates``, only the first result of each
+        near-duplicate cluster is kept; its ``cluster_size`` tells how many
+        active PQRS report the same problem.
+        """
         try:
             logger.info(f"Query Agent: Processing {query_type} query: {query[:50]}...")
 
-            if query_type == "radicado":
-                result = self._query_by_radicado(query)
-            elif query_type == "semantic":
-                result = self._semantic_search(query, filters, limit)
-            elif query_type == "advanced":
-                result = self._advanced_search(query, filters, limit)
-            else:
-                result = self._semantic_search(query, filters, limit)
+            # Every lookup of this query reads the same dataset generation,
+            # even if a reload publishes a new one meanwhile
+            with self.data_service.reading() as snapshot:
+                extracted = []
+                if query_type in ("semantic", "advanced") and settings.query_filter_extraction:
+                    filters, extracted = self._extract_filters(query, filters)
+                    if extracted:
+                        # Named places and types narrow the search, so run it as a filtered one
+                        query_type = "advanced"
 
-            # Format results as standardized PQRS responses
-            formatted_results = self._format_results(result.get("results", []))
+                if query_type == "radicado":
+                    result = self._query_by_radicado(query)
+                elif query_type == "semantic":
+                    result = self._semantic_search(query, filters, limit)
+                elif query_type == "advanced":
+                    result = self._advanced_search(query, filters, limit)
+                elif query_type == "filter":
+                    result = self._filter_search(filters, limit)
+                else:
+                    result = self._semantic_search(query, filters, limit)
 
-            return {
-                "agent": "query_agent",
-                "query": query,
-                "query_type": query_type,
-                "results": formatted_results,
-                "total_found": result.get("total_found", len(formatted_results)),
-                "search_metadata": result.get("metadata", {}),
-                "processed_at": datetime.now().isoformat()
-            }
+                # Format results as standardized PQRS responses
+                formatted_results = self._format_results(result.get("results", []))
+                if collapse_duplicates:
+                    formatted_results, collapsed = self._collapse_duplicates(formatted_results)
+                    result.setdefault("metadata", {})["collapsed_duplicates"] = collapsed
+
+                return {
+                    "agent": "query_agent",
+                    "query": query,
+                    "query_type": query_type,
+                    "results": formatted_results,
+                    "total_found": result.get("total_found", len(formatted_results)),
+                    "search_metadata": {**result.get("metadata", {}), "extracted_filters": extracted,
+                                        "data_generation": snapshot.generation},
+                    "data_generation": snapshot.generation,
+                    "processed_at": datetime.now().isoformat()
+                }
 
         except Exception as e:
             logger.error(f"Query Agent error: {e}")
@@ -56,6 +80,18 @@ class QueryAgent:
                 "total_found": 0
             }
 
+    def _extract_filters(self, query: str, filters: Optional[Dict[str, Any]]
+                         ) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Filters with those named in the query text added, and the names that were recognized.
+
+        Filters passed explicitly win over names found in the text for the same column.
+        """
+        found, matches = self.data_service.gazetteer().extract(query)
+        matches = [m for m in matches if m["column"] not in (filters or {})]
+        if not matches:
+            return filters, []
+        return {**{column: found[column] for column in {m["column"] for m in matches}}, **(filters or {})}, matches
+
     def _query_by_radicado(self, radicado: str) -> Dict[str, Any]:
         """Query a specific PQRS by radicado number."""
         record = self.data_service.get_pqrs_by_radicado(radicado.strip())
@@ -88,7 +124,7 @@ class QueryAgent:
 
     def _advanced_search(self, query: str, filters: Optional[Dict[str, Any]], limit: int) -> Dict[str, Any]:
         """Perform advanced search combining semantic and structured filters."""
-        results = self.rag_service.hybrid_search(query, filters, limit)
+        results, plan = self.rag_service.hybrid_search_with_plan(query, filters, limit)
 
         return {
             "results": [r["record"] for r in results],
@@ -96,10 +132,69 @@ class QueryAgent:
             "metadata": {
                 "query_type": "hybrid",
                 "filters_applied": filters or {},
+                "plan": plan,
                 "relevance_scores": [r.get("relevance_score", 0) for r in results]
             }
         }
 
+    def _filter_search(self, filters: Optional[Dict[str, Any]], limit: int) -> Dict[str, Any]:
+        """List PQRS matching structured and date-range filters, without a text query."""
+        results = self.rag_service.search_by_filters(filters or {}, limit)
+
+        return {
+            "results": results,
+            "total_found": self.data_service.count_pqrs(filters),
+            "metadata": {
+                "query_type": "filter",
+                "filters_applied": filters or {}
+            }
+        }
+
+    @staticmethod
+    def _collapse_duplicates(results: List[PQRSResponse]) -> Tuple[List[PQRSResponse], int]:
+        """The results without later members of an already listed near-duplicate cluster."""
+        seen, kept = set(), []
+        for result in results:
+            if result.cluster_id is None or result.cluster_id not in seen:
+                kept.append(result)
+                seen.add(result.cluster_id)
+        return kept, len(results) - len(kept)
+
+    def stream_records(self, filters: Optional[Dict[str, Any]] = None, limit: Optional[int] = None,
+                       batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Yield the PQRS matching ``filters`` in ``records`` frames, ending with a summary.
+
+        Records are read from storage batch by batch, so result sets larger
+        than memory can be exported.
+        """
+        logger.info(f"Query Agent: Streaming PQRS matching {filters or {}}")
+        streamed = 0
+
+        try:
+            for records in self.data_service.iter_pqrs_records(filters, chunk_rows=batch_size):
+                if limit is not None:
+                    records = records[:limit - streamed]
+                streamed += len(records)
+                yield {"type": "records", "records": [r.model_dump() for r in self._format_results(records)]}
+                if limit is not None and streamed >= limit:
+                    break
+
+            yield {
+                "type": "summary",
+                "total_streamed": streamed,
+                "filters_applied": filters or {},
+                "agent": "query_agent",
+                "processed_at": datetime.now().isoformat()
+            }
+
+        except Exception as e:
+            logger.error(f"Query stream error: {e}")
+            yield {
+                "type": "error",
+                "error": str(e),
+                "agent": "query_agent"
+            }
+
     def _format_results(self, records: List[Any]) -> List[PQRSResponse]:
         """Format PQRS records into standardized response format."""
         formatted = []
@@ -121,9 +216,13 @@ class QueryAgent:
                     tema_principal=record.tema_principal,
                     fecha_radicacion=record.fecha_radicacion.isoformat() if record.fecha_radicacion else None,
                     dias_transcurridos=record.dias_transcurridos,
+                    dias_restantes=record.dias_restantes,
                     unidad_responsable=record.unidad_responsable,
                     fecha_vencimiento=record.fecha_vencimiento.isoformat() if record.fecha_vencimiento else None
                 )
+                cluster_id, members = self.data_service.get_duplicate_cluster(record.numero_radicado_entrada)
+                if cluster_id:
+                    response.cluster_id, response.cluster_size = cluster_id, len(members)
                 formatted.append(response)
             except Exception as e:
                 logger.warning(f"Error formatting PQRS record: {e}")
@@ -159,6 +258,7 @@ class QueryAgent:
             "total_queries_today": 0,  # Would be tracked
             "popular_queries": [],     # Would be tracked
             "average_response_time": 0.0,
+            "search_cache": self.rag_service.get_cache_stats(),
             "generated_at": datetime.now().isoformat()
         }
 
@@ -171,6 +271,8 @@ class QueryAgent:
                 "Semantic search",
                 "Radicado lookup",
                 "Advanced filtering",
+                "Date-range filters (overdue, due soon, filed in a period)",
+                "Streamed exports of large result sets",
                 "Search suggestions",
                 "Query statistics"
             ],
@@ -0,0 +1,53 @@
+"""Analytics API routes served from the aggregate cube."""
+
+from typing import Any, Dict, Optional
+from fastapi import APIRouter, HTTPException
+
+from ...agents.data_agent import data_agent
+from ...services.aggregate_cube import CUBE_DIMENSIONS
+
+router = APIRouter()
+
+
+def _cube_filters(estado: Optional[str], tipo_solicitud: Optional[str], comuna_hecho: Optional[str],
+                  ano: Optional[int], mes: Optional[int]) -> Dict[str, Any]:
+    """Dimension filters from query parameters; comma-separated values match any of them."""
+    raw = {"estado": estado, "tipo_solicitud": tipo_solicitud, "comuna_hecho": comuna_hecho, "ano": ano, "mes": mes}
+    filters = {}
+    for dim, value in raw.items():
+        if value is None:
+            continue
+        filters[dim] = [v.strip() for v in value.split(",")] if isinstance(value, str) else value
+    return filters
+
+
+@router.get("/pqrs")
+async def get_pqrs_analytics(group_by: str = "estado", estado: Optional[str] = None,
+                             tipo_solicitud: Optional[str] = None, comuna_hecho: Optional[str] = None,
+                             ano: Optional[int] = None, mes: Optional[int] = None):
+    """Count PQRS grouped by any of estado, tipo_solicitud, comuna_hecho, ano and mes.
+
+    ``group_by`` is comma-separated; an empty value returns the grand total.
+    """
+    dimensions = [d.strip() for d in group_by.split(",") if d.strip()]
+    unknown = [d for d in dimensions if d not in CUBE_DIMENSIONS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown dimensions {unknown}; available: {list(CUBE_DIMENSIONS)}")
+
+    try:
+        return data_agent.get_analytics(dimensions, _cube_filters(estado, tipo_solicitud, comuna_hecho, ano, mes))
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Analytics query failed: {str(e)}")
+
+
+@router.get("/summary")
+async def get_analytics_summary(estado: Optional[str] = None, tipo_solicitud: Optional[str] = None,
+                                comuna_hecho: Optional[str] = None, ano: Optional[int] = None,
+                                mes: Optional[int] = None):
+    """Breakdowns by status, type, commune and month for the metrics dashboard."""
+    try:
+        return data_agent.get_analytics_summary(_cube_filters(estado, tipo_solicitud, comuna_hecho, ano, mes))
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Analytics summary failed: {str(e)}")
@@ -1,18 +1,36 @@
 """Assignment API routes."""
 
-from typing import List, Optional
+import json
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
 
-from ...models.api import AssignmentRequest, AssignmentResponse
+from ...config import settings
+from ...models.api import AssignmentRequest, AssignmentResponse, ResourceStatusUpdate
+from ...services.data_service import data_service
 from ...agents.assignment_agent import assignment_agent
+from ...services.assignment_ledger import assignment_ledger, RESOURCE_TYPES
 
 router = APIRouter()
 
 
 @router.post("/assign-pqrs", response_model=AssignmentResponse)
 async def assign_pqrs_resources(request: AssignmentRequest):
-    """Assign personnel and vehicles to PQRS requests using AI."""
+    """Assign personnel and vehicles to PQRS requests using AI.
+
+    Batches larger than the configured threshold are queued as a background
+    job and answered with 202 and the job's task_id.
+    """
     try:
+        if len(request.pqrs_ids) > settings.assignment_async_threshold:
+            job = assignment_agent.submit_assignment_job(request.pqrs_ids, request.zone_filter)
+            return JSONResponse(
+                status_code=202,
+                content=job,
+                headers={"Location": f"/api/jobs/{job['task_id']}"}
+            )
+
         result = assignment_agent.assign_resources(
             request.pqrs_ids,
             request.zone_filter
@@ -24,6 +42,42 @@ async def assign_pqrs_resources(request: AssignmentRequest):
         raise HTTPException(status_code=500, detail=f"Assignment failed: {str(e)}")
 
 
+def _format_ndjson(events: Iterator[Dict[str, Any]]) -> Iterator[str]:
+    """Encode events as newline-delimited JSON."""
+    for event in events:
+        yield json.dumps(event, default=str) + "\n"
+
+
+def _format_sse(events: Iterator[Dict[str, Any]]) -> Iterator[str]:
+    """Encode events as Server-Sent Events, using the event type as the SSE event name."""
+    for event in events:
+        yield f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+@router.post("/assign-pqrs/stream")
+async def stream_pqrs_assignments(request: AssignmentRequest, format: str = "ndjson"):
+    """Assign resources and stream each decision as soon as it is made.
+
+    Emits one ``assignment`` or ``unassigned`` frame per PQRS followed by a
+    final ``summary`` frame. ``format`` is ``ndjson`` (default) or ``sse``.
+    """
+    if format not in ("ndjson", "sse"):
+        raise HTTPException(status_code=400, detail=f"Unsupported stream format: {format}")
+
+    events = assignment_agent.stream_assignments(request.pqrs_ids, request.zone_filter)
+
+    if format == "sse":
+        body, media_type = _format_sse(events), "text/event-stream"
+    else:
+        body, media_type = _format_ndjson(events), "application/x-ndjson"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/schedule")
 async def get_assignment_schedule(zone: Optional[str] = None, days: int = 7):
     """Generate assignment schedule."""
@@ -35,6 +89,30 @@ async def get_assignment_schedule(zone: Optional[str] = None, days: int = 7):
         raise HTTPException(status_code=500, detail=f"Schedule generation failed: {str(e)}")
 
 
+@router.post("/schedule/{pqrs_id}")
+async def add_pqrs_to_schedule(pqrs_id: str, days: int = 7):
+    """Insert a single new PQRS into the current schedule without replanning."""
+    try:
+        result = assignment_agent.add_to_schedule(pqrs_id, days)
+        return result
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Schedule update failed: {str(e)}")
+
+
+@router.get("/urgent")
+async def get_urgent_pqrs(zone: Optional[str] = None, limit: int = 10, include_assigned: bool = False):
+    """Next ``limit`` most urgent active PQRS, optionally for one commune."""
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be positive")
+
+    try:
+        return assignment_agent.get_urgent_pqrs(zone, limit, include_assigned)
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Urgent PQRS lookup failed: {str(e)}")
+
+
 @router.post("/optimize")
 async def optimize_assignments(assignments: List[dict]):
     """Optimize existing assignments."""
@@ -46,6 +124,62 @@ async def optimize_assignments(assignments: List[dict]):
         raise HTTPException(status_code=500, detail=f"Optimization failed: {str(e)}")
 
 
+@router.get("/availability")
+async def get_resource_availability(resource_type: str, resource_id: str,
+                                    start: Optional[datetime] = None, end: Optional[datetime] = None):
+    """Check whether a personnel member or vehicle is free in a time window."""
+    if resource_type not in RESOURCE_TYPES:
+        raise HTTPException(status_code=400, detail=f"resource_type must be one of {RESOURCE_TYPES}")
+
+    start = start or datetime.now()
+    end = end or start + timedelta(hours=1)
+
+    try:
+        return {
+            "resource_type": resource_type,
+            "resource_id": resource_id,
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "available": assignment_ledger.is_available(resource_type, resource_id, start, end),
+            "conflicts": assignment_ledger.find_conflicts([(resource_type, resource_id)], start, end),
+            "workload_hours": assignment_ledger.get_workload_hours(resource_type, resource_id, start, end)
+        }
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Availability check failed: {str(e)}")
+
+
+@router.delete("/ledger/{pqrs_id}")
+async def release_assignment(pqrs_id: str):
+    """Release the ledger bookings held for a PQRS."""
+    try:
+        return {"pqrs_id": pqrs_id, "released_bookings": assignment_ledger.release(pqrs_id)}
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Release failed: {str(e)}")
+
+
+@router.put("/resources/{resource_type}/{resource_id}/status")
+async def update_resource_status(resource_type: str, resource_id: str, update: ResourceStatusUpdate):
+    """Change a personnel member's or vehicle's status and its zone availability."""
+    if resource_type not in RESOURCE_TYPES:
+        raise HTTPException(status_code=400, detail=f"resource_type must be one of {RESOURCE_TYPES}")
+
+    if resource_type == "personnel":
+        record = data_service.set_personnel_status(resource_id, update.status)
+    else:
+        record = data_service.set_vehicle_status(resource_id, update.status)
+
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"{resource_type} not found: {resource_id}")
+
+    return {
+        "resource_type": resource_type,
+        "resource": record,
+        "zone_availability": data_service.get_zone_availability(record.zone)
+    }
+
+
 @router.get("/status")
 async def get_assignment_status():
     """Get assignment agent status."""
@@ -1,43 +1,73 @@
 """Health check API routes."""
 
+from datetime import datetime
 from fastapi import APIRouter
 
 from ...models.api import HealthResponse
 from ...services.data_service import data_service
 from ...services.rag_service import rag_service
+from ...services.health_service import health_service
+from ...services.data_watcher import data_watcher
+from ...services.shared_dataset import shared_store
+from ...services.single_flight import single_flight
 from ...agents.coordinator import agent_coordinator
 
 router = APIRouter()
 
 
-@router.get("/", response_model=HealthResponse)
-async def health_check():
-    """Comprehensive health check of the system."""
-    try:
-        # Get data statistics
-        data_stats = data_service.get_data_statistics()
+def _build_health() -> HealthResponse:
+    """Collect data statistics and agent statuses into a health response."""
+    # Get data statistics
+    data_stats = data_service.get_data_statistics()
 
-        # Check agent statuses
-        agent_statuses = agent_coordinator.get_agent_status()
+    # Check agent statuses
+    agent_statuses = agent_coordinator.get_agent_status()
 
-        # Determine overall health
-        services_status = {
-            "data_service": "✅ Disponible" if data_stats["pqrs_total"] > 0 else "❌ Sin datos",
-            "rag_service": "✅ Disponible" if rag_service._initialized else "❌ No inicializado",
-            "assignment_agent": "✅ Activo" if agent_statuses.get("assignment_agent", {}).get("status") == "active" else "❌ Inactivo",
-            "query_agent": "✅ Activo" if agent_statuses.get("query_agent", {}).get("status") == "active" else "❌ Inactivo",
-            "data_agent": "✅ Activo" if agent_statuses.get("data_agent", {}).get("status") == "active" else "❌ Inactivo",
-        }
+    # Determine overall health
+    services_status = {
+        "data_service": "✅ Disponible" if data_stats["pqrs_total"] > 0 else "❌ Sin datos",
+        "rag_service": "✅ Disponible" if rag_service._initialized else "❌ No inicializado",
+        "assignment_agent": "✅ Activo" if agent_statuses.get("assignment_agent", {}).get("status") == "active" else "❌ Inactivo",
+        "query_agent": "✅ Activo" if agent_statuses.get("query_agent", {}).get("status") == "active" else "❌ Inactivo",
+        "data_agent": "✅ Activo" if agent_statuses.get("data_agent", {}).get("status") == "active" else "❌ Inactivo",
+    }
 
-        # Overall status
-        all_healthy = all("✅" in status for status in services_status.values())
+    # Overall status
+    all_healthy = all("✅" in status for status in services_status.values())
 
-        return HealthResponse(
-            status="healthy" if all_healthy else "degraded",
-            version="1.0.0",
-            services=services_status,
-            data_stats=data_stats
-        )
+    return HealthResponse(
+        status="healthy" if all_healthy else "degraded",
+        version="1.0.0",
+        services=services_status,
+        data_stats=data_stats,
+        generation=data_service.generation,
+        checked_at=datetime.now().isoformat()
+    )
+
+
+@router.get("/", response_model=HealthResponse)
+async def health_check(deep: bool = False):
+    """Health check of the system.
+
+    Served from a snapshot that is rebuilt only when data or the vector index
+    change or the cache expires. ``deep=true`` also checks the vector store,
+    the LLM configuration and data integrity.
+    """
+    try:
+        if not deep:
+            return health_service.get_snapshot(_build_health)
+
+        health_service.invalidate()
+        snapshot = health_service.get_snapshot(_build_health)
+        deep_result = health_service.deep_check()
+        failed = any(c["status"] == "failed" for c in deep_result["checks"].values())
+        degraded = any(c["status"] != "ok" for c in deep_result["checks"].values())
+
+        return snapshot.model_copy(update={
+            "status": "unhealthy" if failed else ("degraded" if degraded else snapshot.status),
+            "checks": deep_result["checks"],
+            "checked_at": deep_result["checked_at"]
+        })
 
     except Exception as e:
         return HealthResponse(
@@ -56,11 +86,27 @@ async def get_agents_status():
         return {"error": str(e)}
 
 
+def _data_status() -> dict:
+    return {
+        **data_service.get_data_statistics(),
+        "dataset": data_service.get_dataset_status(),
+        "storage": data_service.get_storage_status(),
+        "shared_dataset": shared_store.status(),
+        "load": data_service.get_load_report(),
+        "memory": data_service.get_memory_report(),
+        "watcher": data_watcher.status(),
+        "coalescing": single_flight.stats()
+    }
+
+
 @router.get("/data")
 async def get_data_status():
-    """Get data loading status."""
+    """Get data loading status and the dataset generations in use.
+
+    Identical concurrent requests share one computation.
+    """
     try:
-        return data_service.get_data_statistics()
+        return await single_flight.run(("health-data", data_service.generation), _data_status)
 
     except Exception as e:
         return {"error": str(e)}
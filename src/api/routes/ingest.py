@@ -0,0 +1,39 @@
+"""Incremental PQRS ingestion API routes."""
+
+from fastapi import APIRouter, File, HTTPException, UploadFile
+
+from ...agents.data_agent import data_agent
+from ...models.api import IngestRequest
+
+router = APIRouter()
+
+
+@router.post("/records")
+async def ingest_records(request: IngestRequest):
+    """Upsert new and updated PQRS by numero_radicado_entrada."""
+    if not request.records:
+        raise HTTPException(status_code=400, detail="No records provided")
+
+    result = data_agent.ingest_records(request.records)
+    if result["status"] == "failed":
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
+
+
+@router.post("/file")
+async def ingest_file(file: UploadFile = File(...)):
+    """Upsert the PQRS of a CSV, XLSX or NDJSON delta file."""
+    result = data_agent.ingest_file(await file.read(), file.filename or "")
+    if result["status"] == "failed":
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
+
+
+@router.post("/scan", status_code=202)
+async def scan_drop_directory(priority: int = 5):
+    """Queue ingestion of the delta files waiting in the drop directory."""
+    try:
+        return data_agent.submit_job("ingest_delta", priority)
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Ingestion scan failed: {str(e)}")
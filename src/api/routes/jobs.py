@@ -0,0 +1,79 @@
+"""Background job API routes."""
+
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse
+
+from ...models.api import JobSubmitRequest, JobStatusResponse, AgentTaskResponse
+from ...services.job_service import job_service, TERMINAL_STATUSES
+
+router = APIRouter()
+
+
+@router.post("/", response_model=JobStatusResponse, status_code=202)
+async def submit_job(request: JobSubmitRequest):
+    """Queue a long-running task and return its task_id immediately."""
+    try:
+        return job_service.submit(request.job_type, request.parameters, request.priority)
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Job submission failed: {str(e)}")
+
+
+@router.get("/", response_model=List[JobStatusResponse])
+async def list_jobs(status: Optional[str] = None, limit: int = 50):
+    """List recent jobs."""
+    try:
+        return job_service.list_jobs(status, limit)
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Job listing failed: {str(e)}")
+
+
+@router.get("/{task_id}", response_model=JobStatusResponse)
+async def get_job_status(task_id: str):
+    """Poll the status of a job."""
+    job = job_service.get_job(task_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {task_id}")
+    return job
+
+
+@router.get("/{task_id}/result", response_model=AgentTaskResponse)
+async def get_job_result(task_id: str):
+    """Get the result of a finished job; returns 202 while it is still pending."""
+    job = job_service.get_job(task_id, include_result=True)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {task_id}")
+
+    if job["status"] not in TERMINAL_STATUSES:
+        return JSONResponse(
+            status_code=202,
+            content=AgentTaskResponse(task_id=task_id, status=job["status"]).dict()
+        )
+
+    execution_time = None
+    if job["started_at"] and job["finished_at"]:
+        execution_time = (
+            datetime.fromisoformat(job["finished_at"]) - datetime.fromisoformat(job["started_at"])
+        ).total_seconds()
+
+    return AgentTaskResponse(
+        task_id=task_id,
+        status=job["status"],
+        result=job["result"],
+        error=job["error"],
+        execution_time=execution_time
+    )
+
+
+@router.delete("/{task_id}", response_model=JobStatusResponse)
+async def cancel_job(task_id: str):
+    """Cancel a queued or running job."""
+    job = job_service.cancel(task_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {task_id}")
+    return job
@@ -1,23 +1,39 @@
 """Query API routes."""
 
+import json
 from typing import Optional, Dict, Any
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 
-from ...models.api import QueryRequest, QueryResponse
+from ...models.api import QueryRequest, QueryResponse, StreamQueryRequest
 from ...agents.query_agent import query_agent
+from ...services.data_service import data_service
+from ...services.single_flight import single_flight
 
 router = APIRouter()
 
 
+def _query_key(*parts: Any, filters: Optional[Dict[str, Any]] = None) -> tuple:
+    """Single-flight key of a query on the current data generation."""
+    return (*parts, json.dumps(filters, sort_keys=True, default=str), data_service.generation)
+
+
 @router.post("/pqrs", response_model=QueryResponse)
 async def query_pqrs(request: QueryRequest):
-    """Query PQRS database with various search types."""
+    """Query PQRS database with various search types.
+
+    Identical concurrent queries share one computation.
+    """
     try:
-        result = query_agent.process_query(
+        result = await single_flight.run(
+            _query_key("pqrs", request.query, request.query_type, request.limit, request.collapse_duplicates,
+                       filters=request.filters),
+            query_agent.process_query,
             request.query,
             request.query_type,
             request.filters,
-            request.limit
+            request.limit,
+            request.collapse_duplicates
         )
 
         return QueryResponse(**result)
@@ -26,6 +42,23 @@ async def query_pqrs(request: QueryRequest):
         raise HTTPException(status_code=500, detail=f"Query failed: {str(e)}")
 
 
+@router.post("/pqrs/stream")
+async def stream_pqrs(request: StreamQueryRequest):
+    """Stream every PQRS matching the filters as newline-delimited JSON.
+
+    Emits ``records`` frames of up to ``batch_size`` PQRS followed by a final
+    ``summary`` frame; rows are read from storage as the client consumes them.
+    """
+    events = query_agent.stream_records(request.filters, request.limit, request.batch_size)
+    body = (json.dumps(event, default=str) + "\n" for event in events)
+
+    return StreamingResponse(
+        body,
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/pqrs/{radicado}")
 async def get_pqrs_by_radicado(radicado: str):
     """Get PQRS by radicado number."""
@@ -38,16 +71,22 @@ async def get_pqrs_by_radicado(radicado: str):
 
 
 @router.get("/search-content")
-async def search_content(q: str, limit: int = 10, filters: Optional[str] = None):
-    """Search PQRS content semantically."""
+async def search_content(q: str, limit: int = 10, filters: Optional[str] = None, collapse_duplicates: bool = False):
+    """Search PQRS content semantically.
+
+    Identical concurrent searches (e.g. dashboards refreshing together)
+    share one embedding call and vector search.
+    """
     try:
         # Parse filters if provided
         parsed_filters = None
         if filters:
-            import json
             parsed_filters = json.loads(filters)
 
-        result = query_agent.process_query(q, "semantic", parsed_filters, limit)
+        result = await single_flight.run(
+            _query_key("search-content", q, limit, collapse_duplicates, filters=parsed_filters),
+            query_agent.process_query, q, "semantic", parsed_filters, limit, collapse_duplicates
+        )
         return result
 
     except Exception as e:
@@ -69,7 +108,7 @@ async def get_search_suggestions(q: str, limit: int = 5):
 async def get_query_statistics():
     """Get query statistics."""
     try:
-        result = query_agent.get_query_statistics()
+        result = await single_flight.run(("query-statistics",), query_agent.get_query_statistics)
         return result
 
     except Exception as e:
@@ -22,10 +22,36 @@ class Settings(BaseSettings):
     personnel_data_file: str = "data-personal.xlsx"
     transport_data_file: str = "data-transporte.xlsx"
     zoning_data_file: str = "data-zonificacion.xlsx"
+    load_workers: int = 4  # processes reading the workbooks in parallel; 1 reads them in-process
+
+    # Watch data_dir and refresh a dataset when its workbook changes
+    watch_data_dir: bool = False
+    watch_interval_seconds: float = 2.0
+    watch_debounce_seconds: float = 5.0
+
+    # Delta ingestion drop directory (new/updated PQRS as CSV, XLSX or NDJSON)
+    ingest_dir: str = "data/ingest"
+
+    # Storage backend for filtered PQRS reads and aggregates: "memory", "sqlite" or "partitioned".
+    # "partitioned" runs out of core: the full PQRS table is streamed to one SQLite file per
+    # year/month and only active PQRS stay in memory.
+    storage_backend: str = "memory"
+    storage_path: Optional[str] = None  # defaults to <state_dir>/pqrs_store.db (<state_dir>/pqrs_partitions)
+    pqrs_archive_dir: Optional[str] = None  # PQRS history (.xlsx/.csv/.ndjson) loaded with the workbook out of core
+    load_chunk_rows: int = 50000  # rows per chunk when streaming PQRS sources
+
+    # Directory for the memory-mapped Arrow copy of the tables shared by all workers (needs pyarrow)
+    shared_dataset_dir: Optional[str] = None
 
     # Vector store
     chroma_persist_directory: str = "rag/chroma_db"
     embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
+    embedding_cache_size: int = 10000  # query texts whose embeddings are kept (LRU)
+    search_cache_size: int = 1000  # semantic search results kept; 0 disables the cache
+    search_cache_seconds: float = 300.0
+    vector_partition_by: Optional[str] = None  # "ano" or "comuna_hecho": one collection per value, searched in parallel
+    query_filter_extraction: bool = True  # turn barrio/comuna/tipo/tema names in search text into filters
+    duplicate_similarity: float = 0.5  # estimated Jaccard similarity of asunto + dirección for near-duplicate PQRS
 
     # API
     host: str = "0.0.0.0"
@@ -35,6 +61,23 @@ class Settings(BaseSettings):
     max_steps: int = 5
     temperature: float = 0.1
 
+    # Background jobs
+    state_dir: str = "state"
+    job_workers: int = 2
+    assignment_async_threshold: int = 20
+
+    # Scheduling
+    schedule_task_hours: float = 2.0
+    schedule_cache_seconds: int = 300
+    urgency_refresh_seconds: int = 3600  # rescore active PQRS against the current date when older than this
+
+    # Nearby-zone fallback when a zone has no resources
+    nearby_zones_k: int = 3
+    distance_penalty_hours_per_km: float = 0.5
+
+    # Health checks
+    health_cache_seconds: int = 30
+
     class Config:
         env_file = ".env"
         case_sensitive = False
@@ -2,13 +2,15 @@
 
 import logging
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 
 from .config import settings
-from .api.routes import assignment, query, health
+from .api.routes import assignment, query, health, jobs, analytics, ingest
 from .services.data_service import data_service
 from .services.rag_service import rag_service
+from .services.job_service import job_service
+from .services.data_watcher import data_watcher
 from .agents.coordinator import agent_coordinator
 
 # Configure logging
@@ -36,6 +38,13 @@ async def lifespan(app: FastAPI):
         rag_service.initialize_vectorstore()
         logger.info("RAG service initialized")
 
+        # Start background job workers (resumes jobs left from a restart)
+        job_service.start()
+
+        # Refresh datasets automatically when their workbooks change
+        if settings.watch_data_dir:
+            data_watcher.start()
+
         logger.info("System startup complete")
 
     except Exception as e:
@@ -46,6 +55,8 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     logger.info("Shutting down unified PQRS system...")
+    data_watcher.stop()
+    job_service.stop()
 
 
 # Create FastAPI app
@@ -65,10 +76,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+
+@app.middleware("http")
+async def add_data_generation_header(request: Request, call_next):
+    """Tell clients which dataset generation answered, so they can spot reloads."""
+    response = await call_next(request)
+    response.headers["X-Data-Generation"] = str(data_service.generation)
+    return response
+
 # Include routers
 app.include_router(assignment.router, prefix="/api/assignment", tags=["assignment"])
 app.include_router(query.router, prefix="/api/query", tags=["query"])
 app.include_router(health.router, prefix="/api/health", tags=["health"])
+app.include_router(jobs.router, prefix="/api/jobs", tags=["jobs"])
+app.include_router(analytics.router, prefix="/api/analytics", tags=["analytics"])
+app.include_router(ingest.router, prefix="/api/ingest", tags=["ingest"])
 
 
 @app.get("/")
@@ -101,6 +124,22 @@ async def process_agent_request(request: dict):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/agent/submit", status_code=202)
+async def submit_agent_request(request: dict, priority: int = Query(5, ge=0, le=9)):
+    """Queue a request for the agent coordinator and return its task_id immediately."""
+    try:
+        from .models.api import AgentTaskRequest
+
+        task_request = AgentTaskRequest(**request)
+        response = agent_coordinator.submit_request(task_request, priority)
+
+        return response.dict()
+
+    except Exception as e:
+        logger.error(f"Agent submission error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 if __name__ == "__main__":
     import uvicorn
 
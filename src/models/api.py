@@ -20,13 +20,38 @@ class AssignmentResponse(BaseModel):
     unassigned: List[str] = Field(default_factory=list, description="Unassigned PQRS IDs")
 
 
+class ResourceStatusUpdate(BaseModel):
+    """Request model for changing a personnel member's or vehicle's status."""
+
+    status: str = Field(..., description="New status, e.g. 'available', 'busy', 'maintenance'")
+
+
+class IngestRequest(BaseModel):
+    """Request model for upserting PQRS records."""
+
+    records: List[Dict[str, Any]] = Field(..., description="PQRS rows keyed by numero_radicado_entrada; only given fields are updated")
+
+
 class QueryRequest(BaseModel):
     """Request model for PQRS queries."""
 
     query: str = Field(..., description="Search query or radicado number")
-    query_type: str = Field("semantic", description="Type: 'radicado', 'semantic', 'advanced'")
-    filters: Optional[Dict[str, Any]] = Field(None, description="Additional filters")
+    query_type: str = Field("semantic", description="Type: 'radicado', 'semantic', 'advanced', 'filter'")
+    filters: Optional[Dict[str, Any]] = Field(
+        None,
+        description="Column equality filters plus date ranges: fecha_radicacion_from/_to, "
+                    "fecha_vencimiento_from/_to, overdue, due_within_days, filed_within_days"
+    )
     limit: int = Field(10, description="Maximum results to return")
+    collapse_duplicates: bool = Field(False, description="Return one PQRS per near-duplicate cluster")
+
+
+class StreamQueryRequest(BaseModel):
+    """Request model for streaming all PQRS that match filters."""
+
+    filters: Optional[Dict[str, Any]] = Field(None, description="Same filters as QueryRequest")
+    limit: Optional[int] = Field(None, description="Maximum records to stream; all matches when omitted")
+    batch_size: int = Field(1000, ge=1, le=10000, description="Records per streamed frame")
 
 
 class PQRSResponse(BaseModel):
@@ -45,8 +70,11 @@ class PQRSResponse(BaseModel):
     tema_principal: Optional[str]
     fecha_radicacion: Optional[str]
     dias_transcurridos: Optional[int]
+    dias_restantes: Optional[int] = None
     unidad_responsable: Optional[str]
     fecha_vencimiento: Optional[str]
+    cluster_id: Optional[str] = None
+    cluster_size: Optional[int] = None
 
 
 class QueryResponse(BaseModel):
@@ -65,6 +93,9 @@ class HealthResponse(BaseModel):
     version: str = "1.0.0"
     services: Dict[str, Any] = Field(default_factory=dict)
     data_stats: Optional[Dict[str, Any]] = Field(None, description="Data statistics")
+    generation: Optional[int] = Field(None, description="Data generation the snapshot was built from")
+    checked_at: Optional[str] = Field(None, description="When the snapshot was built")
+    checks: Optional[Dict[str, Any]] = Field(None, description="Deep check results (deep=true only)")
 
 
 class AgentTaskRequest(BaseModel):
@@ -82,4 +113,26 @@ class AgentTaskResponse(BaseModel):
     status: str
     result: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
-    execution_time: Optional[float] = None
\ No newline at end of file
+    execution_time: Optional[float] = None
+
+class JobSubmitRequest(BaseModel):
+    """Request model for submitting a background job."""
+
+    job_type: str = Field(..., description="Job type: 'agent_task', 'assignment_batch', 'rebuild_index', 'reload_data', 'ingest_delta', 'refresh_dataset'")
+    parameters: Dict[str, Any] = Field(default_factory=dict, description="Job parameters")
+    priority: int = Field(5, ge=0, le=9, description="Job priority (0 runs first)")
+
+
+class JobStatusResponse(BaseModel):
+    """Status of a background job."""
+
+    task_id: str
+    job_type: str
+    status: str
+    priority: int
+    progress: float = 0.0
+    message: Optional[str] = None
+    error: Optional[str] = None
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
@@ -15,6 +15,7 @@ class PQRSRecord(BaseModel):
     # Status and timing
     estado: str = Field(..., description="Current status of the PQRS")
     dias_transcurridos: Optional[int] = Field(None, description="Days elapsed")
+    dias_restantes: Optional[int] = Field(None, description="Days until the due date (negative when overdue)")
     fecha_radicacion: Optional[datetime] = Field(None, description="Registration date")
     fecha_entrada_sif: Optional[datetime] = Field(None, description="SIF entry date")
     fecha_radicado_respuesta: Optional[datetime] = Field(None, description="Response date")
@@ -44,6 +45,10 @@ class PQRSRecord(BaseModel):
     ano: Optional[float] = Field(None, description="Year")
     prorroga: Optional[str] = Field(None, description="Extension")
 
+    # Derived at load time by the priority engine
+    priority: Optional[str] = Field(None, description="Dispatch priority (high/medium)")
+    urgency_score: Optional[float] = Field(None, description="Numeric urgency score")
+
     class Config:
         from_attributes = True
 
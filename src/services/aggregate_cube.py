@@ -0,0 +1,127 @@
+"""Precomputed PQRS counts by estado x tipo_solicitud x comuna_hecho x ano/mes."""
+
+import logging
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CUBE_DIMENSIONS = ("estado", "tipo_solicitud", "comuna_hecho", "ano", "mes")
+
+
+class AggregateCube:
+    """Counts of PQRS per cell of the cube dimensions, with group-by/roll-up queries.
+
+    The cube has at most a few thousand cells, so queries scan cells instead
+    of the PQRS frame. ``add_rows``/``remove_rows`` apply deltas in place.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cells: Counter = Counter()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"cells": self._cells}
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self._lock = threading.Lock()
+        self._cells = state["cells"]
+
+    @staticmethod
+    def _cells_of(df: pd.DataFrame) -> Counter:
+        """Count rows per cell in one group-by pass."""
+        if df is None or df.empty:
+            return Counter()
+
+        keys = pd.DataFrame(index=df.index)
+        for dim in CUBE_DIMENSIONS:
+            column = df[dim] if dim in df.columns else pd.Series(None, index=df.index, dtype=object)
+            if dim in ("ano", "mes"):
+                column = pd.to_numeric(column, errors="coerce").astype("Int64")
+            keys[dim] = column.astype(object).where(column.notna(), None)
+
+        sizes = keys.groupby(list(CUBE_DIMENSIONS), dropna=False).size()
+        return Counter({
+            tuple(None if pd.isna(v) else (int(v) if dim in ("ano", "mes") else v)
+                  for dim, v in zip(CUBE_DIMENSIONS, cell)): int(count)
+            for cell, count in sizes.items()
+        })
+
+    def build(self, df: Optional[pd.DataFrame]):
+        """Replace the cube with counts from a full frame."""
+        cells = self._cells_of(df)
+        with self._lock:
+            self._cells = cells
+        logger.info(f"Built aggregate cube with {len(cells)} cells")
+
+    def copy(self) -> "AggregateCube":
+        """An independent cube with the same counts, for applying deltas to a new generation."""
+        cube = AggregateCube()
+        with self._lock:
+            cube._cells = Counter(self._cells)
+        return cube
+
+    def add_rows(self, df: pd.DataFrame):
+        """Count new rows."""
+        delta = self._cells_of(df)
+        with self._lock:
+            self._cells.update(delta)
+
+    def remove_rows(self, df: pd.DataFrame):
+        """Uncount removed rows (or the previous version of updated rows)."""
+        delta = self._cells_of(df)
+        with self._lock:
+            self._cells.subtract(delta)
+            self._cells = +self._cells  # drop empty cells
+
+    def query(self, group_by: Sequence[str] = (), filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Roll the cube up to ``group_by`` dimensions, keeping cells that match ``filters``.
+
+        Filter values may be a single value or a list of accepted values.
+        Groups are returned largest first.
+        """
+        unknown = [d for d in list(group_by) + list(filters or {}) if d not in CUBE_DIMENSIONS]
+        if unknown:
+            raise ValueError(f"Unknown cube dimensions {unknown}; available: {list(CUBE_DIMENSIONS)}")
+
+        positions = [CUBE_DIMENSIONS.index(d) for d in group_by]
+        accepted = {}
+        for dim, value in (filters or {}).items():
+            values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+            if dim in ("ano", "mes"):
+                values = [int(float(v)) if v is not None else None for v in values]
+            accepted[CUBE_DIMENSIONS.index(dim)] = set(values)
+
+        totals: Counter = Counter()
+        with self._lock:
+            for cell, count in self._cells.items():
+                if all(cell[i] in values for i, values in accepted.items()):
+                    totals[tuple(cell[i] for i in positions)] += count
+
+        return [
+            dict(zip(group_by, key), count=count)
+            for key, count in sorted(totals.items(), key=lambda item: -item[1])
+        ]
+
+    def total(self, filters: Optional[Dict[str, Any]] = None) -> int:
+        """Number of PQRS matching ``filters``."""
+        groups = self.query((), filters)
+        return groups[0]["count"] if groups else 0
+
+    def counts_by(self, dimension: str, filters: Optional[Dict[str, Any]] = None) -> Dict[Any, int]:
+        """``{value: count}`` for one dimension."""
+        return {group[dimension]: group["count"] for group in self.query((dimension,), filters)}
+
+    def counts_by_month(self, filters: Optional[Dict[str, Any]] = None) -> Dict[str, int]:
+        """``{"YYYY-MM": count}`` in chronological order, skipping rows without a period."""
+        groups = self.query(("ano", "mes"), filters)
+        periods = sorted((g["ano"], g["mes"], g["count"]) for g in groups
+                         if g["ano"] is not None and g["mes"] is not None)
+        return {f"{ano}-{mes:02d}": count for ano, mes, count in periods}
+
+    def __len__(self) -> int:
+        return len(self._cells)
@@ -0,0 +1,280 @@
+"""Assignment ledger tracking booked hours per personnel member and vehicle."""
+
+import itertools
+import logging
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Any
+
+from sortedcontainers import SortedList
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+RESOURCE_TYPES = ("personnel", "vehicle")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bookings (
+    pqrs_id TEXT NOT NULL,
+    resource_type TEXT NOT NULL,
+    resource_id TEXT NOT NULL,
+    start_ts REAL NOT NULL,
+    end_ts REAL NOT NULL,
+    created_at TEXT NOT NULL,
+    PRIMARY KEY (resource_type, resource_id, start_ts)
+)
+"""
+
+
+class ResourceSchedule:
+    """Sorted, non-overlapping booked intervals for a single resource.
+
+    Intervals are half-open ``[start, end)`` epoch-second ranges kept as
+    ``(start, end, pqrs_id)`` tuples in a sorted list, so availability checks
+    are a single bisection and adding or removing a booking is logarithmic.
+    """
+
+    def __init__(self):
+        self.bookings = SortedList()
+        self._by_pqrs: Dict[str, List[Tuple[float, float, str]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.bookings)
+
+    def _after(self, start: float) -> int:
+        """Index of the first booking starting after ``start``."""
+        return self.bookings.bisect_right((start, float("inf")))
+
+    def is_free(self, start: float, end: float) -> bool:
+        """Whether no booking overlaps ``[start, end)``."""
+        i = self._after(start)
+        if i > 0 and self.bookings[i - 1][1] > start:
+            return False
+        if i < len(self.bookings) and self.bookings[i][0] < end:
+            return False
+        return True
+
+    def overlapping(self, start: float, end: float) -> List[Tuple[float, float, str]]:
+        """Bookings that overlap ``[start, end)``."""
+        i = self._after(start)
+        if i > 0 and self.bookings[i - 1][1] > start:
+            i -= 1
+        return list(itertools.takewhile(lambda booking: booking[0] < end, self.bookings.islice(i)))
+
+    def booked_seconds(self, start: float, end: float) -> float:
+        """Total booked time inside ``[start, end)``."""
+        return sum(min(e, end) - max(s, start) for s, e, _ in self.overlapping(start, end))
+
+    def next_free(self, after: float, duration: float) -> float:
+        """Earliest start at or after ``after`` with a free gap of ``duration``."""
+        candidate = after
+        i = self._after(candidate)
+        if i > 0 and self.bookings[i - 1][1] > candidate:
+            candidate = self.bookings[i - 1][1]
+
+        for start, end, _ in self.bookings.islice(i):
+            if start >= candidate + duration:
+                break
+            candidate = max(candidate, end)
+        return candidate
+
+    def add(self, start: float, end: float, pqrs_id: str):
+        """Insert a booking; the caller must have checked it is free."""
+        booking = (start, end, pqrs_id)
+        self.bookings.add(booking)
+        self._by_pqrs.setdefault(pqrs_id, []).append(booking)
+
+    def remove_pqrs(self, pqrs_id: str) -> int:
+        """Drop every booking for a PQRS and return how many were removed."""
+        removed = self._by_pqrs.pop(pqrs_id, [])
+        for booking in removed:
+            self.bookings.remove(booking)
+        return len(removed)
+
+
+class AssignmentLedger:
+    """Ledger of booked hours keyed by employee_id and license_plate, persisted in SQLite."""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = Path(db_path or Path(settings.state_dir) / "ledger.db")
+        self._schedules: Dict[Tuple[str, str], ResourceSchedule] = {}
+        self._pqrs_resources: Dict[str, set] = {}
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _load(self):
+        """Open the ledger database and load bookings into memory on first use."""
+        if self._conn is not None:
+            return
+
+        with self._lock:
+            if self._conn is not None:
+                return
+
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            conn.execute(_SCHEMA)
+            conn.commit()
+
+            rows = conn.execute(
+                "SELECT pqrs_id, resource_type, resource_id, start_ts, end_ts FROM bookings ORDER BY start_ts"
+            ).fetchall()
+            for pqrs_id, resource_type, resource_id, start, end in rows:
+                self._schedule(resource_type, resource_id).add(start, end, pqrs_id)
+                self._pqrs_resources.setdefault(pqrs_id, set()).add((resource_type, resource_id))
+
+            self._conn = conn
+            logger.info(f"Loaded {len(rows)} ledger bookings")
+
+    def _schedule(self, resource_type: str, resource_id: str) -> ResourceSchedule:
+        key = (resource_type, str(resource_id))
+        if key not in self._schedules:
+            self._schedules[key] = ResourceSchedule()
+        return self._schedules[key]
+
+    def is_available(self, resource_type: str, resource_id: str, start: datetime, end: datetime) -> bool:
+        """Whether a resource is free between start and end."""
+        self._load()
+        with self._lock:
+            schedule = self._schedules.get((resource_type, str(resource_id)))
+            return schedule is None or schedule.is_free(start.timestamp(), end.timestamp())
+
+    def find_conflicts(self, resources: List[Tuple[str, str]], start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        """Bookings that would collide with using the given resources between start and end."""
+        self._load()
+        conflicts = []
+        with self._lock:
+            for resource_type, resource_id in resources:
+                schedule = self._schedules.get((resource_type, str(resource_id)))
+                if schedule is None:
+                    continue
+                for s, e, pqrs_id in schedule.overlapping(start.timestamp(), end.timestamp()):
+                    conflicts.append({
+                        "resource_type": resource_type,
+                        "resource_id": resource_id,
+                        "pqrs_id": pqrs_id,
+                        "start": datetime.fromtimestamp(s).isoformat(),
+                        "end": datetime.fromtimestamp(e).isoformat()
+                    })
+        return conflicts
+
+    def earliest_common_slot(self, resources: List[Tuple[str, str]], after: datetime, hours: float) -> datetime:
+        """Earliest start at or after ``after`` when all resources are free for ``hours``."""
+        self._load()
+        duration = hours * 3600
+        candidate = after.timestamp()
+
+        with self._lock:
+            schedules = [self._schedules.get((t, str(r))) for t, r in resources]
+            schedules = [s for s in schedules if s is not None]
+
+            # Each pass can only move the candidate later, so this converges
+            while True:
+                latest = max((s.next_free(candidate, duration) for s in schedules), default=candidate)
+                if latest == candidate:
+                    return datetime.fromtimestamp(candidate)
+                candidate = latest
+
+    def book(self, pqrs_id: str, resources: List[Tuple[str, str]], start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        """Book resources for a PQRS. Returns conflicts and books nothing if any exist."""
+        self._load()
+        with self._lock:
+            conflicts = self.find_conflicts(resources, start, end)
+            if conflicts:
+                return conflicts
+
+            start_ts, end_ts = start.timestamp(), end.timestamp()
+            created_at = datetime.now().isoformat()
+            rows = []
+            for resource_type, resource_id in resources:
+                self._schedule(resource_type, resource_id).add(start_ts, end_ts, pqrs_id)
+                self._pqrs_resources.setdefault(pqrs_id, set()).add((resource_type, str(resource_id)))
+                rows.append((pqrs_id, resource_type, str(resource_id), start_ts, end_ts, created_at))
+
+            self._conn.executemany("INSERT OR REPLACE INTO bookings VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self._conn.commit()
+
+        return []
+
+    def book_earliest(self, pqrs_id: str, resources: List[Tuple[str, str]], after: datetime,
+                      hours: float) -> Dict[str, Any]:
+        """Book resources for a PQRS at their earliest common free slot at or after ``after``.
+
+        The slot is found and booked under one hold of the ledger lock, so a
+        concurrent booking cannot take it in between. Returns the booked
+        ``start`` and ``end`` and the ``conflicts`` a window starting at
+        ``after`` would have had. Raises ``RuntimeError`` if nothing was booked.
+        """
+        self._load()
+        with self._lock:
+            conflicts = self.find_conflicts(resources, after, after + timedelta(hours=hours))
+            start = self.earliest_common_slot(resources, after, hours)
+            end = start + timedelta(hours=hours)
+            if self.book(pqrs_id, resources, start, end):
+                raise RuntimeError(f"Could not book {resources} for PQRS {pqrs_id} at {start.isoformat()}")
+        return {"start": start, "end": end, "conflicts": conflicts}
+
+    def release(self, pqrs_id: str) -> int:
+        """Remove all bookings held for a PQRS."""
+        self._load()
+        removed = 0
+        with self._lock:
+            for resource_type, resource_id in self._pqrs_resources.pop(pqrs_id, set()):
+                removed += self._schedule(resource_type, resource_id).remove_pqrs(pqrs_id)
+
+            self._conn.execute("DELETE FROM bookings WHERE pqrs_id = ?", (pqrs_id,))
+            self._conn.commit()
+        return removed
+
+    def booked_pqrs(self) -> set:
+        """Identifiers of all PQRS that currently hold bookings."""
+        self._load()
+        with self._lock:
+            return set(self._pqrs_resources)
+
+    def get_workload_hours(self, resource_type: str, resource_id: str,
+                           start: Optional[datetime] = None, end: Optional[datetime] = None) -> float:
+        """Booked hours for a resource in a window (default: the next 7 days)."""
+        self._load()
+        start = start or datetime.now()
+        end = end or start + timedelta(days=7)
+
+        with self._lock:
+            schedule = self._schedules.get((resource_type, str(resource_id)))
+            if schedule is None:
+                return 0.0
+            return round(schedule.booked_seconds(start.timestamp(), end.timestamp()) / 3600, 2)
+
+    def get_bookings(self, resource_type: Optional[str] = None, resource_ids: Optional[List[str]] = None,
+                     start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Bookings overlapping a window, optionally limited to some resources."""
+        self._load()
+        start_ts = start.timestamp() if start else float("-inf")
+        end_ts = end.timestamp() if end else float("inf")
+        wanted = {str(r) for r in resource_ids} if resource_ids is not None else None
+
+        bookings = []
+        with self._lock:
+            for (kind, resource_id), schedule in self._schedules.items():
+                if resource_type and kind != resource_type:
+                    continue
+                if wanted is not None and resource_id not in wanted:
+                    continue
+                for s, e, pqrs_id in schedule.overlapping(start_ts, end_ts):
+                    bookings.append({
+                        "pqrs_id": pqrs_id,
+                        "resource_type": kind,
+                        "resource_id": resource_id,
+                        "start": datetime.fromtimestamp(s).isoformat(),
+                        "end": datetime.fromtimestamp(e).isoformat(),
+                        "hours": round((e - s) / 3600, 2)
+                    })
+
+        return sorted(bookings, key=lambda b: b["start"])
+
+
+# Global instance
+assignment_ledger = AssignmentLedger()
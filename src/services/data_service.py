@@ -1,100 +1,907 @@
 """Data service for loading and processing PQRS data from Excel files."""
 
+import numpy as np
 import pandas as pd
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, Iterator, List, Optional, Any, Tuple, Type, get_args
 import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import replace
 from datetime import datetime
 
+from pydantic import BaseModel
+
 from ..config import settings
 from ..models.pqrs import PQRSRecord, PersonnelRecord, VehicleRecord, ZoneRecord
+from .geo import normalize_name
+from .priority_engine import UrgencyQueue, score_frame
+from .aggregate_cube import CUBE_DIMENSIONS, AggregateCube
+from .date_index import DATE_INDEX_FIELDS, DateRangeIndex, split_date_filters, with_live_days
+from .dataset import DatasetSnapshot, SnapshotRegistry, _as_str
+from .gazetteer import Gazetteer
+from .near_duplicates import DuplicateIndex, duplicate_text
+from .frame_dtypes import accept_values, compact_pqrs, memory_report
+from .storage import PandasBackend, StorageBackend, create_backend
+from .partitioned_store import PartitionedBackend
+from .shared_dataset import shared_store
+from .workbook_reader import WorkbookJobs, iter_source, read_workbook, read_workbooks
 
 logger = logging.getLogger(__name__)
 
+# Dataset name (also the DatasetSnapshot field) -> settings attribute with its workbook
+DATASET_FILES = {
+    "pqrs": "pqrs_data_file",
+    "personnel": "personnel_data_file",
+    "transport": "transport_data_file",
+    "zoning": "zoning_data_file",
+}
+
+# Columns of the PQRS workbook the service uses; the others are not read
+PQRS_COLUMNS = tuple(PQRSRecord.model_fields)
+
+# PQRS history files the out-of-core load streams, besides the workbook
+ARCHIVE_SUFFIXES = (".xlsx", ".csv", ".ndjson", ".jsonl")
+
+
+def records_from_frame(df: pd.DataFrame, model: Type[BaseModel]) -> List[BaseModel]:
+    """Convert a frame to models in one pass, mapping NaN to None and numeric IDs to strings."""
+    str_fields = {
+        name for name, field in model.model_fields.items()
+        if field.annotation is str or str in get_args(field.annotation)
+    }
+    list_fields = {
+        name for name, field in model.model_fields.items()
+        if getattr(field.annotation, "__origin__", None) is list
+    }
+
+    rows = df.astype(object).where(df.notna(), None).to_dict("records")
+    records = []
+    for row in rows:
+        for name in str_fields.intersection(row):
+            value = row[name]
+            if value is not None and not isinstance(value, str):
+                row[name] = _as_str(value)
+        for name in list_fields.intersection(row):
+            value = row[name]
+            if value is None:
+                row[name] = []
+            elif isinstance(value, str):
+                row[name] = [item.strip() for item in value.split(",") if item.strip()]
+        try:
+            records.append(model(**row))
+        except Exception as e:
+            logger.warning(f"Error parsing {model.__name__}: {e}")
+
+    return records
+
 
 class DataService:
-    """Service for loading and managing PQRS-related data."""
+    """Service for loading and managing PQRS-related data.
+
+    Loaded data lives in immutable ``DatasetSnapshot`` generations. Each read
+    takes the current snapshot once (or the one pinned with ``reading()``),
+    so a reload swapping in a new generation never exposes half-loaded state.
+    """
 
     def __init__(self):
         self.data_dir = Path(settings.data_dir)
-        self._pqrs_data: Optional[pd.DataFrame] = None
-        self._personnel_data: Optional[pd.DataFrame] = None
-        self._transport_data: Optional[pd.DataFrame] = None
-        self._zoning_data: Optional[pd.DataFrame] = None
+        self._snapshots = SnapshotRegistry()
+        self._memory = PandasBackend()
+        self._memory_report: Dict[str, Any] = {}
+        self._value_counts: Tuple[int, Dict[str, Dict[Any, int]]] = (-1, {})
+        self._gazetteer: Tuple[int, Optional[Gazetteer]] = (-1, None)
+        self._load_report: Dict[str, Any] = {}
+        default_path = "pqrs_partitions" if settings.storage_backend == "partitioned" else "pqrs_store.db"
+        self.storage = create_backend(
+            settings.storage_backend,
+            settings.storage_path or str(Path(settings.state_dir) / default_path)
+        )
+
+        # Zone-partitioned resource indexes, keyed by normalized zone name.
+        # Rebuilt from each published snapshot; status changes update them in place.
+        self._personnel_by_zone: Dict[str, List[PersonnelRecord]] = {}
+        self._vehicles_by_zone: Dict[str, List[VehicleRecord]] = {}
+        self._personnel_by_id: Dict[str, PersonnelRecord] = {}
+        self._vehicles_by_plate: Dict[str, VehicleRecord] = {}
+        self._zone_availability: Dict[str, Dict[str, int]] = {}
+        self._zone_records: List[ZoneRecord] = []
+        self._resource_lock = threading.Lock()
+        self._update_lock = threading.RLock()
+
+    @property
+    def snapshot(self) -> DatasetSnapshot:
+        """The dataset generation reads should use."""
+        return self._snapshots.current
+
+    @property
+    def generation(self) -> int:
+        """Id of the current dataset generation; changes whenever data or the vector index change."""
+        return self.snapshot.generation
+
+    @property
+    def cube(self) -> AggregateCube:
+        return self.snapshot.cube
+
+    @property
+    def out_of_core(self) -> bool:
+        """Whether the full PQRS table lives in the partitioned store and only active rows in memory."""
+        return isinstance(self.storage, PartitionedBackend)
+
+    @contextmanager
+    def reading(self, snapshot: Optional[DatasetSnapshot] = None) -> Iterator[DatasetSnapshot]:
+        """Pin one generation for a whole request so all its reads agree."""
+        with self._snapshots.reading(snapshot) as pinned:
+            yield pinned
+
+    @contextmanager
+    def updating(self, wait: bool = True) -> Iterator[Optional[DatasetSnapshot]]:
+        """Hold for a whole derive→publish, so no other update is published in between and lost.
+
+        Reads inside are pinned to the published generation, which is yielded
+        as the base to build on. With ``wait`` False, yields None instead of
+        waiting when another update is in progress.
+        """
+        if not self._update_lock.acquire(blocking=wait):
+            yield None
+            return
+        try:
+            with self._snapshots.reading(self._snapshots.published) as base:
+                yield base
+        finally:
+            self._update_lock.release()
+
+    def get_dataset_status(self) -> Dict[str, Any]:
+        """Current generation and generations still being read."""
+        return self._snapshots.status()
+
+    def get_load_report(self) -> Dict[str, Any]:
+        """Rows, columns and read time of each workbook in the last full load."""
+        return self._load_report
+
+    def get_memory_report(self) -> Dict[str, Any]:
+        """Per-column bytes of the last PQRS workbook read, before and after dtype compaction."""
+        return self._memory_report
 
     def load_all_data(self) -> Dict[str, int]:
-        """Load all Excel files and return statistics."""
+        """Load all Excel files into a new generation and publish it."""
+        with self.updating():
+            snapshot, stats = self.load_snapshot()
+            self.publish(snapshot)
+        return stats
+
+    def load_snapshot(self) -> Tuple[DatasetSnapshot, Dict[str, int]]:
+        """Read all Excel files into a new, unpublished snapshot.
+
+        Files that are missing keep the frame of the current generation. The
+        current vector index handle is carried over.
+        """
+        if self.out_of_core:
+            return self._load_out_of_core()
+
         stats = {}
+        current = self._snapshots.current
 
         try:
+            frames = self._load_frames()
+
             # Load PQRS data
-            pqrs_path = self.data_dir / settings.pqrs_data_file
-            if pqrs_path.exists():
-                self._pqrs_data = pd.read_excel(pqrs_path)
-                # Clean column names
-                self._pqrs_data.columns = self._pqrs_data.columns.str.strip().str.lower()
-                stats['pqrs_records'] = len(self._pqrs_data)
+            pqrs = frames["pqrs"]
+            if pqrs is not None:
+                stats['pqrs_records'] = len(pqrs)
                 logger.info(f"Loaded {stats['pqrs_records']} PQRS records")
             else:
-                logger.warning(f"PQRS data file not found: {pqrs_path}")
+                logger.warning(f"PQRS data file not found: {self.data_dir / settings.pqrs_data_file}")
+                pqrs = current.pqrs
 
             # Load personnel data
-            personnel_path = self.data_dir / settings.personnel_data_file
-            if personnel_path.exists():
-                self._personnel_data = pd.read_excel(personnel_path)
-                self._personnel_data.columns = self._personnel_data.columns.str.strip().str.lower()
-                stats['personnel_records'] = len(self._personnel_data)
+            personnel = frames["personnel"]
+            if personnel is not None:
+                stats['personnel_records'] = len(personnel)
                 logger.info(f"Loaded {stats['personnel_records']} personnel records")
+            else:
+                personnel = current.personnel
 
             # Load transport data
-            transport_path = self.data_dir / settings.transport_data_file
-            if transport_path.exists():
-                self._transport_data = pd.read_excel(transport_path)
-                self._transport_data.columns = self._transport_data.columns.str.strip().str.lower()
-                stats['transport_records'] = len(self._transport_data)
+            transport = frames["transport"]
+            if transport is not None:
+                stats['transport_records'] = len(transport)
                 logger.info(f"Loaded {stats['transport_records']} transport records")
+            else:
+                transport = current.transport
 
             # Load zoning data
-            zoning_path = self.data_dir / settings.zoning_data_file
-            if zoning_path.exists():
-                self._zoning_data = pd.read_excel(zoning_path)
-                self._zoning_data.columns = self._zoning_data.columns.str.strip().str.lower()
-                stats['zoning_records'] = len(self._zoning_data)
+            zoning = frames["zoning"]
+            if zoning is not None:
+                stats['zoning_records'] = len(zoning)
                 logger.info(f"Loaded {stats['zoning_records']} zoning records")
+            else:
+                zoning = current.zoning
+
+            # A PQRS frame mapped from the shared store was scored when it was written
+            scored_at = shared_store.details.get("scored_at") if frames["pqrs"] is not None else None
+            snapshot = self.build_snapshot(pqrs, personnel, transport, zoning, vectorstore=current.vectorstore,
+                                           scored_at=datetime.fromisoformat(scored_at) if scored_at else None)
 
         except Exception as e:
             logger.error(f"Error loading data: {e}")
             raise
 
-        return stats
+        return snapshot, stats
+
+    def _load_frames(self) -> Dict[str, Optional[pd.DataFrame]]:
+        """Cleaned frames of all workbooks, mapped from the shared Arrow store when it is enabled.
+
+        The shared PQRS frame is stored already scored, and the memory report
+        of the worker that wrote it is kept with it.
+        """
+        if shared_store.enabled:
+            sources = {dataset: self.data_dir / getattr(settings, attr) for dataset, attr in DATASET_FILES.items()}
+            started = datetime.now()
+            frames = shared_store.load_or_build(
+                self._read_scored_workbooks, shared_store.source_fingerprint(sources),
+                details=lambda: {"memory_report": self._memory_report, "scored_at": started.isoformat()}
+            )
+            self._memory_report = shared_store.details.get("memory_report", {})
+            return frames
+        return self._read_workbooks()
+
+    def _read_scored_workbooks(self) -> Dict[str, Optional[pd.DataFrame]]:
+        frames = self._read_workbooks()
+        if frames["pqrs"] is not None:
+            frames["pqrs"] = self._score_pqrs(frames["pqrs"])
+        return frames
+
+    def _load_out_of_core(self) -> Tuple[DatasetSnapshot, Dict[str, int]]:
+        """Read the small workbooks whole and stream the PQRS sources into a new partitioned version."""
+        current = self._snapshots.current
+        frames = self._read_workbooks([dataset for dataset in DATASET_FILES if dataset != "pqrs"])
+        stats = {f"{dataset}_records": len(frame) for dataset, frame in frames.items() if frame is not None}
+        base = replace(current, **{dataset: frame for dataset, frame in frames.items() if frame is not None})
+
+        snapshot = self.stream_pqrs(base)
+        if snapshot is None:
+            logger.warning(f"No PQRS sources found in {self.data_dir}")
+            snapshot = replace(base, generation=self._snapshots.next_generation(), loaded_at=datetime.now())
+        else:
+            stats["pqrs_records"] = snapshot.cube.total()
+            logger.info(f"Loaded {stats['pqrs_records']} PQRS records ({len(snapshot.pqrs)} in memory)")
+        return snapshot, stats
+
+    def _pqrs_sources(self) -> List[Path]:
+        """Archived PQRS history files, oldest name first, then the current PQRS workbook."""
+        sources = []
+        if settings.pqrs_archive_dir and Path(settings.pqrs_archive_dir).is_dir():
+            sources = sorted(path for path in Path(settings.pqrs_archive_dir).iterdir()
+                             if path.suffix.lower() in ARCHIVE_SUFFIXES)
+        workbook = self.data_dir / settings.pqrs_data_file
+        return sources + [workbook] if workbook.exists() else sources
+
+    def stream_pqrs(self, base: DatasetSnapshot) -> Optional[DatasetSnapshot]:
+        """A new unpublished generation whose PQRS table is streamed from its sources into the partitioned store.
+
+        Sources are read ``load_chunk_rows`` rows at a time; each chunk is
+        scored, counted into the cube and written to its partitions, and only
+        its active rows are kept in memory. The other datasets and the vector
+        index handle come from ``base``. Returns None when there are no sources.
+        """
+        sources = self._pqrs_sources()
+        if not sources:
+            return None
+
+        cube = AggregateCube()
+        active: List[pd.DataFrame] = []
+
+        def chunks() -> Iterator[pd.DataFrame]:
+            for path in sources:
+                for chunk in iter_source(str(path), PQRS_COLUMNS, settings.load_chunk_rows):
+                    chunk = self._score_pqrs(compact_pqrs(chunk, intern=False))
+                    cube.add_rows(chunk)
+                    active.append(chunk[chunk["estado"] == "activo"] if "estado" in chunk.columns else chunk)
+                    yield chunk
+
+        started = time.perf_counter()
+        columns = list(dict.fromkeys(PQRS_COLUMNS + ("urgency_score", "priority")))
+        version, rows = self.storage.write_version(chunks(), columns=columns)
+        self._load_report = {
+            **self._load_report,
+            "pqrs_stream": {"sources": [path.name for path in sources], "rows": rows, "version": version,
+                            "wall_ms": round((time.perf_counter() - started) * 1000, 1)}
+        }
+
+        pqrs = compact_pqrs(pd.concat(active, ignore_index=True), intern=False)
+        snapshot = self.build_snapshot(pqrs, base.personnel, base.transport, base.zoning,
+                                       vectorstore=base.vectorstore)
+        return replace(snapshot, cube=cube, partitions=version)
+
+    def iter_pqrs_records(self, filters: Optional[Dict[str, Any]] = None,
+                          chunk_rows: int = 1000) -> Iterator[List[PQRSRecord]]:
+        """Records matching ``filters`` in batches of at most ``chunk_rows``, read lazily from storage.
+
+        The whole stream reads the generation that was current when it
+        started and holds it as a reader until it ends, so the partitioned
+        store keeps that version on disk through any number of reloads.
+        """
+        snapshot = self.snapshot
+        if snapshot.pqrs is None:
+            return
+        with self._snapshots.holding(snapshot):
+            for df in self._backend(snapshot).iter_select(snapshot, filters, chunk_rows=chunk_rows):
+                yield records_from_frame(with_live_days(df), PQRSRecord)
+
+    def _workbook_jobs(self, datasets) -> WorkbookJobs:
+        return {
+            dataset: (str(self.data_dir / getattr(settings, DATASET_FILES[dataset])),
+                      PQRS_COLUMNS if dataset == "pqrs" else None)
+            for dataset in datasets
+        }
+
+    def _read_workbooks(self, datasets=tuple(DATASET_FILES)) -> Dict[str, Optional[pd.DataFrame]]:
+        """Read the workbooks of ``datasets`` (all by default) in parallel worker processes."""
+        started = time.perf_counter()
+        jobs = self._workbook_jobs(datasets)
+        results = read_workbooks(jobs, settings.load_workers)
+        wall_ms = round((time.perf_counter() - started) * 1000, 1)
+
+        self._load_report = {
+            "workers": settings.load_workers,
+            "wall_ms": wall_ms,
+            "files": {
+                dataset: {
+                    "file": Path(jobs[dataset][0]).name,
+                    "rows": len(frame),
+                    "columns": len(frame.columns),
+                    "read_ms": round(seconds * 1000, 1)
+                }
+                for dataset, (frame, seconds) in results.items() if frame is not None
+            }
+        }
+        logger.info(f"Read workbooks in {wall_ms}ms: " + ", ".join(
+            f"{dataset} {file['read_ms']}ms" for dataset, file in self._load_report["files"].items()))
+
+        return {dataset: self._cleaned(dataset, frame) for dataset, (frame, _) in results.items()}
+
+    def read_dataset(self, dataset: str) -> Optional[pd.DataFrame]:
+        """Read the workbook of one dataset (``pqrs``, ``personnel``, ``transport`` or ``zoning``)."""
+        if dataset not in DATASET_FILES:
+            raise ValueError(f"Unknown dataset '{dataset}'; expected one of {list(DATASET_FILES)}")
+        frame, _ = read_workbook(*self._workbook_jobs([dataset])[dataset])
+        return self._cleaned(dataset, frame)
+
+    def _cleaned(self, dataset: str, frame: Optional[pd.DataFrame]) -> Optional[pd.DataFrame]:
+        """Compact the PQRS frame's dtypes, recording the memory they save."""
+        if dataset == "pqrs" and frame is not None:
+            compacted = compact_pqrs(frame)
+            self._memory_report = memory_report(frame, compacted)
+            logger.info(f"Compacted PQRS frame from {self._memory_report['total_bytes_before']} "
+                        f"to {self._memory_report['total_bytes_after']} bytes")
+            frame = compacted
+        return frame
+
+    def replace_dataset(self, dataset: str, frame: pd.DataFrame) -> DatasetSnapshot:
+        """A new unpublished generation where only one dataset's frame is replaced."""
+        current = self._snapshots.current
+        if dataset == "pqrs":
+            return self.build_snapshot(frame, current.personnel, current.transport, current.zoning,
+                                       vectorstore=current.vectorstore)
+        if dataset not in DATASET_FILES:
+            raise ValueError(f"Unknown dataset '{dataset}'; expected one of {list(DATASET_FILES)}")
+        return replace(current, generation=self._snapshots.next_generation(), loaded_at=datetime.now(),
+                       **{dataset: frame})
+
+    def changed_pqrs_rows(self, frame: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """Rows of a fresh PQRS export that are new or differ from the current generation.
+
+        Returns None when the export cannot be applied as an upsert, i.e. it
+        drops radicados or adds columns.
+        """
+        key = "numero_radicado_entrada"
+        current = self._snapshots.current
+        if current.pqrs is None or key not in frame.columns:
+            return None
+        if not set(frame.columns) <= set(current.pqrs.columns):
+            return None
+
+        radicados = frame[key].map(_as_str)
+        if set(current.radicado_positions) - set(radicados):
+            return None
+        return frame[self._changed_mask(current, frame, radicados)]
+
+    def pqrs_changes(self, frame: pd.DataFrame) -> Tuple[List[str], List[str]]:
+        """Radicados of a full PQRS export that are new or changed, and those it no longer has.
+
+        Rows are compared on the columns the export shares with the current generation.
+        """
+        key = "numero_radicado_entrada"
+        current = self._snapshots.published
+        radicados = frame[key].map(_as_str)
+        if current.pqrs is None:
+            return radicados.tolist(), []
+        changed = self._changed_mask(current, frame, radicados)
+        return radicados[changed].tolist(), sorted(set(current.radicado_positions) - set(radicados))
+
+    @staticmethod
+    def _changed_mask(current: DatasetSnapshot, frame: pd.DataFrame, radicados: pd.Series) -> np.ndarray:
+        """Rows of ``frame`` that are new or differ from the current generation."""
+        positions = [current.radicado_positions.get(r) for r in radicados]
+        known = np.array([p is not None for p in positions], dtype=bool)
+        columns = [c for c in frame.columns if c in current.pqrs.columns]
+        old_hashes = pd.util.hash_pandas_object(
+            current.pqrs.iloc[[p for p in positions if p is not None]][columns], index=False).to_numpy()
+        new_hashes = pd.util.hash_pandas_object(frame[known][columns], index=False).to_numpy()
+
+        changed = ~known
+        changed[known] = old_hashes != new_hashes
+        return changed
+
+    def build_snapshot(self, pqrs: Optional[pd.DataFrame] = None, personnel: Optional[pd.DataFrame] = None,
+                       transport: Optional[pd.DataFrame] = None, zoning: Optional[pd.DataFrame] = None,
+                       vectorstore: Any = None, scored_at: Optional[datetime] = None) -> DatasetSnapshot:
+        """Derive scores and indexes for a set of frames and wrap them in a new generation.
+
+        With ``scored_at``, ``pqrs`` is a frame of the shared store, scored
+        then; its indexes are built by one worker and unpickled by the others.
+        """
+        indexes: Dict[str, Any] = {}
+        if pqrs is not None and scored_at is not None:
+            indexes = shared_store.shared("pqrs_indexes", lambda: self._pqrs_indexes(pqrs))
+        elif pqrs is not None:
+            pqrs = self._score_pqrs(pqrs)
+            indexes = self._pqrs_indexes(pqrs)
+
+        return DatasetSnapshot(
+            generation=self._snapshots.next_generation(),
+            scored_at=scored_at or datetime.now(),
+            pqrs=pqrs,
+            personnel=personnel,
+            transport=transport,
+            zoning=zoning,
+            vectorstore=vectorstore,
+            **indexes
+        )
+
+    def _pqrs_indexes(self, pqrs: pd.DataFrame) -> Dict[str, Any]:
+        """Urgency queue, near-duplicate, radicado and date indexes and cube of a scored PQRS frame."""
+        radicados = pqrs["numero_radicado_entrada"] if "numero_radicado_entrada" in pqrs.columns else []
+        dates = [field for field in DATE_INDEX_FIELDS if field in pqrs.columns]
+        cube = AggregateCube()
+        cube.build(pqrs)
+        return {
+            "radicado_positions": {_as_str(r): i for i, r in enumerate(radicados) if pd.notna(r)},
+            "date_indexes": {field: DateRangeIndex(pqrs[field]) for field in dates},
+            "urgency_queue": self._build_urgency_queue(pqrs),
+            "duplicates": DuplicateIndex(*self._duplicate_entries(pqrs), threshold=settings.duplicate_similarity),
+            "cube": cube,
+        }
+
+    def publish(self, snapshot: DatasetSnapshot, on_retired: Optional[Callable[[], None]] = None,
+                changed_radicados: Optional[List[str]] = None):
+        """Atomically make ``snapshot`` the current generation.
+
+        Only the resource indexes whose personnel, transport or zoning frame
+        changed are rebuilt, so other updates keep live resource statuses.
+        The storage backend is brought up to date first; ``changed_radicados``
+        lets it rewrite only those PQRS rows. Callers that built ``snapshot``
+        from the published generation should hold ``updating()`` across both.
+        """
+        with self._update_lock:
+            self._publish(snapshot, on_retired, changed_radicados)
+
+    def _publish(self, snapshot: DatasetSnapshot, on_retired: Optional[Callable[[], None]],
+                 changed_radicados: Optional[List[str]]):
+        try:
+            self.storage.publish(snapshot, changed_radicados)
+        except Exception as e:
+            # Reads of this generation fall back to its in-memory frames
+            logger.error(f"Storage backend '{self.storage.name}' failed to store generation {snapshot.generation}: {e}")
+
+        current = self._snapshots.published
+        changed = {name for name in ("personnel", "transport", "zoning")
+                   if getattr(snapshot, name) is not getattr(current, name)}
+        resources = self._build_resource_indexes(snapshot, changed) if changed else None
+        with self._resource_lock:
+            if resources is not None:
+                (self._personnel_by_zone, self._vehicles_by_zone, self._personnel_by_id,
+                 self._vehicles_by_plate, self._zone_records) = resources
+                # Recounted under the lock so no status change between build and swap is lost
+                self._zone_availability = self._count_available(self._personnel_by_zone, self._vehicles_by_zone)
+            previous = self._snapshots.published
+
+            def retired():
+                self.storage.retire(previous)
+                if on_retired is not None:
+                    on_retired()
+
+            self._snapshots.publish(snapshot, retired)
 
-    def get_pqrs_records(self, filters: Optional[Dict[str, Any]] = None) -> List[PQRSRecord]:
-        """Get PQRS records with optional filtering."""
-        if self._pqrs_data is None:
+    def attach_vectorstore(self, vectorstore: Any, on_retired: Optional[Callable[[], None]] = None) -> DatasetSnapshot:
+        """Publish a new generation of the current data that uses another vector index."""
+        with self.updating() as current:
+            snapshot = replace(current, generation=self._snapshots.next_generation(), vectorstore=vectorstore)
+            self.publish(snapshot, on_retired)
+        return snapshot
+
+    def upsert_pqrs(self, delta: pd.DataFrame) -> Tuple[DatasetSnapshot, Dict[str, Any]]:
+        """Apply new and updated PQRS rows, keyed by radicado, to a new unpublished generation.
+
+        Non-empty delta values overwrite those of an existing PQRS, so sparse
+        records only touch the fields they carry; unknown radicados are appended. Only the changed rows are rescored and
+        re-indexed; the date indexes, urgency queue and cube of the current
+        generation are patched into copies. Out of core, archived rows the
+        delta updates are first read back from the partitioned store, and the
+        changed rows are written to a new version of it.
+        """
+        key = "numero_radicado_entrada"
+        delta = delta.copy()
+        delta.columns = delta.columns.str.strip().str.lower()
+        if key not in delta.columns:
+            raise ValueError(f"Delta rows need a '{key}' column")
+
+        delta = delta[delta[key].notna()]
+        delta = delta[~delta[key].map(_as_str).duplicated(keep="last")].reset_index(drop=True)
+
+        current = self._snapshots.current
+        pqrs = current.pqrs
+        if pqrs is None:
+            snapshot = self.build_snapshot(compact_pqrs(delta), current.personnel, current.transport, current.zoning,
+                                           vectorstore=current.vectorstore)
+            return snapshot, {"received": len(delta), "inserted": len(delta), "updated": 0,
+                              "radicados": delta[key].map(_as_str).tolist()}
+
+        radicados = delta[key].map(_as_str)
+        known_positions = current.radicado_positions
+        if current.partitions is not None:
+            pqrs, known_positions = self._with_archived_rows(current, radicados)
+
+        # Parse dates the way they are stored in the current frame
+        for column in delta.columns:
+            if column in pqrs.columns and pd.api.types.is_datetime64_any_dtype(pqrs[column]):
+                delta[column] = pd.to_datetime(delta[column], errors="coerce")
+
+        existing = [known_positions.get(r) for r in radicados]
+        is_update = np.array([p is not None for p in existing], dtype=bool)
+        updated_positions = np.array([p for p in existing if p is not None], dtype=int)
+        previous_rows = pqrs.iloc[updated_positions]
+
+        frame = pqrs.copy()
+        updates = delta[is_update]
+        if len(updates):
+            labels = frame.index[updated_positions]
+            for column in updates.columns.drop(key):
+                given = updates[column].notna().to_numpy()
+                if not given.any():
+                    continue
+                values = updates[column].to_numpy()[given]
+                try:
+                    frame.loc[labels[given], column] = values
+                except TypeError:
+                    frame[column] = accept_values(frame[column], values)
+                    frame.loc[labels[given], column] = values
+        inserts = delta[~is_update]
+        if len(inserts):
+            # Restores the compact dtypes the concatenation widened
+            frame = compact_pqrs(pd.concat([frame, inserts], ignore_index=True), intern=False)
+
+        changed = np.concatenate([updated_positions, np.arange(len(pqrs), len(frame))]).astype(int)
+        labels = frame.index[changed]
+        scored = score_frame(frame.iloc[changed])
+        frame.loc[labels, "urgency_score"] = scored["urgency_score"].to_numpy()
+        frame.loc[labels, "priority"] = scored["priority"].to_numpy()
+        changed_rows = frame.iloc[changed]
+
+        radicado_positions = dict(known_positions)
+        radicado_positions.update(zip(radicados[~is_update], range(len(pqrs), len(frame))))
+
+        date_indexes = {
+            field: (current.date_indexes[field].with_rows(changed, changed_rows[field])
+                    if field in current.date_indexes else DateRangeIndex(frame[field]))
+            for field in DATE_INDEX_FIELDS if field in frame.columns
+        }
+
+        if current.urgency_queue is None:
+            urgency_queue = self._build_urgency_queue(frame)
+        else:
+            active = changed_rows
+            if "estado" in active.columns:
+                active = active[active["estado"] == "activo"]
+            zone_of = lambda rows: rows["comuna_hecho"] if "comuna_hecho" in rows.columns else [None] * len(rows)
+            urgency_queue = current.urgency_queue.with_changes(
+                removed=zip(previous_rows[key].map(_as_str), zone_of(previous_rows)),
+                added=zip(active[key].map(_as_str), active["urgency_score"], zone_of(active))
+            )
+
+        if current.duplicates is None:
+            duplicates = DuplicateIndex(*self._duplicate_entries(frame), threshold=settings.duplicate_similarity)
+        else:
+            duplicates = current.duplicates.with_changes(
+                removed=previous_rows[key].map(_as_str),
+                added=zip(*self._duplicate_entries(changed_rows))
+            )
+
+        cube = current.cube.copy()
+        cube.remove_rows(previous_rows)
+        cube.add_rows(changed_rows)
+
+        snapshot = replace(
+            current,
+            generation=self._snapshots.next_generation(),
+            loaded_at=datetime.now(),
+            pqrs=frame,
+            radicado_positions=radicado_positions,
+            date_indexes=date_indexes,
+            urgency_queue=urgency_queue,
+            duplicates=duplicates,
+            cube=cube
+        )
+        summary = {
+            "received": len(delta),
+            "inserted": int((~is_update).sum()),
+            "updated": int(is_update.sum()),
+            "radicados": radicados.tolist()
+        }
+        return self._with_stored_changes(snapshot, summary["radicados"]), summary
+
+    def _with_stored_changes(self, snapshot: DatasetSnapshot, radicados: List[str]) -> DatasetSnapshot:
+        """Out of core, ``snapshot`` on a new partitioned-store version holding its changed rows.
+
+        The version it was derived from stays as it is for the requests still
+        reading it; publishing the returned snapshot activates the new one.
+        """
+        if snapshot.partitions is None or not radicados or not self.storage.serves(snapshot):
+            return snapshot
+        return replace(snapshot, partitions=self.storage.write_changes(snapshot, radicados))
+
+    def _with_archived_rows(self, snapshot: DatasetSnapshot,
+                            radicados: pd.Series) -> Tuple[pd.DataFrame, Dict[str, int]]:
+        """The in-memory PQRS frame and radicado index extended with stored rows of ``radicados``."""
+        key = "numero_radicado_entrada"
+        missing = [r for r in radicados if r not in snapshot.radicado_positions]
+        if not missing or not self.storage.serves(snapshot):
+            return snapshot.pqrs, snapshot.radicado_positions
+
+        archived = self.storage.select(snapshot, {key: missing})
+        if not len(archived):
+            return snapshot.pqrs, snapshot.radicado_positions
+
+        pqrs = compact_pqrs(pd.concat([snapshot.pqrs, archived], ignore_index=True), intern=False)
+        positions = dict(snapshot.radicado_positions)
+        positions.update((_as_str(r), i) for i, r in enumerate(archived[key], start=len(snapshot.pqrs)))
+        return pqrs, positions
+
+    def _build_resource_indexes(self, snapshot: DatasetSnapshot, changed: set) -> tuple:
+        """Zone buckets of ready-made resource records, by zone and by ID.
+
+        Buckets are rebuilt from the frames in ``changed``; the others are kept
+        as they are, with their live statuses.
+        """
+        with self._resource_lock:
+            personnel_by_zone, vehicles_by_zone = self._personnel_by_zone, self._vehicles_by_zone
+            personnel_by_id, vehicles_by_plate = self._personnel_by_id, self._vehicles_by_plate
+            zones = self._zone_records
+
+        if "personnel" in changed:
+            personnel = records_from_frame(snapshot.personnel, PersonnelRecord) if snapshot.personnel is not None else []
+            personnel_by_zone, personnel_by_id = self._bucket_by_zone(personnel), {p.employee_id: p for p in personnel}
+        if "transport" in changed:
+            vehicles = records_from_frame(snapshot.transport, VehicleRecord) if snapshot.transport is not None else []
+            vehicles_by_zone, vehicles_by_plate = self._bucket_by_zone(vehicles), {v.license_plate: v for v in vehicles}
+        if "zoning" in changed:
+            zones = records_from_frame(snapshot.zoning, ZoneRecord) if snapshot.zoning is not None else []
+
+        logger.info(f"Indexed {len(personnel_by_id)} personnel and {len(vehicles_by_plate)} vehicles")
+        return personnel_by_zone, vehicles_by_zone, personnel_by_id, vehicles_by_plate, zones
+
+    @staticmethod
+    def _count_available(personnel_by_zone: Dict[str, List[PersonnelRecord]],
+                         vehicles_by_zone: Dict[str, List[VehicleRecord]]) -> Dict[str, Dict[str, int]]:
+        availability: Dict[str, Dict[str, int]] = {}
+        for resource, by_zone in (("personnel", personnel_by_zone), ("vehicles", vehicles_by_zone)):
+            for key, bucket in by_zone.items():
+                counts = availability.setdefault(key, {"personnel": 0, "vehicles": 0})
+                counts[resource] += sum(record.status == "available" for record in bucket)
+        return availability
+
+    @staticmethod
+    def _bucket_by_zone(records: List[Any]) -> Dict[str, List[Any]]:
+        by_zone: Dict[str, List[Any]] = {}
+        for record in records:
+            by_zone.setdefault(normalize_name(record.zone), []).append(record)
+        return by_zone
+
+    @staticmethod
+    def _score_pqrs(pqrs: pd.DataFrame) -> pd.DataFrame:
+        """Copy of the frame with urgency score and priority columns."""
+        scored = score_frame(pqrs)
+        return pqrs.assign(urgency_score=scored["urgency_score"], priority=scored["priority"])
+
+    @staticmethod
+    def _build_urgency_queue(pqrs: pd.DataFrame) -> UrgencyQueue:
+        """Index active PQRS by zone in descending urgency."""
+        active = pqrs
+        if "estado" in active.columns:
+            active = active[active["estado"] == "activo"]
+        zones = active["comuna_hecho"] if "comuna_hecho" in active.columns else [None] * len(active)
+
+        queue = UrgencyQueue(active["numero_radicado_entrada"].map(_as_str), active["urgency_score"], zones)
+        logger.info(f"Scored {len(pqrs)} PQRS ({len(queue)} active in urgency queue)")
+        return queue
+
+    @staticmethod
+    def _duplicate_entries(pqrs: pd.DataFrame) -> Tuple[List[str], List[str], List[Optional[str]]]:
+        """Radicados, near-duplicate texts and communes of the active PQRS in a frame."""
+        active = pqrs
+        if "estado" in active.columns:
+            active = active[active["estado"] == "activo"]
+        column = lambda name: (active[name].astype(object).where(active[name].notna(), None).tolist()
+                               if name in active.columns else [None] * len(active))
+        texts = [duplicate_text(asunto, direccion)
+                 for asunto, direccion in zip(column("asunto"), column("direccion_hecho"))]
+        return active["numero_radicado_entrada"].map(_as_str).tolist(), texts, column("comuna_hecho")
+
+    def get_duplicate_cluster(self, radicado: str) -> Tuple[Optional[str], List[str]]:
+        """Near-duplicate cluster of an active PQRS and its members, or ``(None, [])`` if it has none."""
+        duplicates = self.snapshot.duplicates
+        cluster = duplicates.cluster_of(_as_str(radicado)) if duplicates is not None else None
+        return cluster, duplicates.members(cluster) if cluster else []
+
+    def refresh_urgency(self, now: Optional[datetime] = None, wait: bool = True) -> Optional[DatasetSnapshot]:
+        """Rescore the active PQRS against ``now`` and publish the result as a new generation.
+
+        Elapsed days and the SLA component move with the date, so scores taken
+        at load time go stale. Only rows whose score or priority changed are
+        rewritten in the storage backend. Returns the published snapshot, or
+        None when there is nothing to score or, with ``wait`` False, another
+        update is in progress.
+        """
+        now = now or datetime.now()
+        key = "numero_radicado_entrada"
+        with self.updating(wait) as current:
+            if current is None or current.pqrs is None or key not in current.pqrs.columns:
+                return None
+
+            frame = current.pqrs
+            active = frame["estado"] == "activo" if "estado" in frame.columns else pd.Series(True, index=frame.index)
+            scored = score_frame(frame[active], now)
+            changed = ((scored["urgency_score"] != frame.loc[active, "urgency_score"]) |
+                       (scored["priority"] != frame.loc[active, "priority"]))
+            labels = changed.index[changed.to_numpy()]
+
+            frame = frame.copy()
+            frame.loc[labels, "urgency_score"] = scored.loc[labels, "urgency_score"]
+            frame.loc[labels, "priority"] = scored.loc[labels, "priority"]
+            snapshot = replace(
+                current,
+                generation=self._snapshots.next_generation(),
+                pqrs=frame,
+                urgency_queue=self._build_urgency_queue(frame),
+                scored_at=now
+            )
+            changed_radicados = frame.loc[labels, key].map(_as_str).tolist()
+            snapshot = self._with_stored_changes(snapshot, changed_radicados)
+            self.publish(snapshot, changed_radicados=changed_radicados)
+
+        logger.info(f"Rescored active PQRS: {len(labels)} scores changed")
+        return snapshot
+
+    def get_most_urgent(self, zone: Optional[str] = None, n: int = 10,
+                        exclude: Optional[set] = None) -> List[PQRSRecord]:
+        """The ``n`` most urgent active PQRS, optionally within one commune, most urgent first.
+
+        Scores older than ``URGENCY_REFRESH_SECONDS`` are recomputed first.
+        """
+        snapshot = self.snapshot
+        age = (datetime.now() - snapshot.scored_at).total_seconds()
+        if snapshot.pqrs is not None and age >= settings.urgency_refresh_seconds \
+                and snapshot is self._snapshots.published:
+            # A request does not wait for an ingest to finish just to rescore
+            snapshot = self.refresh_urgency(wait=False) or snapshot
+        if snapshot.urgency_queue is None:
+            return []
+
+        ranked = [radicado for radicado, _ in snapshot.urgency_queue.top(n, zone, exclude)]
+        if not ranked:
+            return []
+
+        records = self._records(snapshot, {"numero_radicado_entrada": ranked})
+        by_id = {r.numero_radicado_entrada: r for r in records}
+        return [by_id[radicado] for radicado in ranked if radicado in by_id]
+
+    def _backend(self, snapshot: DatasetSnapshot) -> StorageBackend:
+        """The configured backend when it holds ``snapshot``, else the snapshot's own frames."""
+        return self.storage if self.storage.serves(snapshot) else self._memory
+
+    def _records(self, snapshot: DatasetSnapshot, filters: Optional[Dict[str, Any]],
+                 limit: Optional[int] = None, order_by: Optional[str] = None) -> List[PQRSRecord]:
+        if snapshot.pqrs is None:
             return []
 
-        df = self._pqrs_data.copy()
-
-        # Apply filters
-        if filters:
-            for key, value in filters.items():
-                if key in df.columns:
-                    if isinstance(value, list):
-                        df = df[df[key].isin(value)]
-                    else:
-                        df = df[df[key] == value]
-
-        # Convert to Pydantic models
-        records = []
-        for _, row in df.iterrows():
-            try:
-                record = PQRSRecord(**row.to_dict())
-                records.append(record)
-            except Exception as e:
-                logger.warning(f"Error parsing PQRS record: {e}")
-                continue
-
-        return records
+        df = self._backend(snapshot).select(snapshot, filters, limit, order_by)
+        return records_from_frame(with_live_days(df), PQRSRecord)
+
+    def get_pqrs_records(self, filters: Optional[Dict[str, Any]] = None, limit: Optional[int] = None,
+                         order_by: Optional[str] = None) -> List[PQRSRecord]:
+        """Get PQRS records with optional filtering.
+
+        Besides column equality filters, accepts the date-range filters of
+        ``split_date_filters`` (``fecha_radicacion_from``, ``overdue``,
+        ``due_within_days``...). ``order_by`` is a column name, prefixed with
+        ``-`` for descending order. Elapsed and remaining days are computed
+        against the current date.
+        """
+        return self._records(self.snapshot, filters, limit, order_by)
+
+    def count_pqrs(self, filters: Optional[Dict[str, Any]] = None) -> int:
+        """Number of PQRS matching the filters, without building records."""
+        snapshot = self.snapshot
+        if snapshot.pqrs is None:
+            return 0
+        return self._backend(snapshot).count(snapshot, filters)
+
+    def estimate_pqrs_count(self, filters: Optional[Dict[str, Any]] = None) -> int:
+        """Estimated number of PQRS matching the filters, from column statistics instead of a scan.
+
+        Filters on cube dimensions are counted exactly by the aggregate cube;
+        other equality filters and date ranges scale that count by the share
+        of in-memory rows they match, as if the columns were independent.
+        """
+        snapshot = self.snapshot
+        if snapshot.pqrs is None or not len(snapshot.pqrs):
+            return 0
+
+        ranges, equality = split_date_filters(filters)
+        rows = len(snapshot.pqrs)
+        estimate = float(snapshot.cube.total({k: v for k, v in equality.items() if k in CUBE_DIMENSIONS}))
+
+        for column, value in equality.items():
+            values = value if isinstance(value, list) else [value]
+            if column == "numero_radicado_entrada":
+                estimate = min(estimate, len(values))
+            elif column not in CUBE_DIMENSIONS and column in snapshot.pqrs.columns:
+                counts = self._column_value_counts(snapshot, column)
+                estimate *= sum(counts.get(v, 0) for v in values) / rows
+
+        for field, (start, end) in ranges.items():
+            if field in snapshot.date_indexes:
+                estimate *= len(snapshot.date_indexes[field].between(start, end)) / rows
+
+        return int(round(estimate))
+
+    def _column_value_counts(self, snapshot: DatasetSnapshot, column: str) -> Dict[Any, int]:
+        """``{value: rows}`` of a PQRS column, computed once per generation."""
+        generation, counts = self._value_counts
+        if generation != snapshot.generation:
+            counts = {}
+            self._value_counts = (snapshot.generation, counts)
+        if column not in counts:
+            counts[column] = snapshot.pqrs[column].value_counts().to_dict()
+        return counts[column]
+
+    def gazetteer(self) -> Gazetteer:
+        """Matcher of the names known in the current generation, built on its first use."""
+        snapshot = self.snapshot
+        generation, gazetteer = self._gazetteer
+        if generation != snapshot.generation or gazetteer is None:
+            gazetteer = Gazetteer.from_frames(snapshot.pqrs, snapshot.zoning)
+            self._gazetteer = (snapshot.generation, gazetteer)
+        return gazetteer
+
+    def matching_radicados(self, filters: Optional[Dict[str, Any]] = None) -> set:
+        """Radicados of the PQRS matching the filters."""
+        snapshot = self.snapshot
+        if snapshot.pqrs is None:
+            return set()
+        key = "numero_radicado_entrada"
+        values = self._backend(snapshot).select(snapshot, filters, columns=[key])[key]
+        return {_as_str(r) for r in values if pd.notna(r)}
+
+    def aggregate_pqrs(self, group_by: List[str], filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """PQRS counts grouped by cube dimensions (estado, tipo_solicitud, comuna_hecho, ano, mes)."""
+        snapshot = self.snapshot
+        return self._backend(snapshot).aggregate(snapshot, group_by, filters)
+
+    def get_storage_status(self) -> Dict[str, Any]:
+        return self.storage.status()
 
     def get_active_pqrs(self) -> List[PQRSRecord]:
         """Get PQRS records with 'activo' status."""
@@ -107,99 +914,129 @@ class DataService:
 
     def search_pqrs_semantic(self, query: str, limit: int = 10) -> List[PQRSRecord]:
         """Basic semantic search in PQRS data (placeholder for RAG integration)."""
-        if self._pqrs_data is None:
+        df = self.snapshot.pqrs
+        if df is None:
             return []
 
         # Simple text search in asunto and tema_principal columns
-        df = self._pqrs_data.copy()
         query_lower = query.lower()
 
         # Filter records that contain the query in relevant text fields
         mask = (
-            df['asunto'].fillna('').str.lower().str.contains(query_lower, na=False) |
-            df['tema_principal'].fillna('').str.lower().str.contains(query_lower, na=False) |
-            df['direccion_hecho'].fillna('').str.lower().str.contains(query_lower, na=False)
+            df['asunto'].astype(object).fillna('').str.lower().str.contains(query_lower, na=False) |
+            df['tema_principal'].astype(object).fillna('').str.lower().str.contains(query_lower, na=False) |
+            df['direccion_hecho'].astype(object).fillna('').str.lower().str.contains(query_lower, na=False)
         )
 
-        df_filtered = df[mask].head(limit)
-
-        records = []
-        for _, row in df_filtered.iterrows():
-            try:
-                record = PQRSRecord(**row.to_dict())
-                records.append(record)
-            except Exception as e:
-                logger.warning(f"Error parsing PQRS record: {e}")
-                continue
-
-        return records
+        return records_from_frame(with_live_days(df[mask].head(limit)), PQRSRecord)
 
     def get_personnel_by_zone(self, zone: str) -> List[PersonnelRecord]:
         """Get personnel available in a specific zone."""
-        if self._personnel_data is None:
-            return []
+        return list(self._personnel_by_zone.get(normalize_name(zone), []))
+
+    def get_vehicles_by_zone(self, zone: str) -> List[VehicleRecord]:
+        """Get vehicles available in a specific zone."""
+        return list(self._vehicles_by_zone.get(normalize_name(zone), []))
 
-        df = self._personnel_data.copy()
-        df_zone = df[df['zone'].str.lower() == zone.lower()]
+    def get_personnel_by_id(self, employee_id: str) -> Optional[PersonnelRecord]:
+        """Get a personnel member by employee_id."""
+        return self._personnel_by_id.get(str(employee_id))
 
-        records = []
-        for _, row in df_zone.iterrows():
-            try:
-                record = PersonnelRecord(**row.to_dict())
-                records.append(record)
-            except Exception as e:
-                logger.warning(f"Error parsing personnel record: {e}")
-                continue
+    def get_vehicle_by_plate(self, license_plate: str) -> Optional[VehicleRecord]:
+        """Get a vehicle by license plate."""
+        return self._vehicles_by_plate.get(str(license_plate))
 
-        return records
+    def get_zone_availability(self, zone: str) -> Dict[str, int]:
+        """Available personnel and vehicle counts for a zone."""
+        return dict(self._zone_availability.get(normalize_name(zone), {"personnel": 0, "vehicles": 0}))
 
-    def get_vehicles_by_zone(self, zone: str) -> List[VehicleRecord]:
-        """Get vehicles available in a specific zone."""
-        if self._transport_data is None:
-            return []
+    def set_personnel_status(self, employee_id: str, status: str) -> Optional[PersonnelRecord]:
+        """Change a personnel member's status and update its zone's availability counter."""
+        return self._set_resource_status("personnel", self._personnel_by_id, self._personnel_by_zone,
+                                         str(employee_id), status)
 
-        df = self._transport_data.copy()
-        df_zone = df[df['zone'].str.lower() == zone.lower()]
+    def set_vehicle_status(self, license_plate: str, status: str) -> Optional[VehicleRecord]:
+        """Change a vehicle's status and update its zone's availability counter."""
+        return self._set_resource_status("vehicles", self._vehicles_by_plate, self._vehicles_by_zone,
+                                         str(license_plate), status)
 
-        records = []
-        for _, row in df_zone.iterrows():
-            try:
-                record = VehicleRecord(**row.to_dict())
-                records.append(record)
-            except Exception as e:
-                logger.warning(f"Error parsing vehicle record: {e}")
-                continue
+    def _set_resource_status(self, resource: str, by_id: Dict[str, Any], by_zone: Dict[str, List[Any]],
+                             resource_id: str, status: str) -> Optional[Any]:
+        with self._resource_lock:
+            current = by_id.get(resource_id)
+            if current is None:
+                return None
 
-        return records
+            updated = current.model_copy(update={"status": status})
+            key = normalize_name(current.zone)
+            bucket = by_zone[key]
+            bucket[next(i for i, r in enumerate(bucket) if r is current)] = updated
+            by_id[resource_id] = updated
+
+            counts = self._zone_availability[key]
+            counts[resource] += (status == "available") - (current.status == "available")
+
+        return updated
 
     def get_zones(self) -> List[ZoneRecord]:
         """Get all zoning information."""
-        if self._zoning_data is None:
-            return []
+        return list(self._zone_records)
+
+    def check_integrity(self) -> Dict[str, Any]:
+        """Verify that the PQRS frame and the indexes derived from it agree."""
+        snapshot = self.snapshot
+        if snapshot.pqrs is None:
+            return {"status": "failed", "issues": ["PQRS data not loaded"]}
+
+        df = snapshot.pqrs
+        issues = []
 
-        records = []
-        for _, row in self._zoning_data.iterrows():
-            try:
-                record = ZoneRecord(**row.to_dict())
-                records.append(record)
-            except Exception as e:
-                logger.warning(f"Error parsing zone record: {e}")
-                continue
+        missing = [c for c in ("numero_radicado_entrada", "estado") if c not in df.columns]
+        if missing:
+            issues.append(f"Missing PQRS columns: {missing}")
 
-        return records
+        if len(snapshot.radicado_positions) != len(df):
+            issues.append(f"{len(df) - len(snapshot.radicado_positions)} PQRS rows with a missing or duplicate radicado")
+
+        if snapshot.partitions is None and snapshot.cube.total() != len(df):
+            issues.append(f"Aggregate cube counts {snapshot.cube.total()} PQRS but {len(df)} are loaded")
+        if snapshot.partitions is not None and self.storage.serves(snapshot):
+            stored = self.storage.count(snapshot)
+            if snapshot.cube.total() != stored:
+                issues.append(f"Aggregate cube counts {snapshot.cube.total()} PQRS but {stored} are stored")
+
+        active = snapshot.cube.total({"estado": "activo"})
+        if snapshot.urgency_queue is not None and len(snapshot.urgency_queue) != active:
+            issues.append(f"Urgency queue holds {len(snapshot.urgency_queue)} PQRS but {active} are active")
+
+        return {
+            "status": "ok" if not issues else "degraded",
+            "generation": snapshot.generation,
+            "pqrs_rows": len(df),
+            "undated_rows": {field: len(df) - len(index) for field, index in snapshot.date_indexes.items()},
+            "issues": issues
+        }
 
     def get_data_statistics(self) -> Dict[str, Any]:
         """Get statistics about loaded data."""
+        snapshot = self.snapshot
         stats = {
-            "pqrs_total": len(self._pqrs_data) if self._pqrs_data is not None else 0,
-            "personnel_total": len(self._personnel_data) if self._personnel_data is not None else 0,
-            "vehicles_total": len(self._transport_data) if self._transport_data is not None else 0,
-            "zones_total": len(self._zoning_data) if self._zoning_data is not None else 0,
+            "generation": snapshot.generation,
+            "pqrs_total": (snapshot.cube.total() if snapshot.partitions is not None
+                           else len(snapshot.pqrs) if snapshot.pqrs is not None else 0),
+            "personnel_total": len(snapshot.personnel) if snapshot.personnel is not None else 0,
+            "vehicles_total": len(snapshot.transport) if snapshot.transport is not None else 0,
+            "zones_total": len(snapshot.zoning) if snapshot.zoning is not None else 0,
         }
 
-        if self._pqrs_data is not None:
-            stats["pqrs_by_status"] = self._pqrs_data['estado'].value_counts().to_dict()
-            stats["pqrs_active"] = len(self._pqrs_data[self._pqrs_data['estado'] == 'activo'])
+        if snapshot.pqrs is not None:
+            stats["pqrs_by_status"] = snapshot.cube.counts_by("estado")
+            stats["pqrs_active"] = snapshot.cube.total({"estado": "activo"})
+            stats["pqrs_by_month"] = snapshot.cube.counts_by_month()
+            if snapshot.partitions is not None:
+                stats["pqrs_in_memory"] = len(snapshot.pqrs)
+            if snapshot.duplicates is not None:
+                stats["duplicate_clusters"] = snapshot.duplicates.stats()
 
         return stats
 
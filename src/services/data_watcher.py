@@ -0,0 +1,137 @@
+"""Watcher that refreshes a dataset when its workbook in the data directory changes."""
+
+import hashlib
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..config import settings
+from .data_service import DATASET_FILES
+from .job_service import job_service
+
+logger = logging.getLogger(__name__)
+
+
+def file_fingerprint(path: Path) -> str:
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _submit_refresh(dataset: str, fingerprint: str):
+    job_service.submit("refresh_dataset", {"dataset": dataset, "fingerprint": fingerprint}, priority=3)
+
+
+class DataWatcher:
+    """Poll the data directory and queue a refresh for each workbook that changed.
+
+    A polling pass only stats the workbooks. Once a file has kept the same
+    size and mtime for ``watch_debounce_seconds`` (exports are often written
+    in bursts), its content hash is compared with the last one refreshed, so
+    a touch or an identical copy does not trigger work.
+    """
+
+    def __init__(self, data_dir: Optional[str] = None, interval: Optional[float] = None,
+                 debounce: Optional[float] = None, submit: Callable[[str, str], Any] = _submit_refresh):
+        self.data_dir = Path(data_dir or settings.data_dir)
+        self.interval = settings.watch_interval_seconds if interval is None else interval
+        self.debounce = settings.watch_debounce_seconds if debounce is None else debounce
+        self._submit = submit
+        self._stats: Dict[str, Optional[Tuple[int, int]]] = {}
+        self._changed_at: Dict[str, float] = {}
+        self._fingerprints: Dict[str, str] = {}
+        self._refreshes = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def files(self) -> Dict[str, Path]:
+        return {dataset: self.data_dir / getattr(settings, attr) for dataset, attr in DATASET_FILES.items()}
+
+    @staticmethod
+    def _stat(path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def prime(self):
+        """Take the current workbooks as already loaded."""
+        for dataset, path in self.files().items():
+            self._stats[dataset] = self._stat(path)
+            if self._stats[dataset] is not None:
+                self._fingerprints[dataset] = file_fingerprint(path)
+        self._changed_at.clear()
+
+    def poll(self, now: Optional[float] = None) -> List[str]:
+        """Run one polling pass; returns the datasets a refresh was queued for."""
+        now = time.monotonic() if now is None else now
+        queued = []
+
+        for dataset, path in self.files().items():
+            stat = self._stat(path)
+            if stat != self._stats.get(dataset):
+                # Still being written (or just appeared): restart the quiet period
+                self._stats[dataset] = stat
+                self._changed_at[dataset] = now
+                continue
+
+            changed_at = self._changed_at.get(dataset)
+            if changed_at is None or now - changed_at < self.debounce:
+                continue
+            del self._changed_at[dataset]
+            if stat is None:
+                continue
+
+            fingerprint = file_fingerprint(path)
+            if fingerprint == self._fingerprints.get(dataset):
+                continue
+
+            self._fingerprints[dataset] = fingerprint
+            self._refreshes += 1
+            logger.info(f"{path.name} changed, queueing a refresh of the {dataset} dataset")
+            self._submit(dataset, fingerprint)
+            queued.append(dataset)
+
+        return queued
+
+    def start(self):
+        """Start polling in a background thread."""
+        if self._thread is not None:
+            return
+        self.prime()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="data-watcher", daemon=True)
+        self._thread.start()
+        logger.info(f"Watching {self.data_dir} every {self.interval}s (debounce {self.debounce}s)")
+
+    def stop(self, timeout: float = 5.0):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"Data watcher poll failed: {e}")
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "running": self._thread is not None,
+            "data_dir": str(self.data_dir),
+            "pending": sorted(self._changed_at),
+            "refreshes_queued": self._refreshes
+        }
+
+
+# Global instance
+data_watcher = DataWatcher()
@@ -0,0 +1,159 @@
+"""Immutable, versioned dataset snapshots swapped in atomically on reload."""
+
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from .aggregate_cube import AggregateCube
+from .date_index import DateRangeIndex
+from .near_duplicates import DuplicateIndex
+from .priority_engine import UrgencyQueue
+
+logger = logging.getLogger(__name__)
+
+
+def _as_str(value: Any) -> str:
+    """String form of an identifier read from Excel, without a trailing '.0'."""
+    return str(int(value)) if isinstance(value, float) and value.is_integer() else str(value)
+
+
+@dataclass(frozen=True)
+class DatasetSnapshot:
+    """One generation of the loaded data: frames, derived indexes and the vector index handle.
+
+    Snapshots are never modified after publication; a change produces a new
+    generation that shares the unchanged parts. When ``partitions`` names a
+    version of the on-disk partitioned store, that store holds the complete
+    PQRS table and ``pqrs`` only the rows kept in memory (the active ones).
+    """
+
+    generation: int = 0
+    loaded_at: datetime = field(default_factory=datetime.now)
+    # When the urgency scores and queue were last computed against the current date
+    scored_at: datetime = field(default_factory=datetime.now)
+    pqrs: Optional[pd.DataFrame] = None
+    personnel: Optional[pd.DataFrame] = None
+    transport: Optional[pd.DataFrame] = None
+    zoning: Optional[pd.DataFrame] = None
+    radicado_positions: Dict[str, int] = field(default_factory=dict)
+    date_indexes: Dict[str, DateRangeIndex] = field(default_factory=dict)
+    urgency_queue: Optional[UrgencyQueue] = None
+    duplicates: Optional[DuplicateIndex] = None
+    cube: AggregateCube = field(default_factory=AggregateCube)
+    vectorstore: Any = None
+    partitions: Optional[str] = None
+
+
+# Snapshot pinned by the current request, so every read in it sees one generation
+_pinned: ContextVar[Optional[DatasetSnapshot]] = ContextVar("pinned_dataset", default=None)
+
+
+class SnapshotRegistry:
+    """Holds the published snapshot and tracks readers of each generation.
+
+    ``publish`` swaps the reference in one assignment. Callbacks registered for
+    a replaced generation (e.g. dropping its vector collection) run once its
+    last reader finishes; the frames themselves are freed by the garbage
+    collector when nothing references them any more.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._current = DatasetSnapshot()
+        self._last_generation = 0
+        self._readers: Dict[int, int] = {}
+        self._on_retired: Dict[int, List[Callable[[], None]]] = {}
+
+    @property
+    def current(self) -> DatasetSnapshot:
+        """The snapshot pinned by this request, or the published one."""
+        pinned = _pinned.get()
+        return pinned if pinned is not None else self._current
+
+    @property
+    def published(self) -> DatasetSnapshot:
+        """The published snapshot, ignoring any pin of this request."""
+        return self._current
+
+    def next_generation(self) -> int:
+        with self._lock:
+            self._last_generation += 1
+            return self._last_generation
+
+    @contextmanager
+    def reading(self, snapshot: Optional[DatasetSnapshot] = None) -> Iterator[DatasetSnapshot]:
+        """Pin a snapshot (the published one by default) for the enclosed reads."""
+        pinned = _pinned.get()
+        if snapshot is None and pinned is not None:
+            yield pinned
+            return
+
+        with self.holding(snapshot) as snapshot:
+            token = _pinned.set(snapshot)
+            try:
+                yield snapshot
+            finally:
+                _pinned.reset(token)
+
+    @contextmanager
+    def holding(self, snapshot: Optional[DatasetSnapshot] = None) -> Iterator[DatasetSnapshot]:
+        """Count as a reader of a snapshot without pinning it for the current context.
+
+        Keeps a generation from being retired while e.g. a streaming generator,
+        resumed from different threads, is still reading it.
+        """
+        with self._lock:
+            snapshot = snapshot or self._current
+            self._readers[snapshot.generation] = self._readers.get(snapshot.generation, 0) + 1
+
+        try:
+            yield snapshot
+        finally:
+            callbacks = []
+            with self._lock:
+                generation = snapshot.generation
+                self._readers[generation] -= 1
+                if not self._readers[generation]:
+                    del self._readers[generation]
+                    if generation != self._current.generation:
+                        callbacks = self._on_retired.pop(generation, [])
+            self._run(callbacks)
+
+    def publish(self, snapshot: DatasetSnapshot,
+                on_retired: Optional[Callable[[], None]] = None) -> DatasetSnapshot:
+        """Make ``snapshot`` current; ``on_retired`` runs when the replaced one has drained."""
+        callbacks = []
+        with self._lock:
+            previous, self._current = self._current, snapshot
+            if on_retired is not None:
+                self._on_retired.setdefault(previous.generation, []).append(on_retired)
+            if not self._readers.get(previous.generation):
+                callbacks = self._on_retired.pop(previous.generation, [])
+
+        logger.info(f"Published dataset generation {snapshot.generation} (replaced {previous.generation})")
+        self._run(callbacks)
+        return previous
+
+    def status(self) -> Dict[str, Any]:
+        """Current generation and readers still holding each generation."""
+        with self._lock:
+            return {
+                "generation": self._current.generation,
+                "loaded_at": self._current.loaded_at.isoformat(),
+                "readers": dict(self._readers),
+                "draining": sorted(self._on_retired)
+            }
+
+    @staticmethod
+    def _run(callbacks: List[Callable[[], None]]):
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Retired dataset cleanup failed: {e}")
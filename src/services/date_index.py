@@ -0,0 +1,144 @@
+"""Sorted date indexes for range filters and live elapsed/remaining day counts."""
+
+import logging
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DATE_INDEX_FIELDS = ("fecha_radicacion", "fecha_vencimiento")
+
+DateRange = Tuple[Optional[datetime], Optional[datetime]]
+
+
+class DateRangeIndex:
+    """Sorted timestamps of one date column with their row positions.
+
+    Range queries are two binary searches; rows without a date are left out.
+    """
+
+    def __init__(self, values: pd.Series):
+        stamps = pd.to_datetime(values, errors="coerce").to_numpy(dtype="datetime64[ns]")
+        valid = np.flatnonzero(~np.isnat(stamps))
+        order = np.argsort(stamps[valid], kind="stable")
+        self._values = stamps[valid][order]
+        self._positions = valid[order]
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def with_rows(self, positions: np.ndarray, values: pd.Series) -> "DateRangeIndex":
+        """A new index where the rows at ``positions`` take ``values``; new positions are added.
+
+        Unchanged entries stay sorted, so the new dates are merged in with a
+        binary search instead of sorting the whole column again.
+        """
+        positions = np.asarray(positions, dtype=int)
+        stamps = pd.to_datetime(values, errors="coerce").to_numpy(dtype="datetime64[ns]")
+        valid = ~np.isnat(stamps)
+        order = np.argsort(stamps[valid], kind="stable")
+        new_values, new_positions = stamps[valid][order], positions[valid][order]
+
+        keep = ~np.isin(self._positions, positions)
+        base_values, base_positions = self._values[keep], self._positions[keep]
+        at = np.searchsorted(base_values, new_values, side="right")
+
+        index = DateRangeIndex(pd.Series([], dtype="datetime64[ns]"))
+        index._values = np.insert(base_values, at, new_values)
+        index._positions = np.insert(base_positions, at, new_positions)
+        return index
+
+    def between(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> np.ndarray:
+        """Row positions with a date in ``[start, end]``, in ascending row order."""
+        lo = 0 if start is None else np.searchsorted(self._values, np.datetime64(start, "ns"), side="left")
+        hi = len(self._values) if end is None else np.searchsorted(self._values, np.datetime64(end, "ns"), side="right")
+        return np.sort(self._positions[lo:hi])
+
+
+def _parse_bound(value: Any, end_of_day: bool) -> datetime:
+    """Parse a filter bound; a bare date used as an upper bound covers the whole day."""
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        parsed, date_only = datetime.combine(value, datetime.min.time()), True
+    else:
+        text = str(value).strip()
+        parsed, date_only = datetime.fromisoformat(text), len(text) <= 10
+    if date_only and end_of_day:
+        return parsed + timedelta(days=1) - timedelta(microseconds=1)
+    return parsed
+
+
+def split_date_filters(filters: Optional[Dict[str, Any]],
+                       now: Optional[datetime] = None) -> Tuple[Dict[str, DateRange], Dict[str, Any]]:
+    """Separate date-range filters from equality filters.
+
+    Supported keys:
+    - ``<field>_from`` / ``<field>_to`` for ``fecha_radicacion`` and ``fecha_vencimiento``
+      (ISO dates or datetimes, bounds inclusive)
+    - ``overdue``: ``fecha_vencimiento`` already passed
+    - ``due_within_days``: ``fecha_vencimiento`` between now and now + N days
+    - ``filed_within_days``: ``fecha_radicacion`` in the last N days
+
+    Returns ``({field: (start, end)}, remaining_filters)``; several bounds on
+    the same field are intersected.
+    """
+    now = now or datetime.now()
+    ranges: Dict[str, DateRange] = {}
+    remaining: Dict[str, Any] = {}
+
+    def narrow(field: str, start: Optional[datetime] = None, end: Optional[datetime] = None):
+        current_start, current_end = ranges.get(field, (None, None))
+        if start is not None and (current_start is None or start > current_start):
+            current_start = start
+        if end is not None and (current_end is None or end < current_end):
+            current_end = end
+        ranges[field] = (current_start, current_end)
+
+    for key, value in (filters or {}).items():
+        if value is None:
+            continue
+        if key.endswith("_from") and key[:-5] in DATE_INDEX_FIELDS:
+            narrow(key[:-5], start=_parse_bound(value, end_of_day=False))
+        elif key.endswith("_to") and key[:-3] in DATE_INDEX_FIELDS:
+            narrow(key[:-3], end=_parse_bound(value, end_of_day=True))
+        elif key == "overdue":
+            if value:
+                narrow("fecha_vencimiento", end=now)
+        elif key == "due_within_days":
+            narrow("fecha_vencimiento", start=now, end=now + timedelta(days=float(value)))
+        elif key == "filed_within_days":
+            narrow("fecha_radicacion", start=now - timedelta(days=float(value)))
+        else:
+            remaining[key] = value
+
+    return ranges, remaining
+
+
+def with_live_days(df: pd.DataFrame, now: Optional[datetime] = None) -> pd.DataFrame:
+    """Recompute ``dias_transcurridos`` and add ``dias_restantes`` against the current date.
+
+    Elapsed days run from ``fecha_radicacion`` to the response date when the
+    PQRS was answered, otherwise to today; rows without a filing date keep
+    the exported value.
+    """
+    now = pd.Timestamp(now or datetime.now())
+    columns = {}
+
+    if "fecha_radicacion" in df.columns:
+        filed = pd.to_datetime(df["fecha_radicacion"], errors="coerce")
+        answered = (pd.to_datetime(df["fecha_radicado_respuesta"], errors="coerce")
+                    if "fecha_radicado_respuesta" in df.columns else pd.Series(pd.NaT, index=df.index))
+        elapsed = (answered.fillna(now) - filed).dt.days
+        if "dias_transcurridos" in df.columns:
+            elapsed = elapsed.fillna(pd.to_numeric(df["dias_transcurridos"], errors="coerce"))
+        columns["dias_transcurridos"] = elapsed
+
+    if "fecha_vencimiento" in df.columns:
+        due = pd.to_datetime(df["fecha_vencimiento"], errors="coerce")
+        columns["dias_restantes"] = (due - now).dt.days
+
+    return df.assign(**columns) if columns else df
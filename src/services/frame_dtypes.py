@@ -0,0 +1,117 @@
+"""Compact dtypes for the PQRS frame and a per-column memory report."""
+
+import sys
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+# Few distinct values repeated over many rows; stored as category codes
+CATEGORY_COLUMNS = ("estado", "tipo_solicitud", "comuna_hecho", "barrio_hecho",
+                    "unidad_responsable", "sistema_informacion", "tema_principal")
+
+# Whole numbers exported as floats -> smallest nullable integer dtype that holds them
+INTEGER_COLUMNS = {"ano": "Int16", "mes": "Int8", "dias_transcurridos": "Int32"}
+
+DATE_PREFIX = "fecha_"
+
+
+def _is_text(column: pd.Series) -> bool:
+    return column.dtype == object or isinstance(column.dtype, pd.StringDtype)
+
+
+def _as_integers(column: pd.Series, dtype: str) -> pd.Series:
+    numbers = pd.to_numeric(column, errors="coerce")
+    valid = numbers.dropna()
+    # Keep the column as read when it holds text or fractions
+    if numbers.notna().sum() != column.notna().sum() or not (valid == np.floor(valid)).all():
+        return column
+    info = np.iinfo(dtype.lower())
+    if len(valid) and (valid.min() < info.min or valid.max() > info.max):
+        return column
+    return numbers.astype(dtype)
+
+
+def _as_dates(column: pd.Series) -> pd.Series:
+    parsed = pd.to_datetime(column, errors="coerce", format="mixed")
+    return parsed if parsed.notna().sum() == column.notna().sum() else column
+
+
+def _interned(column: pd.Series) -> pd.Series:
+    values = [sys.intern(v) if isinstance(v, str) else v for v in column]
+    return pd.Series(values, index=column.index, dtype=object)
+
+
+def compact_pqrs(df: pd.DataFrame, intern: bool = True) -> pd.DataFrame:
+    """The PQRS frame with categorical, nullable integer and datetime columns.
+
+    Columns whose values do not fit the target dtype are left as they are.
+    With ``intern``, the remaining text columns share one object per distinct
+    string. Columns already in their compact dtype are not touched, so
+    without ``intern`` the call is cheap on a frame compacted before.
+    """
+    columns = {}
+    for name in df.columns:
+        column = df[name]
+        if name in CATEGORY_COLUMNS:
+            if not isinstance(column.dtype, pd.CategoricalDtype):
+                columns[name] = column.astype("category")
+        elif name in INTEGER_COLUMNS:
+            if column.dtype != INTEGER_COLUMNS[name]:
+                columns[name] = _as_integers(column, INTEGER_COLUMNS[name])
+        elif name.startswith(DATE_PREFIX) and _is_text(column):
+            columns[name] = _as_dates(column)
+        elif intern and column.dtype == object:
+            columns[name] = _interned(column)
+    return df.assign(**columns) if columns else df
+
+
+def accept_values(column: pd.Series, values: Any) -> pd.Series:
+    """``column`` widened so ``values`` can be assigned into it.
+
+    Categorical columns gain the new categories; other columns fall back to
+    object dtype (e.g. text arriving for a column read as numbers).
+    """
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        new = pd.Index(pd.unique(pd.Series(values).dropna())).difference(column.cat.categories)
+        return column.cat.add_categories(new) if len(new) else column
+    return column.astype(object)
+
+
+def column_bytes(df: pd.DataFrame) -> Dict[str, int]:
+    """Resident bytes per column.
+
+    Object columns count each distinct Python object once, so strings shared
+    between rows (e.g. interned ones) are not counted per row.
+    """
+    sizes = {}
+    for name in df.columns:
+        column = df[name]
+        if column.dtype == object:
+            values = column.to_numpy()
+            shared = {id(v): v for v in values}
+            sizes[name] = int(values.nbytes + sum(sys.getsizeof(v) for v in shared.values()))
+        else:
+            sizes[name] = int(column.memory_usage(index=False, deep=True))
+    return sizes
+
+
+def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> Dict[str, Any]:
+    """Per-column bytes and dtypes of a frame before and after ``compact_pqrs``."""
+    old, new = column_bytes(before), column_bytes(after)
+    total_before, total_after = sum(old.values()), sum(new.values())
+    return {
+        "rows": len(after),
+        "total_bytes_before": total_before,
+        "total_bytes_after": total_after,
+        "reduction": round(total_before / total_after, 2) if total_after else None,
+        "columns": {
+            name: {
+                "dtype_before": str(before[name].dtype),
+                "dtype_after": str(after[name].dtype),
+                "bytes_before": old[name],
+                "bytes_after": new[name]
+            }
+            for name in after.columns
+        }
+    }
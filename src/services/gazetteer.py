@@ -0,0 +1,171 @@
+"""Extraction of structured filters from free-text queries with a compiled multi-pattern matcher."""
+
+import re
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .geo import normalize_name
+
+# PQRS columns whose known values are recognized in queries, in the order ambiguous names are resolved
+GAZETTEER_COLUMNS = ("barrio_hecho", "comuna_hecho", "tipo_solicitud", "tema_principal")
+
+# Words that, right before a name, say which column it belongs to
+COLUMN_KEYWORDS = {"barrio": "barrio_hecho", "comuna": "comuna_hecho"}
+
+# Names shorter than this are too likely to match ordinary words
+MIN_PATTERN_CHARS = 3
+
+_NON_WORD = re.compile(r"[^\w]+")
+# "Comuna 11 - Laureles Estadio", "11 - Laureles Estadio", "Comuna 11"
+_NUMBERED_COMMUNE = re.compile(r"^(?:comuna\s*)?(\d{1,2})(?:\s*[-–:.]\s*(.+))?$", re.IGNORECASE)
+
+
+def match_key(text: Optional[str]) -> str:
+    """Case-, accent- and punctuation-insensitive form used on both patterns and queries."""
+    return normalize_name(_NON_WORD.sub(" ", str(text))) if text else ""
+
+
+class AhoCorasick:
+    """Automaton finding every occurrence of a fixed set of patterns in one pass over the text.
+
+    Only occurrences delimited by spaces or the ends of the text are
+    reported, so patterns match whole words.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        self.patterns: List[str] = []
+
+        for pattern in dict.fromkeys(p for p in patterns if p):
+            state = 0
+            for char in pattern:
+                nxt = self._goto[state].get(char)
+                if nxt is None:
+                    nxt = self._goto[state][char] = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append(len(self.patterns))
+            self.patterns.append(pattern)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(char, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def find(self, text: str) -> List[Tuple[int, int, str]]:
+        """``(start, end, pattern)`` of every whole-word occurrence in ``text``."""
+        found = []
+        state = 0
+        for i, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for index in self._out[state]:
+                pattern = self.patterns[index]
+                start, end = i + 1 - len(pattern), i + 1
+                if (start == 0 or text[start - 1] == " ") and (end == len(text) or text[end] == " "):
+                    found.append((start, end, pattern))
+        return found
+
+
+class Gazetteer:
+    """Known barrio, comuna, request type and topic names, matched in queries as filters.
+
+    Built from the distinct values of ``GAZETTEER_COLUMNS`` and the zoning
+    names; a name recognized in the query becomes an equality filter on the
+    exact value stored in the PQRS table.
+    """
+
+    def __init__(self, values: Dict[str, Iterable[Any]], aliases: Optional[Dict[str, Iterable[Tuple[str, Any]]]] = None):
+        self._targets: Dict[str, List[Tuple[str, Any]]] = {}
+        for column in GAZETTEER_COLUMNS:
+            for value in values.get(column, ()):
+                for key in self._keys(column, value):
+                    self._add(key, column, value)
+        for alias, targets in (aliases or {}).items():
+            for column, value in targets:
+                self._add(match_key(alias), column, value)
+        self._matcher = AhoCorasick(self._targets)
+
+    @staticmethod
+    def _keys(column: str, value: Any) -> List[str]:
+        keys = [match_key(value)]
+        numbered = _NUMBERED_COMMUNE.match(str(value).strip()) if column == "comuna_hecho" else None
+        if numbered:
+            keys.append(f"comuna {int(numbered.group(1))}")
+            if numbered.group(2):
+                keys.append(match_key(numbered.group(2)))
+        return keys
+
+    def _add(self, key: str, column: str, value: Any):
+        if len(key) < MIN_PATTERN_CHARS:
+            return
+        targets = self._targets.setdefault(key, [])
+        if (column, value) not in targets:
+            targets.append((column, value))
+
+    @classmethod
+    def from_frames(cls, pqrs, zoning=None) -> "Gazetteer":
+        """Gazetteer of the values in a PQRS frame and the zone and commune names of the zoning.
+
+        A zoning name spelled like a PQRS value (ignoring case, accents and
+        the "Comuna NN -" prefix) filters on that value; other zoning names
+        filter on their own spelling.
+        """
+        values = {column: [v for v in pqrs[column].dropna().unique() if str(v).strip()]
+                  for column in GAZETTEER_COLUMNS if pqrs is not None and column in pqrs.columns}
+
+        aliases: Dict[str, List[Tuple[str, Any]]] = {}
+        if zoning is not None:
+            for source, column in (("name", "barrio_hecho"), ("commune", "comuna_hecho")):
+                if source not in zoning.columns:
+                    continue
+                known = {key: v for v in values.get(column, ()) for key in cls._keys(column, v)}
+                for name in zoning[source].dropna().unique():
+                    if str(name).strip():
+                        aliases.setdefault(str(name), []).append((column, known.get(match_key(name), name)))
+        return cls(values, aliases)
+
+    def __len__(self) -> int:
+        return len(self._matcher)
+
+    def extract(self, query: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """Filters named in ``query``, and which text matched each of them.
+
+        Overlapping matches keep the leftmost, then longest one. A name that
+        belongs to several columns goes to the column named right before it
+        ("barrio", "comuna"), else to the first of ``GAZETTEER_COLUMNS``.
+        """
+        text = match_key(query)
+        filters: Dict[str, List[Any]] = {}
+        matches: List[Dict[str, Any]] = []
+
+        end_of_last = -1
+        for start, end, key in sorted(self._matcher.find(text), key=lambda m: (m[0], m[0] - m[1])):
+            if start < end_of_last:
+                continue
+            end_of_last = end
+            targets = self._targets[key]
+            preceding = text[:start].split()[-1:] or [""]
+            column_hint = COLUMN_KEYWORDS.get(preceding[0])
+            column, value = next((t for t in targets if t[0] == column_hint), targets[0])
+            if column_hint == column:
+                start -= len(preceding[0]) + 1
+            if value not in filters.setdefault(column, []):
+                filters[column].append(value)
+            matches.append({"text": text[start:end], "column": column, "value": value})
+
+        return {column: values[0] if len(values) == 1 else values for column, values in filters.items()}, matches
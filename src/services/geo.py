@@ -0,0 +1,74 @@
+"""Geographic helpers for locating PQRS and resources from zoning coordinates."""
+
+import logging
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from ..models.pqrs import ZoneRecord
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def normalize_name(value: Optional[str]) -> str:
+    """Case- and accent-insensitive key for zone, commune and barrio names."""
+    if not value:
+        return ""
+    text = unicodedata.normalize("NFKD", str(value))
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(text.lower().split())
+
+
+def haversine_matrix(lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Pairwise great-circle distances in km, computed in one vectorized step."""
+    lat = np.radians(np.asarray(lats, dtype=float))
+    lon = np.radians(np.asarray(lons, dtype=float))
+
+    dlat = lat[:, None] - lat[None, :]
+    dlon = lon[:, None] - lon[None, :]
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat)[:, None] * np.cos(lat)[None, :] * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in km."""
+    return float(haversine_matrix(np.array([lat1, lat2]), np.array([lon1, lon2]))[0, 1])
+
+
+class ZoneLocator:
+    """Resolve barrio and commune names to coordinates from zoning records.
+
+    Barrios map to their own zone coordinates; communes map to the centroid of
+    their zones. Lookups are case- and accent-insensitive.
+    """
+
+    def __init__(self, zones: Iterable[ZoneRecord]):
+        self.by_name: Dict[str, Tuple[float, float]] = {}
+        commune_points: Dict[str, List[Tuple[float, float]]] = {}
+        self.commune_labels: Dict[str, str] = {}
+
+        for zone in zones:
+            if zone.latitude is None or zone.longitude is None:
+                continue
+            point = (float(zone.latitude), float(zone.longitude))
+            self.by_name[normalize_name(zone.name)] = point
+            key = normalize_name(zone.commune)
+            commune_points.setdefault(key, []).append(point)
+            self.commune_labels.setdefault(key, zone.commune)
+
+        self.communes: Dict[str, Tuple[float, float]] = {
+            key: (float(np.mean([p[0] for p in points])), float(np.mean([p[1] for p in points])))
+            for key, points in commune_points.items()
+        }
+
+    def commune(self, name: Optional[str]) -> Optional[Tuple[float, float]]:
+        """Centroid of a commune (or of a zone with that name)."""
+        key = normalize_name(name)
+        return self.communes.get(key) or self.by_name.get(key)
+
+    def locate(self, barrio: Optional[str] = None, commune: Optional[str] = None) -> Optional[Tuple[float, float]]:
+        """Best-known coordinates for an address: the barrio if known, otherwise its commune."""
+        return self.by_name.get(normalize_name(barrio)) or self.commune(commune)
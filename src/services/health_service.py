@@ -0,0 +1,77 @@
+"""Cached health snapshots and on-demand deep health checks."""
+
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from ..config import settings
+from .data_service import data_service
+from .rag_service import rag_service
+from .assignment_service import assignment_service
+
+logger = logging.getLogger(__name__)
+
+
+class HealthService:
+    """Serve the health snapshot from memory until data or index state changes.
+
+    The snapshot is rebuilt when the data or vector index generation moves or
+    after ``health_cache_seconds``; otherwise a probe is a tuple comparison.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot: Any = None
+        self._key: Optional[Tuple] = None
+        self._built_at = 0.0
+
+    @staticmethod
+    def state_key() -> Tuple:
+        """Identifies the state a snapshot was built from."""
+        return data_service.generation, rag_service.generation, rag_service._initialized
+
+    def get_snapshot(self, build: Callable[[], Any]) -> Any:
+        """Return the cached snapshot, calling ``build`` only when it is stale."""
+        key = self.state_key()
+        if self._key == key and time.monotonic() - self._built_at < settings.health_cache_seconds:
+            return self._snapshot
+
+        with self._lock:
+            # Another probe may have rebuilt it while we waited
+            if self._key == key and time.monotonic() - self._built_at < settings.health_cache_seconds:
+                return self._snapshot
+
+            snapshot = build()
+            self._snapshot, self._key, self._built_at = snapshot, key, time.monotonic()
+            return snapshot
+
+    def invalidate(self):
+        """Force the next probe to rebuild the snapshot."""
+        with self._lock:
+            self._key = None
+
+    def deep_check(self) -> Dict[str, Any]:
+        """Check the vector store, LLM configuration and data integrity now."""
+        checks = {}
+        for name, check in (("vector_store", rag_service.check_health),
+                            ("llm", assignment_service.check_llm),
+                            ("data_integrity", data_service.check_integrity)):
+            started = time.perf_counter()
+            try:
+                result = check()
+            except Exception as e:
+                logger.error(f"Deep health check '{name}' failed: {e}")
+                result = {"status": "failed", "error": str(e)}
+            result["duration_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            checks[name] = result
+
+        return {
+            "checks": checks,
+            "checked_at": datetime.now().isoformat()
+        }
+
+
+# Global instance
+health_service = HealthService()
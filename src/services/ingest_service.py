@@ -0,0 +1,131 @@
+"""Incremental ingestion of new and updated PQRS records."""
+
+import io
+import json
+import logging
+import shutil
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Union
+
+import pandas as pd
+
+from ..config import settings
+from .data_service import data_service
+from .rag_service import rag_service
+from .assignment_service import assignment_service
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_SUFFIXES = (".csv", ".xlsx", ".xls", ".ndjson", ".jsonl")
+
+
+def read_delta(content: Union[bytes, Path], filename: str) -> pd.DataFrame:
+    """Parse a delta file (CSV, XLSX or NDJSON) into a frame."""
+    suffix = Path(filename).suffix.lower()
+    if suffix not in SUPPORTED_SUFFIXES:
+        raise ValueError(f"Unsupported delta format '{suffix}'; expected one of {list(SUPPORTED_SUFFIXES)}")
+
+    source = io.BytesIO(content) if isinstance(content, bytes) else content
+    if suffix == ".csv":
+        return pd.read_csv(source)
+    if suffix in (".xlsx", ".xls"):
+        return pd.read_excel(source)
+
+    text = content.decode("utf-8") if isinstance(content, bytes) else Path(content).read_text(encoding="utf-8")
+    return pd.DataFrame([json.loads(line) for line in text.splitlines() if line.strip()])
+
+
+class IngestService:
+    """Upsert PQRS deltas by radicado into a new dataset generation.
+
+    Only the changed rows are rescored, re-indexed and re-embedded. Deltas are
+    applied under ``data_service.updating()``, so each one builds on the
+    generation the previous update published.
+
+    The changed chunks are written to the vector index the published
+    generation shares, before the new generation is published. Searches of
+    the old generation may briefly match the new chunk texts, but their hits
+    are still resolved to that generation's records, and cached results turn
+    over only when the new generation is published.
+    """
+
+    def __init__(self):
+        self.drop_dir = Path(settings.ingest_dir)
+
+    def ingest_records(self, records: List[Dict[str, Any]], source: str = "api") -> Dict[str, Any]:
+        """Upsert a list of PQRS dicts."""
+        return self.ingest_frame(pd.DataFrame(records), source)
+
+    def ingest_frame(self, delta: pd.DataFrame, source: str = "api") -> Dict[str, Any]:
+        """Upsert a delta frame and publish the resulting generation."""
+        with data_service.updating():
+            started = time.perf_counter()
+            snapshot, summary = data_service.upsert_pqrs(delta)
+            table_ms = (time.perf_counter() - started) * 1000
+
+            radicados = summary.pop("radicados")
+            previous = {r.numero_radicado_entrada: r
+                        for r in data_service.get_pqrs_records({"numero_radicado_entrada": radicados})}
+            with data_service.reading(snapshot):
+                changed = data_service.get_pqrs_records({"numero_radicado_entrada": radicados})
+
+            started = time.perf_counter()
+            vector = rag_service.upsert_records(snapshot.vectorstore, changed, previous)
+            vector_ms = (time.perf_counter() - started) * 1000
+
+            data_service.publish(snapshot, changed_radicados=radicados)
+            assignment_service.invalidate_schedules()
+
+        logger.info(f"Ingested {summary['received']} PQRS from {source}: "
+                    f"{summary['inserted']} new, {summary['updated']} updated")
+        return {
+            "source": source,
+            **summary,
+            **vector,
+            "generation": snapshot.generation,
+            "timings_ms": {"table": round(table_ms, 2), "vector_index": round(vector_ms, 2)}
+        }
+
+    def ingest_file(self, content: Union[bytes, Path], filename: str) -> Dict[str, Any]:
+        """Upsert the records of a CSV, XLSX or NDJSON delta file."""
+        return self.ingest_frame(read_delta(content, filename), source=Path(filename).name)
+
+    def scan_drop_directory(self) -> List[Dict[str, Any]]:
+        """Ingest every delta file in the drop directory, oldest first.
+
+        Ingested files move to ``processed/`` and files that fail to ingest to
+        ``failed/``, so a file is never applied twice.
+        """
+        if not self.drop_dir.exists():
+            return []
+
+        files = sorted(
+            (path for path in self.drop_dir.iterdir()
+             if path.is_file() and path.suffix.lower() in SUPPORTED_SUFFIXES),
+            key=lambda path: path.stat().st_mtime
+        )
+
+        results = []
+        for path in files:
+            try:
+                result = self.ingest_file(path, path.name)
+                result["status"] = "completed"
+                self._archive(path, "processed")
+            except Exception as e:
+                logger.error(f"Delta file {path.name} failed to ingest: {e}")
+                result = {"source": path.name, "status": "failed", "error": str(e)}
+                self._archive(path, "failed")
+            results.append(result)
+
+        return results
+
+    def _archive(self, path: Path, folder: str):
+        target = self.drop_dir / folder
+        target.mkdir(parents=True, exist_ok=True)
+        shutil.move(str(path), str(target / f"{datetime.now():%Y%m%d%H%M%S}_{path.name}"))
+
+
+# Global instance
+ingest_service = IngestService()
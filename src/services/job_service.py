@@ -0,0 +1,422 @@
+"""Job service for running long agent and assignment tasks in the background."""
+
+import heapq
+import itertools
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+
+# How often a running job re-reads its cancel flag, which another process may have set
+CANCEL_POLL_SECONDS = 0.5
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    task_id TEXT PRIMARY KEY,
+    job_type TEXT NOT NULL,
+    status TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 5,
+    parameters TEXT,
+    result TEXT,
+    error TEXT,
+    progress REAL NOT NULL DEFAULT 0,
+    message TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT,
+    owner TEXT
+)
+"""
+
+
+def _process_owner() -> str:
+    """Identity stored on the jobs a service instance runs: ``host:pid:instance``."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def _owner_alive(owner: Optional[str]) -> bool:
+    """Whether the process that claimed a job still runs; owners on other hosts are assumed alive."""
+    parts = (owner or "").split(":")
+    if len(parts) < 2:
+        return False
+    host, pid = parts[0], parts[1]
+    if host != socket.gethostname():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, ValueError):
+        return True
+    return True
+
+
+class JobCancelled(Exception):
+    """Raised inside a job handler when cancellation has been requested."""
+
+
+class JobContext:
+    """Handle passed to job handlers for progress reporting and cancellation."""
+
+    def __init__(self, service: "JobService", task_id: str):
+        self._service = service
+        self.task_id = task_id
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether cancellation has been requested for this job."""
+        return self._service._is_cancel_requested(self.task_id)
+
+    def check_cancelled(self):
+        """Raise JobCancelled if the job should stop."""
+        if self.cancelled:
+            raise JobCancelled(self.task_id)
+
+    def report_progress(self, completed: int, total: Optional[int] = None, message: Optional[str] = None):
+        """Record progress and stop the job if it has been cancelled."""
+        progress = completed / total if total else 0.0
+        self._service._update(self.task_id, progress=min(progress, 1.0), message=message)
+        self.check_cancelled()
+
+
+JobHandler = Callable[[Dict[str, Any], JobContext], Dict[str, Any]]
+
+
+def _json_default(value: Any) -> Any:
+    """Serialize values the json module does not know about."""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class JobService:
+    """In-process priority job queue with SQLite-backed durable state.
+
+    Several processes (e.g. uvicorn workers) may share the job database: a
+    worker claims a queued job with a conditional update, so each job runs
+    once, and records its ``host:pid`` as the owner so only jobs of dead
+    processes are requeued at startup.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, workers: Optional[int] = None):
+        self.db_path = Path(db_path or Path(settings.state_dir) / "jobs.db")
+        self.num_workers = workers or settings.job_workers
+        self._handlers: Dict[str, JobHandler] = {}
+        self._queue: List[tuple] = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._db_lock = threading.Lock()
+        self._cancel_requested: set = set()
+        self._cancel_polled: Dict[str, float] = {}
+        self._active: set = set()
+        self.owner = _process_owner()
+        self._workers: List[threading.Thread] = []
+        self._conn: Optional[sqlite3.Connection] = None
+        self._running = False
+
+    def register_handler(self, job_type: str, handler: JobHandler):
+        """Register the callable that runs jobs of the given type."""
+        self._handlers[job_type] = handler
+
+    def get_job_types(self) -> List[str]:
+        """List the job types that can be submitted."""
+        return sorted(self._handlers)
+
+    def start(self):
+        """Open the job database, requeue orphaned jobs and start workers."""
+        if self._running:
+            return
+
+        self._connect()
+
+        # Jobs whose owner process died are queued again; those of live workers are left alone
+        with self._db_lock:
+            running = self._conn.execute(
+                "SELECT task_id, owner FROM jobs WHERE status = 'running'"
+            ).fetchall()
+            with self._cond:
+                active = set(self._active)
+            orphaned = [task_id for task_id, owner in running
+                        if task_id not in active and (owner == self.owner or not _owner_alive(owner))]
+            self._conn.executemany(
+                "UPDATE jobs SET status = 'queued', started_at = NULL, owner = NULL "
+                "WHERE task_id = ? AND status = 'running'",
+                [(task_id,) for task_id in orphaned]
+            )
+            rows = self._conn.execute(
+                "SELECT task_id, priority, cancel_requested FROM jobs "
+                "WHERE status = 'queued' ORDER BY created_at"
+            ).fetchall()
+            self._conn.commit()
+
+        with self._cond:
+            for task_id, priority, cancel_requested in rows:
+                if cancel_requested:
+                    self._cancel_requested.add(task_id)
+                heapq.heappush(self._queue, (priority, next(self._counter), task_id))
+
+        if rows:
+            logger.info(f"Recovered {len(rows)} pending jobs")
+
+        self._running = True
+        for i in range(self.num_workers):
+            worker = threading.Thread(target=self._worker_loop, name=f"job-worker-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+        logger.info(f"Job service started with {self.num_workers} workers")
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the workers; running jobs are requeued on the next start."""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+
+        for worker in self._workers:
+            worker.join(timeout)
+        self._workers = []
+
+        logger.info("Job service stopped")
+
+    def submit(self, job_type: str, parameters: Optional[Dict[str, Any]] = None, priority: int = 5) -> Dict[str, Any]:
+        """Queue a job and return its initial state. Lower priority values run first."""
+        if job_type not in self._handlers:
+            raise ValueError(f"Unknown job type: {job_type}")
+
+        self._connect()
+        task_id = f"task_{uuid.uuid4().hex}"
+
+        with self._db_lock:
+            self._conn.execute(
+                "INSERT INTO jobs (task_id, job_type, status, priority, parameters, created_at) "
+                "VALUES (?, ?, 'queued', ?, ?, ?)",
+                (task_id, job_type, priority, json.dumps(parameters or {}, default=_json_default),
+                 datetime.now().isoformat())
+            )
+            self._conn.commit()
+
+        with self._cond:
+            heapq.heappush(self._queue, (priority, next(self._counter), task_id))
+            self._cond.notify()
+
+        logger.info(f"Queued job {task_id} ({job_type}, priority {priority})")
+        return self.get_job(task_id)
+
+    def get_job(self, task_id: str, include_result: bool = False) -> Optional[Dict[str, Any]]:
+        """Get the stored state of a job."""
+        self._connect()
+        with self._db_lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE task_id = ?", (task_id,)).fetchone()
+
+        return self._row_to_job(row, include_result) if row else None
+
+    def list_jobs(self, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """List the most recent jobs, optionally filtered by status."""
+        self._connect()
+        query = "SELECT * FROM jobs"
+        params: tuple = ()
+        if status:
+            query += " WHERE status = ?"
+            params = (status,)
+        query += " ORDER BY created_at DESC LIMIT ?"
+
+        with self._db_lock:
+            rows = self._conn.execute(query, params + (limit,)).fetchall()
+
+        return [self._row_to_job(row) for row in rows]
+
+    def cancel(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Cancel a queued job or ask a running job to stop."""
+        job = self.get_job(task_id)
+        if job is None or job["status"] in TERMINAL_STATUSES:
+            return job
+
+        with self._cond:
+            self._cancel_requested.add(task_id)
+
+        # A worker of any process may claim the job meanwhile; then it is asked to stop instead
+        with self._db_lock:
+            cancelled = self._conn.execute(
+                "UPDATE jobs SET status = 'cancelled', cancel_requested = 1, finished_at = ? "
+                "WHERE task_id = ? AND status = 'queued'",
+                (datetime.now().isoformat(), task_id)
+            ).rowcount == 1
+            if not cancelled:
+                self._conn.execute(
+                    "UPDATE jobs SET cancel_requested = 1, message = 'Cancellation requested' "
+                    "WHERE task_id = ? AND status = 'running'",
+                    (task_id,)
+                )
+            self._conn.commit()
+
+        return self.get_job(task_id)
+
+    def _connect(self):
+        """Open the SQLite connection on first use."""
+        if self._conn is not None:
+            return
+
+        with self._db_lock:
+            if self._conn is not None:
+                return
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.execute(_SCHEMA)
+            # Databases created before jobs recorded their owner
+            if "owner" not in {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}:
+                conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+            conn.commit()
+            self._conn = conn
+
+    def _update(self, task_id: str, **fields):
+        """Persist changed job fields."""
+        if not fields:
+            return
+
+        assignments = ", ".join(f"{key} = ?" for key in fields)
+        with self._db_lock:
+            self._conn.execute(
+                f"UPDATE jobs SET {assignments} WHERE task_id = ?",
+                tuple(fields.values()) + (task_id,)
+            )
+            self._conn.commit()
+
+    def _claim(self, task_id: str) -> bool:
+        """Atomically move a queued job to running for this process; False if another worker took it."""
+        with self._db_lock:
+            claimed = self._conn.execute(
+                "UPDATE jobs SET status = 'running', started_at = ?, owner = ? "
+                "WHERE task_id = ? AND status = 'queued'",
+                (datetime.now().isoformat(), self.owner, task_id)
+            ).rowcount == 1
+            self._conn.commit()
+        return claimed
+
+    def _is_cancel_requested(self, task_id: str) -> bool:
+        """Whether the job should stop; the shared database is read at most every ``CANCEL_POLL_SECONDS``."""
+        now = time.monotonic()
+        with self._cond:
+            if task_id in self._cancel_requested:
+                return True
+            if now - self._cancel_polled.get(task_id, 0.0) < CANCEL_POLL_SECONDS:
+                return False
+            self._cancel_polled[task_id] = now
+
+        with self._db_lock:
+            row = self._conn.execute("SELECT cancel_requested FROM jobs WHERE task_id = ?", (task_id,)).fetchone()
+        if not row or not row["cancel_requested"]:
+            return False
+        with self._cond:
+            self._cancel_requested.add(task_id)
+        return True
+
+    def _row_to_job(self, row: sqlite3.Row, include_result: bool = False) -> Dict[str, Any]:
+        """Convert a database row to a job dictionary."""
+        job = {
+            "task_id": row["task_id"],
+            "job_type": row["job_type"],
+            "status": row["status"],
+            "priority": row["priority"],
+            "progress": row["progress"],
+            "message": row["message"],
+            "error": row["error"],
+            "created_at": row["created_at"],
+            "started_at": row["started_at"],
+            "finished_at": row["finished_at"],
+        }
+
+        if include_result:
+            job["parameters"] = json.loads(row["parameters"]) if row["parameters"] else {}
+            job["result"] = json.loads(row["result"]) if row["result"] else None
+
+        return job
+
+    def _next_task(self) -> Optional[str]:
+        """Block until a job is available or the service stops."""
+        with self._cond:
+            while self._running and not self._queue:
+                self._cond.wait()
+            if not self._running:
+                return None
+            _, _, task_id = heapq.heappop(self._queue)
+            return task_id
+
+    def _worker_loop(self):
+        while True:
+            task_id = self._next_task()
+            if task_id is None:
+                return
+
+            try:
+                self._run_job(task_id)
+            except Exception as e:
+                logger.error(f"Unexpected error in job worker for {task_id}: {e}")
+
+    def _run_job(self, task_id: str):
+        """Run a single job and record its outcome."""
+        job = self.get_job(task_id, include_result=True)
+        if job is None or job["status"] != "queued":
+            return
+
+        if not self._claim(task_id):
+            logger.debug(f"Job {task_id} was claimed by another worker")
+            return
+        with self._cond:
+            self._active.add(task_id)
+
+        try:
+            if self._is_cancel_requested(task_id):
+                raise JobCancelled(task_id)
+            handler = self._handlers.get(job["job_type"])
+            if handler is None:
+                raise ValueError(f"Unknown job type: {job['job_type']}")
+
+            logger.info(f"Running job {task_id} ({job['job_type']})")
+            result = handler(job["parameters"], JobContext(self, task_id))
+            self._update(
+                task_id,
+                status="completed",
+                progress=1.0,
+                result=json.dumps(result, default=_json_default),
+                finished_at=datetime.now().isoformat()
+            )
+            logger.info(f"Job {task_id} completed")
+
+        except JobCancelled:
+            self._update(task_id, status="cancelled", finished_at=datetime.now().isoformat())
+            logger.info(f"Job {task_id} cancelled")
+
+        except Exception as e:
+            logger.error(f"Job {task_id} failed: {e}")
+            self._update(task_id, status="failed", error=str(e), finished_at=datetime.now().isoformat())
+
+        finally:
+            with self._cond:
+                self._cancel_requested.discard(task_id)
+                self._cancel_polled.pop(task_id, None)
+                self._active.discard(task_id)
+
+
+# Global instance
+job_service = JobService()
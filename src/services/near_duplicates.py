@@ -0,0 +1,285 @@
+"""Clusters of near-duplicate PQRS (same problem at nearly the same address) found with MinHash LSH."""
+
+import zlib
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+import numpy as np
+
+from .gazetteer import match_key
+from .geo import normalize_name
+
+# MinHash signature length, split into LSH bands of NUM_PERM // BANDS rows. Two texts
+# with Jaccard similarity s share a band with probability 1 - (1 - s**3)**20: 0.93 at
+# s=0.5, 0.42 at s=0.3; candidates are then checked against the full signature
+NUM_PERM = 64
+BANDS = 20
+SHINGLE_CHARS = 4
+
+# Bucket members a new PQRS is compared with; bounds the work in crowded buckets
+MAX_BUCKET_PROBES = 8
+# Shingles hashed per vectorized step when signing many texts
+SIGN_BATCH_SHINGLES = 50000
+
+# Common spellings of Medellín address words, reduced to one form before shingling
+ADDRESS_WORDS = {
+    "calle": "cl", "cll": "cl", "carrera": "cr", "cra": "cr", "kr": "cr", "kra": "cr", "crr": "cr",
+    "avenida": "av", "diagonal": "dg", "diag": "dg", "transversal": "tv", "tr": "tv", "circular": "cq",
+    "numero": "", "no": "", "nro": "",
+}
+
+_MERSENNE = (1 << 31) - 1
+_rng = np.random.default_rng(7919)
+_A = _rng.integers(1, _MERSENNE, NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, _MERSENNE, NUM_PERM, dtype=np.uint64)
+
+
+def duplicate_text(asunto: Optional[str], direccion: Optional[str]) -> str:
+    """Normalized ``asunto`` + ``direccion_hecho`` text the signatures are computed on."""
+    words = match_key(f"{asunto or ''} {direccion or ''}").split()
+    return " ".join(w for w in (ADDRESS_WORDS.get(w, w) for w in words) if w)
+
+
+def _shingle_hashes(text: str) -> List[int]:
+    shingles = {text[i:i + SHINGLE_CHARS] for i in range(max(len(text) - SHINGLE_CHARS + 1, 1))}
+    return [zlib.crc32(s.encode()) & _MERSENNE for s in shingles]
+
+
+def minhash_many(texts: List[str]) -> np.ndarray:
+    """``(len(texts), NUM_PERM)`` MinHash signatures of the character shingles of non-empty texts."""
+    signatures = np.empty((len(texts), NUM_PERM), dtype=np.uint32)
+    start = 0
+    while start < len(texts):
+        hashes: List[int] = []
+        offsets: List[int] = []
+        end = start
+        while end < len(texts) and (not hashes or len(hashes) < SIGN_BATCH_SHINGLES):
+            offsets.append(len(hashes))
+            hashes.extend(_shingle_hashes(texts[end]))
+            end += 1
+        permuted = (_A[:, None] * np.asarray(hashes, dtype=np.uint64) + _B[:, None]) % _MERSENNE
+        signatures[start:end] = np.minimum.reduceat(permuted, offsets, axis=1).T
+        start = end
+    return signatures
+
+
+def minhash(text: str) -> Optional[np.ndarray]:
+    """MinHash signature of ``text``; None for empty text."""
+    return minhash_many([text])[0] if text else None
+
+
+def _components(size: int, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """Label of each of ``size`` nodes: the lowest node connected to it through the edges."""
+    labels = np.arange(size)
+    while True:
+        low = np.minimum(labels[left], labels[right])
+        updated = labels.copy()
+        np.minimum.at(updated, left, low)
+        np.minimum.at(updated, right, low)
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
+
+class DuplicateIndex:
+    """LSH buckets of active PQRS signatures and the near-duplicate clusters they form.
+
+    Signatures are banded into buckets per commune, so only PQRS of the same
+    commune sharing a band are compared; a pair whose signatures agree on at
+    least ``threshold`` of their positions (the estimated Jaccard similarity)
+    joins the same cluster. Clusters are connected components and are named
+    after the PQRS that started them. PQRS without a near-duplicate have no cluster.
+    """
+
+    def __init__(self, radicados: Iterable[str], texts: Iterable[str], zones: Iterable[Optional[str]],
+                 threshold: float):
+        self.threshold = threshold
+        self._signatures: Dict[str, Tuple[np.ndarray, str]] = {}
+        # Band hash -> its radicado, or the set of them once several share it
+        self._buckets: Dict[int, Union[str, Set[str]]] = {}
+        self._cluster_of: Dict[str, str] = {}
+        self._members: Dict[str, Set[str]] = {}
+        # Bucket and member sets created by this instance, which it may modify in place
+        self._owned: Set[int] = set()
+        self._owned_clusters: Set[str] = set()
+
+        self._build([str(r) for r in radicados], list(texts), [normalize_name(z) for z in zones])
+
+    def _build(self, radicados: List[str], texts: List[str], zones: List[str]):
+        """Index many PQRS at once: signatures and pair checks are vectorized, clusters found in one pass."""
+        kept = sorted({radicado: i for i, (radicado, text) in enumerate(zip(radicados, texts)) if text}.values())
+        if not kept:
+            return
+        radicados = [radicados[i] for i in kept]
+        zones = [zones[i] for i in kept]
+        signatures = minhash_many([texts[i] for i in kept])
+
+        position = {radicado: i for i, radicado in enumerate(radicados)}
+        left: List[int] = []
+        right: List[int] = []
+        for i, (radicado, signature, zone) in enumerate(zip(radicados, signatures, zones)):
+            for key in self._band_keys(signature, zone):
+                members = self._buckets.get(key)
+                if members is None:
+                    self._buckets[key] = radicado
+                    continue
+                if isinstance(members, str):
+                    members = self._buckets[key] = {members}
+                for probes, other in enumerate(members):
+                    if probes >= MAX_BUCKET_PROBES:
+                        break
+                    left.append(position[other])
+                    right.append(i)
+                members.add(radicado)
+            self._signatures[radicado] = (signature, zone)
+        self._owned = {key for key, members in self._buckets.items() if not isinstance(members, str)}
+
+        if not left:
+            return
+        pairs = np.unique(np.asarray(left, dtype=np.int64) * len(radicados) + np.asarray(right, dtype=np.int64))
+        left, right = pairs // len(radicados), pairs % len(radicados)
+        similar = np.concatenate([
+            (signatures[left[s:s + SIGN_BATCH_SHINGLES]] == signatures[right[s:s + SIGN_BATCH_SHINGLES]]).mean(axis=1)
+            for s in range(0, len(pairs), SIGN_BATCH_SHINGLES)
+        ]) >= self.threshold
+        labels = _components(len(radicados), left[similar], right[similar])
+
+        clustered = np.flatnonzero(np.bincount(labels, minlength=len(radicados))[labels] > 1)
+        for i in clustered:
+            cluster = radicados[labels[i]]
+            self._cluster_of[radicados[i]] = cluster
+            self._members.setdefault(cluster, set()).add(radicados[i])
+        self._owned_clusters = set(self._members)
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def _band_keys(self, signature: np.ndarray, zone: str) -> List[int]:
+        rows = NUM_PERM // BANDS
+        return [hash((zone, band, signature[band * rows:(band + 1) * rows].tobytes())) for band in range(BANDS)]
+
+    def _bucket(self, key: int) -> Iterable[str]:
+        members = self._buckets.get(key, ())
+        return (members,) if isinstance(members, str) else members
+
+    def _bucket_set(self, key: int) -> Set[str]:
+        """The bucket at ``key`` as a set this index may modify, copied if shared with the one it derives from."""
+        if key not in self._owned:
+            self._buckets[key] = set(self._bucket(key))
+            self._owned.add(key)
+        return self._buckets[key]
+
+    def _bucket_add(self, key: int, radicado: str):
+        members = self._buckets.get(key)
+        if members is None:
+            self._buckets[key] = radicado
+        else:
+            self._bucket_set(key).add(radicado)
+
+    def _bucket_discard(self, key: int, radicado: str):
+        members = self._buckets.get(key)
+        if isinstance(members, str):
+            if members == radicado:
+                del self._buckets[key]
+        elif members is not None:
+            members = self._bucket_set(key)
+            members.discard(radicado)
+            if not members:
+                del self._buckets[key]
+                self._owned.discard(key)
+
+    def _insert(self, radicado: str, signature: Optional[np.ndarray], zone: str):
+        if signature is None:
+            return
+        candidates: Dict[str, None] = {}
+        for key in self._band_keys(signature, zone):
+            for probes, other in enumerate(self._bucket(key)):
+                if probes >= MAX_BUCKET_PROBES:
+                    break
+                candidates[other] = None
+            self._bucket_add(key, radicado)
+        self._signatures[radicado] = (signature, zone)
+        if not candidates:
+            return
+
+        candidates = list(candidates)
+        agreement = (np.stack([self._signatures[other][0] for other in candidates]) == signature).mean(axis=1)
+        clusters = {self._cluster_of.get(other, other)
+                    for other, share in zip(candidates, agreement) if share >= self.threshold}
+        if not clusters:
+            return
+        # The largest cluster absorbs the others and the new PQRS
+        target = max(clusters, key=lambda c: (len(self._members.get(c, ())), c))
+        if target not in self._owned_clusters:
+            self._members[target] = set(self._members.get(target, {target}))
+            self._owned_clusters.add(target)
+        members = self._members[target]
+        joined = {radicado}
+        for cluster in clusters - {target}:
+            joined |= self._members.pop(cluster, {cluster})
+            self._owned_clusters.discard(cluster)
+        members |= joined
+        self._cluster_of[target] = target
+        for member in joined:
+            self._cluster_of[member] = target
+
+    def _remove(self, radicado: str) -> Set[str]:
+        """Drop a PQRS, returning the other members of its dissolved cluster."""
+        entry = self._signatures.pop(radicado, None)
+        if entry is None:
+            return set()
+        for key in self._band_keys(*entry):
+            self._bucket_discard(key, radicado)
+
+        cluster = self._cluster_of.get(radicado)
+        if cluster is None:
+            return set()
+        members = set(self._members.pop(cluster))
+        self._owned_clusters.discard(cluster)
+        for member in members:
+            del self._cluster_of[member]
+        members.discard(radicado)
+        return members
+
+    def with_changes(self, removed: Iterable[str], added: Iterable[Tuple[str, str, Optional[str]]]) -> "DuplicateIndex":
+        """A new index without the ``removed`` radicados and with the ``(radicado, text, zone)`` entries added.
+
+        Clusters that lost a member are dissolved and their remaining members
+        re-inserted, so they split if the removed PQRS was what joined them.
+        This index is left untouched; unchanged buckets are shared with it.
+        """
+        index = DuplicateIndex([], [], [], self.threshold)
+        index._signatures = dict(self._signatures)
+        index._buckets = dict(self._buckets)
+        index._cluster_of = dict(self._cluster_of)
+        index._members = dict(self._members)
+
+        added = [(str(radicado), text, normalize_name(zone)) for radicado, text, zone in added]
+        orphans: Set[str] = set()
+        for radicado in {str(r) for r in removed} | {radicado for radicado, _, _ in added}:
+            orphans |= index._remove(radicado)
+
+        reinserted = [(r, index._signatures[r]) for r in sorted(orphans) if r in index._signatures]
+        for radicado, _ in reinserted:
+            index._remove(radicado)
+        for radicado, (signature, zone) in reinserted:
+            index._insert(radicado, signature, zone)
+        for radicado, text, zone in added:
+            index._insert(radicado, minhash(text), zone)
+        return index
+
+    def cluster_of(self, radicado: str) -> Optional[str]:
+        """Cluster id of a PQRS, or None when it has no near-duplicate."""
+        return self._cluster_of.get(str(radicado))
+
+    def members(self, cluster_id: str) -> List[str]:
+        """Radicados in a cluster, sorted."""
+        return sorted(self._members.get(cluster_id, ()))
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "indexed_pqrs": len(self._signatures),
+            "clusters": len(self._members),
+            "clustered_pqrs": len(self._cluster_of),
+            "largest_cluster": max((len(m) for m in self._members.values()), default=0),
+        }
@@ -0,0 +1,494 @@
+"""Out-of-core PQRS storage: one SQLite file per year/month partition."""
+
+import copy
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .dataset import DatasetSnapshot, _as_str
+from .date_index import DATE_INDEX_FIELDS, split_date_filters
+from .storage import (DATE_FORMAT, INDEXED_COLUMNS, POSITION_COLUMN, StorageBackend, _quote,
+                      aggregate_sql, parse_order, where_sql)
+
+logger = logging.getLogger(__name__)
+
+# Columns whose distinct values each partition records, so equality filters on them skip partitions
+PRUNING_COLUMNS = ("comuna_hecho",)
+
+
+def partition_keys(frame: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """Year and month of each row, from ``ano``/``mes`` or else ``fecha_radicacion``; -1 when unknown."""
+    if "fecha_radicacion" in frame.columns:
+        filed = pd.to_datetime(frame["fecha_radicacion"], errors="coerce")
+    else:
+        filed = pd.Series(pd.NaT, index=frame.index, dtype="datetime64[ns]")
+
+    keys = []
+    for column, fallback in (("ano", filed.dt.year), ("mes", filed.dt.month)):
+        values = (pd.to_numeric(frame[column], errors="coerce").astype(float) if column in frame.columns
+                  else pd.Series(np.nan, index=frame.index))
+        keys.append(values.fillna(fallback.astype(float)).fillna(-1).astype(int).to_numpy())
+    return keys[0], keys[1]
+
+
+def _partition_entry(ano: int, mes: int) -> Dict[str, Any]:
+    ano_part = str(ano) if ano >= 0 else "none"
+    mes_part = f"{mes:02d}" if mes >= 0 else "none"
+    return {
+        "file": f"ano={ano_part}/mes={mes_part}.db",
+        "ano": ano if ano >= 0 else None,
+        "mes": mes if mes >= 0 else None,
+        "rows": 0,
+        "ranges": {},
+        "values": {column: [] for column in PRUNING_COLUMNS},
+    }
+
+
+def _sort_key(entry: Dict[str, Any]) -> Tuple:
+    return entry["ano"] is None, entry["ano"] or 0, entry["mes"] is None, entry["mes"] or 0
+
+
+class PartitionedBackend(StorageBackend):
+    """PQRS rows split by year and month into one SQLite file per partition.
+
+    Each version of the table is a directory of partition files plus a
+    manifest with the row count, the date bounds of ``fecha_radicacion`` and
+    ``fecha_vencimiento`` and the comunas of every partition. Reads skip the
+    partitions a filter on ano/mes, those dates or ``comuna_hecho`` rules out
+    and merge the answers of the others. ``write_version`` builds a version
+    from a stream of frames, so the table never has to fit in memory.
+    """
+
+    name = "partitioned"
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.version: Optional[str] = None
+        self.generation: Optional[int] = None
+        self._manifests: Dict[str, Dict[str, Any]] = {}
+        # Version read by each published generation not yet retired; those versions stay on disk
+        self._generation_versions: Dict[int, str] = {}
+        self._frame: Optional[pd.DataFrame] = None
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._last_scan: Dict[str, int] = {}
+
+    # Connections
+
+    def _path(self, version: str, entry: Dict[str, Any]) -> Path:
+        return self.directory / version / entry["file"]
+
+    def _connection(self, path: Path) -> sqlite3.Connection:
+        connections = getattr(self._local, "connections", None)
+        if connections is None:
+            connections = self._local.connections = {}
+        conn = connections.get(str(path))
+        if conn is None:
+            # Drop this thread's connections to removed versions
+            for key in [k for k in connections if Path(k).relative_to(self.directory).parts[0] not in self._manifests]:
+                connections.pop(key).close()
+            conn = connections[str(path)] = sqlite3.connect(path)
+        return conn
+
+    # Writes
+
+    def _prepare(self, frame: pd.DataFrame, manifest: Dict[str, Any], positions: Iterable[int]) -> pd.DataFrame:
+        """Rows as stored: the manifest's columns, dates as sortable text, radicados as strings."""
+        stored = frame.reindex(columns=manifest["columns"])
+        for column in manifest["date_columns"]:
+            stored[column] = pd.to_datetime(stored[column], errors="coerce").dt.strftime(DATE_FORMAT)
+        for column in stored.columns[stored.dtypes == object]:
+            stored[column] = stored[column].map(lambda v: v.strftime(DATE_FORMAT) if isinstance(v, datetime) else v)
+        if "numero_radicado_entrada" in stored.columns:
+            stored["numero_radicado_entrada"] = stored["numero_radicado_entrada"].map(
+                lambda v: _as_str(v) if pd.notna(v) else None)
+        stored[POSITION_COLUMN] = np.asarray(list(positions), dtype=int)
+        return stored
+
+    @staticmethod
+    def _new_manifest(version: str, frame: pd.DataFrame, columns: Optional[List[str]]) -> Dict[str, Any]:
+        columns = list(columns) if columns is not None else list(frame.columns)
+        dates = [c for c in columns if c in frame.columns and pd.api.types.is_datetime64_any_dtype(frame[c])]
+        dates += [c for c in DATE_INDEX_FIELDS if c in columns and c not in dates]
+        return {"version": version, "columns": columns, "date_columns": dates, "next_position": 0,
+                "partitions": {}}
+
+    @staticmethod
+    def _track(entry: Dict[str, Any], rows: pd.DataFrame):
+        """Widen a partition's date bounds and value sets with stored rows."""
+        for field in DATE_INDEX_FIELDS:
+            if field in rows.columns:
+                dates = rows[field].dropna()
+                if len(dates):
+                    low, high = entry["ranges"].get(field, (dates.min(), dates.max()))
+                    entry["ranges"][field] = [min(low, dates.min()), max(high, dates.max())]
+        for column in PRUNING_COLUMNS:
+            if column in rows.columns:
+                seen = set(entry["values"][column])
+                seen.update(_as_str(v.item() if isinstance(v, np.generic) else v) for v in rows[column].dropna().unique())
+                entry["values"][column] = sorted(seen)
+
+    def _store_rows(self, version: str, manifest: Dict[str, Any], frame: pd.DataFrame, positions: Iterable[int],
+                    connections: Dict[str, sqlite3.Connection]):
+        """Append rows to their partitions, creating partition files as needed."""
+        anos, meses = partition_keys(frame)
+        stored = self._prepare(frame, manifest, positions)
+        for (ano, mes), rows in stored.groupby([anos, meses], sort=False):
+            entry = _partition_entry(int(ano), int(mes))
+            entry = manifest["partitions"].setdefault(entry["file"], entry)
+            conn = connections.get(entry["file"])
+            if conn is None:
+                path = self._path(version, entry)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                conn = connections[entry["file"]] = sqlite3.connect(path)
+            rows.to_sql("pqrs", conn, index=False, if_exists="append")
+            entry["rows"] += len(rows)
+            self._track(entry, rows)
+
+    @staticmethod
+    def _create_indexes(conn: sqlite3.Connection, columns: List[str]):
+        with conn:
+            for indexed in INDEXED_COLUMNS["pqrs"] + [POSITION_COLUMN]:
+                indexed = indexed if isinstance(indexed, tuple) else (indexed,)
+                if all(c in columns for c in indexed):
+                    name = f"ix_pqrs_{'_'.join(indexed)}"
+                    conn.execute(f'CREATE INDEX IF NOT EXISTS "{name}" ON pqrs ({", ".join(map(_quote, indexed))})')
+
+    def _save_manifest(self, version: str, manifest: Dict[str, Any]):
+        path = self.directory / version / "manifest.json"
+        temporary = path.with_suffix(".tmp")
+        temporary.write_text(json.dumps(manifest, default=str))
+        temporary.replace(path)
+        self._manifests[version] = manifest
+
+    def write_version(self, chunks: Iterable[pd.DataFrame], columns: Optional[List[str]] = None) -> Tuple[str, int]:
+        """Store a stream of PQRS frames as a new, unpublished version; returns it and its row count.
+
+        Rows keep their order across chunks, and the stored columns are
+        ``columns`` (by default those of the first chunk). Only one chunk is
+        held in memory at a time.
+        """
+        version = str(time.time_ns())
+        (self.directory / version).mkdir(parents=True)
+        manifest: Optional[Dict[str, Any]] = None
+        connections: Dict[str, sqlite3.Connection] = {}
+        started = time.perf_counter()
+
+        try:
+            for chunk in chunks:
+                if manifest is None:
+                    manifest = self._new_manifest(version, chunk, columns)
+                start = manifest["next_position"]
+                manifest["next_position"] = start + len(chunk)
+                self._store_rows(version, manifest, chunk, range(start, start + len(chunk)), connections)
+
+            manifest = manifest or self._new_manifest(version, pd.DataFrame(columns=columns or []), columns)
+            for conn in connections.values():
+                self._create_indexes(conn, manifest["columns"])
+                conn.execute("PRAGMA journal_mode=WAL")
+        finally:
+            for conn in connections.values():
+                conn.close()
+
+        self._save_manifest(version, manifest)
+        logger.info(f"Stored {manifest['next_position']} PQRS rows in {len(manifest['partitions'])} partitions "
+                    f"in {(time.perf_counter() - started) * 1000:.0f}ms")
+        return version, manifest["next_position"]
+
+    def _activate(self, version: str):
+        self.version = version
+        self._remove_unused()
+
+    def _remove_unused(self):
+        """Delete the versions older than the published one that no unretired generation reads."""
+        used = set(self._generation_versions.values()) | {self.version}
+        for path in self.directory.iterdir():
+            # Newer directories are versions still being written
+            if path.is_dir() and path.name not in used and path.name < self.version:
+                self._manifests.pop(path.name, None)
+                shutil.rmtree(path, ignore_errors=True)
+
+    @staticmethod
+    def _link(source: Path, target: Path):
+        """Share an unchanged partition file with a new version; stored versions are never written again."""
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copy2(source, target)
+
+    def write_changes(self, snapshot: DatasetSnapshot, radicados: Iterable[str]) -> str:
+        """Store a new, unpublished version with the rows of ``radicados`` taken from ``snapshot.pqrs``.
+
+        The new version is a copy of the one ``snapshot`` was derived from
+        (``snapshot.partitions``, else the published one), whose files are left
+        untouched for the readers still pinned to it. Partitions without a
+        changed row are hard-linked; the others are copied, and their old rows
+        deleted and new ones inserted in one transaction. Rows keep their
+        positions; new radicados are appended.
+        """
+        with self._write_lock:
+            return self._write_changes(snapshot, radicados)
+
+    def _write_changes(self, snapshot: DatasetSnapshot, radicados: Iterable[str]) -> str:
+        base = snapshot.partitions or self.version
+        published = self._manifests[base]
+        version = str(time.time_ns())
+        manifest = copy.deepcopy(published)
+        manifest["version"] = version
+        radicados = [_as_str(r) for r in radicados]
+
+        # Stored radicados and positions of the changed rows, by partition
+        found: Dict[str, List[Tuple[str, int]]] = {}
+        for file, entry in published["partitions"].items():
+            conn = self._connection(self._path(base, entry))
+            for chunk in range(0, len(radicados), 500):
+                batch = radicados[chunk:chunk + 500]
+                rows = conn.execute(f'SELECT numero_radicado_entrada, "{POSITION_COLUMN}" FROM pqrs '
+                                    f'WHERE numero_radicado_entrada IN ({", ".join("?" * len(batch))})',
+                                    batch).fetchall()
+                if rows:
+                    found.setdefault(file, []).extend(rows)
+        positions = {radicado: position for rows in found.values() for radicado, position in rows}
+
+        rows = snapshot.pqrs.iloc[sorted(snapshot.radicado_positions[r] for r in radicados
+                                         if r in snapshot.radicado_positions)]
+        assigned = []
+        for radicado in rows["numero_radicado_entrada"].map(_as_str):
+            if radicado not in positions:
+                positions[radicado] = manifest["next_position"]
+                manifest["next_position"] += 1
+            assigned.append(positions[radicado])
+
+        anos, meses = partition_keys(rows)
+        inserts: Dict[str, pd.DataFrame] = {}
+        for (ano, mes), part in self._prepare(rows, manifest, assigned).groupby([anos, meses], sort=False):
+            entry = _partition_entry(int(ano), int(mes))
+            manifest["partitions"].setdefault(entry["file"], entry)
+            inserts[entry["file"]] = part
+
+        (self.directory / version).mkdir(parents=True)
+        for file, entry in manifest["partitions"].items():
+            path = self._path(version, entry)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if file not in found and file not in inserts:
+                self._link(self._path(base, entry), path)
+                continue
+
+            deleted = [radicado for radicado, _ in found.get(file, [])]
+            part = inserts.get(file)
+            conn = sqlite3.connect(path)
+            try:
+                if file in published["partitions"]:
+                    self._connection(self._path(base, entry)).backup(conn)
+                    with conn:
+                        for chunk in range(0, len(deleted), 500):
+                            batch = deleted[chunk:chunk + 500]
+                            conn.execute(f'DELETE FROM pqrs WHERE numero_radicado_entrada IN '
+                                         f'({", ".join("?" * len(batch))})', batch)
+                        if part is not None:
+                            values = part.astype(object).where(part.notna(), None).itertuples(index=False, name=None)
+                            conn.executemany(
+                                f'INSERT INTO pqrs ({", ".join(map(_quote, part.columns))}) '
+                                f'VALUES ({", ".join("?" * len(part.columns))})',
+                                [tuple(v.item() if isinstance(v, np.generic) else v for v in row) for row in values]
+                            )
+                else:
+                    part.to_sql("pqrs", conn, index=False)
+                entry["rows"] += (len(part) if part is not None else 0) - len(deleted)
+                if part is not None:
+                    self._track(entry, part)
+                self._create_indexes(conn, manifest["columns"])
+                conn.execute("PRAGMA journal_mode=WAL")
+            finally:
+                conn.close()
+
+        self._save_manifest(version, manifest)
+        logger.info(f"Stored {len(rows)} changed PQRS rows in version {version} "
+                    f"({len(set(found) | set(inserts))} of {len(manifest['partitions'])} partitions rewritten)")
+        return version
+
+    def publish(self, snapshot, changed_radicados=None):
+        with self._write_lock:
+            version = self.version
+            if snapshot.partitions is not None:
+                # Out of core, changed rows were already stored by ``write_changes`` under a new version
+                version = snapshot.partitions
+            elif snapshot.pqrs is not None and snapshot.pqrs is not self._frame:
+                manifest = self._manifests.get(self.version)
+                if (changed_radicados is not None and manifest is not None and self.generation is not None
+                        and set(snapshot.pqrs.columns) <= set(manifest["columns"])):
+                    version = self._write_changes(snapshot, changed_radicados)
+                else:
+                    version, _ = self.write_version([snapshot.pqrs])
+            self._frame = snapshot.pqrs
+            self.generation = snapshot.generation
+            if version is not None:
+                self._generation_versions[snapshot.generation] = version
+                if version != self.version:
+                    self._activate(version)
+
+    def retire(self, snapshot):
+        with self._write_lock:
+            if self._generation_versions.pop(snapshot.generation, None) is not None and self.version:
+                self._remove_unused()
+
+    # Reads
+
+    def serves(self, snapshot):
+        if snapshot.partitions is not None:
+            return snapshot.partitions in self._manifests
+        return self.version is not None and snapshot.generation == self.generation
+
+    def _version_of(self, snapshot: DatasetSnapshot) -> Tuple[str, Dict[str, Any]]:
+        version = snapshot.partitions or self.version
+        return version, self._manifests[version]
+
+    def partitions_for(self, snapshot: DatasetSnapshot, filters: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Partitions that can hold rows matching ``filters``, in chronological order."""
+        _, manifest = self._version_of(snapshot)
+        ranges, filters = split_date_filters(filters)
+
+        def wanted(column: str, normalize) -> Optional[set]:
+            if column not in filters:
+                return None
+            values = filters[column] if isinstance(filters[column], list) else [filters[column]]
+            return {normalize(v) for v in values if v is not None and not pd.isna(v)}
+
+        keys = {dim: wanted(dim, lambda v: int(float(v))) for dim in ("ano", "mes")}
+        values = {column: wanted(column, _as_str) for column in PRUNING_COLUMNS}
+        bounds = {field: (start.strftime(DATE_FORMAT) if start else None, end.strftime(DATE_FORMAT) if end else None)
+                  for field, (start, end) in ranges.items() if field in manifest["columns"]}
+
+        selected = []
+        for entry in sorted(manifest["partitions"].values(), key=_sort_key):
+            if not entry["rows"]:
+                continue
+            if any(accepted is not None and entry[dim] not in accepted for dim, accepted in keys.items()):
+                continue
+            if any(accepted is not None and not accepted & set(entry["values"].get(column, []))
+                   for column, accepted in values.items()):
+                continue
+            if any(field not in entry["ranges"]
+                   or (start is not None and entry["ranges"][field][1] < start)
+                   or (end is not None and entry["ranges"][field][0] > end)
+                   for field, (start, end) in bounds.items()):
+                continue
+            selected.append(entry)
+
+        self._last_scan = {"partitions_read": len(selected), "partitions_total": len(manifest["partitions"])}
+        return selected
+
+    @staticmethod
+    def _parse_dates(df: pd.DataFrame, manifest: Dict[str, Any]) -> pd.DataFrame:
+        for column in manifest["date_columns"]:
+            if column in df.columns:
+                df[column] = pd.to_datetime(df[column], format=DATE_FORMAT, errors="coerce")
+        return df
+
+    def select(self, snapshot, filters=None, limit=None, order_by=None, columns=None):
+        version, manifest = self._version_of(snapshot)
+        known = manifest["columns"]
+        wanted = [c for c in (columns or known) if c in known]
+
+        order = parse_order(order_by)
+        if order and order[0] not in known:
+            order = None
+        fetched = wanted + [c for c in ([order[0]] if order else []) + [POSITION_COLUMN] if c not in wanted]
+
+        order_sql = f'"{POSITION_COLUMN}"'
+        if order:
+            order_sql = f'"{order[0]}" IS NULL, "{order[0]}" {"DESC" if order[1] else "ASC"}, {order_sql}'
+        where, params = where_sql(filters, known)
+        sql = f'SELECT {", ".join(map(_quote, fetched))} FROM pqrs{where} ORDER BY {order_sql}'
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+
+        frames = [pd.read_sql_query(sql, self._connection(self._path(version, entry)), params=params)
+                  for entry in self.partitions_for(snapshot, filters)]
+        frames = [frame for frame in frames if len(frame)]
+        if not frames:
+            return pd.DataFrame(columns=wanted)
+
+        # Each partition is already sorted; merge them by the same ordering
+        df = pd.concat(frames, ignore_index=True)
+        if order:
+            df = df.sort_values([order[0], POSITION_COLUMN], ascending=[not order[1], True],
+                                na_position="last", kind="stable")
+        else:
+            df = df.sort_values(POSITION_COLUMN, kind="stable")
+        if limit is not None:
+            df = df.head(limit)
+        return self._parse_dates(df[wanted].reset_index(drop=True), manifest)
+
+    def iter_select(self, snapshot, filters=None, columns=None, chunk_rows=10000):
+        """Rows partition by partition, in chronological order of the partitions.
+
+        Uses its own connection per partition, so the iterator can be consumed
+        from any thread (e.g. by a streaming response).
+        """
+        version, manifest = self._version_of(snapshot)
+        known = manifest["columns"]
+        wanted = [c for c in (columns or known) if c in known]
+        where, params = where_sql(filters, known)
+        sql = f'SELECT {", ".join(map(_quote, wanted))} FROM pqrs{where} ORDER BY "{POSITION_COLUMN}"'
+
+        for entry in self.partitions_for(snapshot, filters):
+            conn = sqlite3.connect(self._path(version, entry), check_same_thread=False)
+            try:
+                cursor = conn.execute(sql, params)
+                while True:
+                    rows = cursor.fetchmany(chunk_rows)
+                    if not rows:
+                        break
+                    yield self._parse_dates(pd.DataFrame(rows, columns=wanted), manifest)
+            finally:
+                conn.close()
+
+    def count(self, snapshot, filters=None):
+        version, manifest = self._version_of(snapshot)
+        partitions = self.partitions_for(snapshot, filters)
+        if not filters:
+            return sum(entry["rows"] for entry in partitions)
+
+        where, params = where_sql(filters, manifest["columns"])
+        return sum(
+            self._connection(self._path(version, entry)).execute(f"SELECT COUNT(*) FROM pqrs{where}", params).fetchone()[0]
+            for entry in partitions
+        )
+
+    def aggregate(self, snapshot, group_by, filters=None):
+        version, manifest = self._version_of(snapshot)
+        sql, params = aggregate_sql("pqrs", group_by, filters, manifest["columns"])
+
+        totals: Counter = Counter()
+        for entry in self.partitions_for(snapshot, filters):
+            for row in self._connection(self._path(version, entry)).execute(sql, params).fetchall():
+                totals[tuple(row[:-1])] += row[-1]
+
+        return [dict(zip(group_by, key), count=count)
+                for key, count in sorted(totals.items(), key=lambda item: -item[1]) if count]
+
+    def status(self):
+        manifest = self._manifests.get(self.version) if self.version else None
+        return {
+            "backend": self.name,
+            "path": str(self.directory),
+            "version": self.version,
+            "generation": self.generation,
+            "partitions": len(manifest["partitions"]) if manifest else 0,
+            "rows": sum(entry["rows"] for entry in manifest["partitions"].values()) if manifest else 0,
+            "last_scan": dict(self._last_scan)
+        }
@@ -0,0 +1,149 @@
+"""Vectorized priority and SLA urgency scoring for the PQRS backlog."""
+
+import heapq
+import logging
+import re
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .date_index import with_live_days
+from .geo import normalize_name
+
+logger = logging.getLogger(__name__)
+
+URGENT_KEYWORDS = ["emergencia", "urgente", "inmediato", "peligro", "accidente"]
+CRITICAL_TYPES = ["queja", "reclamo", "denuncia"]
+
+# Score contributions; a PQRS is "high" priority under the same rules as before
+KEYWORD_WEIGHT = 40.0
+TYPE_WEIGHTS = {"denuncia": 30.0, "queja": 25.0, "reclamo": 25.0, "peticion": 10.0, "sugerencia": 5.0}
+ELAPSED_WEIGHT = 10.0
+ELAPSED_HIGH_DAYS = 30
+SLA_POINTS_PER_DAY = 2.0
+SLA_MAX_POINTS = 60.0
+SLA_DUE_TODAY_POINTS = 30.0
+
+_KEYWORD_PATTERN = re.compile("|".join(re.escape(k) for k in URGENT_KEYWORDS))
+
+
+def score_frame(df: pd.DataFrame, now: Optional[datetime] = None) -> pd.DataFrame:
+    """Compute ``urgency_score`` and ``priority`` for every row in one vectorized pass.
+
+    The score adds the urgent-keyword match on ``asunto``, a weight per
+    ``tipo_solicitud``, a bonus past 30 elapsed days and an SLA component
+    that grows as ``fecha_vencimiento`` approaches and passes. Elapsed days
+    are counted from ``fecha_radicacion`` to ``now`` when the filing date is known.
+    """
+    now = pd.Timestamp(now or datetime.now())
+    n = len(df)
+
+    def column(name: str) -> pd.Series:
+        return df[name] if name in df.columns else pd.Series([None] * n, index=df.index)
+
+    subjects = column("asunto").astype(object).fillna("").astype(str).str.lower()
+    keyword = subjects.str.contains(_KEYWORD_PATTERN).to_numpy(dtype=bool)
+
+    # Case- and accent-insensitive, so "Petición" weighs like "peticion"; normalized once per distinct value
+    raw_types = column("tipo_solicitud").astype(object).fillna("").astype(str)
+    types = raw_types.map({value: normalize_name(value) for value in raw_types.unique()})
+    type_weight = types.map(TYPE_WEIGHTS).fillna(0.0).to_numpy(dtype=float)
+    critical = types.isin(CRITICAL_TYPES).to_numpy(dtype=bool)
+
+    if "fecha_radicacion" in df.columns:
+        elapsed = pd.to_numeric(with_live_days(df, now)["dias_transcurridos"], errors="coerce").to_numpy(dtype=float)
+    else:
+        elapsed = pd.to_numeric(column("dias_transcurridos"), errors="coerce").to_numpy(dtype=float)
+    overdue_elapsed = np.nan_to_num(elapsed, nan=0.0) > ELAPSED_HIGH_DAYS
+
+    due = pd.to_datetime(column("fecha_vencimiento"), errors="coerce")
+    days_remaining = ((due - now) / pd.Timedelta(days=1)).to_numpy(dtype=float)
+    sla = np.clip(SLA_DUE_TODAY_POINTS - days_remaining * SLA_POINTS_PER_DAY, 0.0, SLA_MAX_POINTS)
+    sla = np.nan_to_num(sla, nan=0.0)
+
+    score = keyword * KEYWORD_WEIGHT + type_weight + overdue_elapsed * ELAPSED_WEIGHT + sla
+    high = keyword | critical | overdue_elapsed
+
+    return pd.DataFrame(
+        {"urgency_score": np.round(score, 2), "priority": np.where(high, "high", "medium")},
+        index=df.index
+    )
+
+
+class UrgencyQueue:
+    """Per-zone binary heaps of active PQRS ordered by descending urgency score."""
+
+    def __init__(self, radicados: Iterable[str], scores: Iterable[float], zones: Iterable[Optional[str]]):
+        self._heaps: Dict[str, List[Tuple[float, str]]] = {}
+        everything: List[Tuple[float, str]] = []
+
+        for radicado, score, zone in zip(radicados, scores, zones):
+            item = (-float(score), str(radicado))
+            everything.append(item)
+            self._heaps.setdefault(normalize_name(zone), []).append(item)
+
+        for heap in self._heaps.values():
+            heapq.heapify(heap)
+        heapq.heapify(everything)
+        self._all = everything
+
+    def __len__(self) -> int:
+        return len(self._all)
+
+    def with_changes(self, removed: Iterable[Tuple[str, Optional[str]]],
+                     added: Iterable[Tuple[str, float, Optional[str]]]) -> "UrgencyQueue":
+        """A new queue without the ``(radicado, zone)`` pairs in ``removed`` and with ``added`` entries.
+
+        Heaps of zones without changes are shared with this queue, which is left untouched.
+        """
+        removed_by_zone: Dict[str, Set[str]] = {}
+        for radicado, zone in removed:
+            removed_by_zone.setdefault(normalize_name(zone), set()).add(str(radicado))
+        added_by_zone: Dict[str, List[Tuple[float, str]]] = {}
+        for radicado, score, zone in added:
+            added_by_zone.setdefault(normalize_name(zone), []).append((-float(score), str(radicado)))
+
+        heaps = dict(self._heaps)
+        for key in removed_by_zone.keys() | added_by_zone.keys():
+            gone = removed_by_zone.get(key, set())
+            heap = [item for item in heaps.get(key, []) if item[1] not in gone] + added_by_zone.get(key, [])
+            heapq.heapify(heap)
+            if heap:
+                heaps[key] = heap
+            else:
+                heaps.pop(key, None)
+
+        gone = set().union(*removed_by_zone.values())
+        everything = [item for item in self._all if item[1] not in gone]
+        for items in added_by_zone.values():
+            everything.extend(items)
+        heapq.heapify(everything)
+
+        queue = UrgencyQueue([], [], [])
+        queue._heaps, queue._all = heaps, everything
+        return queue
+
+    def top(self, n: int, zone: Optional[str] = None, exclude: Optional[Set[str]] = None) -> List[Tuple[str, float]]:
+        """The ``n`` most urgent (radicado, score) pairs, reading the heap without copying it.
+
+        Walks the heap array best-first with a small frontier heap, so the cost
+        is O(n log n) regardless of the zone's size.
+        """
+        heap = self._all if zone is None else self._heaps.get(normalize_name(zone), [])
+        exclude = exclude or set()
+        result: List[Tuple[str, float]] = []
+        if not heap:
+            return result
+
+        frontier = [(heap[0], 0)]
+        while frontier and len(result) < n:
+            (neg_score, radicado), i = heapq.heappop(frontier)
+            if radicado not in exclude:
+                result.append((radicado, -neg_score))
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child], child))
+
+        return result
@@ -1,9 +1,15 @@
 """RAG service for semantic search and retrieval of PQRS data."""
 
+import json
 import logging
-from typing import List, Dict, Any, Optional
+import math
+import time
+from dataclasses import replace
+from typing import List, Dict, Any, Optional, Tuple, Union
 from pathlib import Path
 
+import numpy as np
+
 from langchain_community.vectorstores import Chroma
 from langchain_openai import OpenAIEmbeddings
 from langchain.text_splitter import RecursiveCharacterTextSplitter
@@ -12,54 +18,164 @@ from langchain.docstore.document import Document
 from ..config import settings
 from ..models.pqrs import PQRSRecord
 from .data_service import data_service
+from .dataset import DatasetSnapshot, _as_str
+from .search_cache import MISSING, CachedEmbeddings, LRUCache
+from .vector_partitions import PartitionedVectorStore
 
 logger = logging.getLogger(__name__)
 
+# Collection used before the active one was tracked (langchain's default name)
+DEFAULT_COLLECTION = "langchain"
+
+# PQRS records embedded and added to the index per batch while building it
+BUILD_BATCH_RECORDS = 1000
+
+VectorStore = Union[Chroma, PartitionedVectorStore]
+
+# Hybrid search cost model, in milliseconds. Scoring the filtered candidates
+# exactly costs a fixed lookup plus a per-candidate fetch of its vectors; ANN
+# with a metadata ``where`` costs a fixed search plus a pre-filter pass over
+# the searched chunks. Measured on a local 16k-chunk, 384-dimension index.
+EXACT_FIXED_MS = 5.0
+EXACT_PER_CANDIDATE_MS = 0.08
+ANN_FIXED_MS = 2.0
+ANN_WHERE_PER_CHUNK_MS = 0.0013
+# Filters ANN cannot push down are applied to its hits afterwards, so it has to
+# fetch about ``limit * ANN_OVERFETCH / selectivity`` hits, at a cost per hit
+# and up to ``ANN_MAX_HITS``; when that cannot fill ``limit`` the exact plan is used.
+ANN_PER_HIT_MS = 0.05
+ANN_OVERFETCH = 2
+ANN_MAX_HITS = 1000
+# Above this many candidates the exact plan is never chosen, whatever the estimates say
+EXACT_MAX_CANDIDATES = 5000
+# Radicados per embedding lookup of the exact plan
+EXACT_FETCH_BATCH = 500
+
+# PQRS filter columns that can be pushed down to the chunk metadata, and their metadata key
+METADATA_FILTERS = {
+    "estado": "estado",
+    "tipo_solicitud": "tipo_solicitud",
+    "comuna_hecho": "comuna",
+    "barrio_hecho": "barrio",
+    "ano": "ano",
+    "numero_radicado_entrada": "radicado",
+}
+
 
 class RAGService:
-    """Service for RAG-based search and retrieval."""
+    """Service for RAG-based search and retrieval.
+
+    Query embeddings are kept in an LRU cache, and semantic search results
+    in a TTL cache keyed by query, filters, limit and the data and index
+    generations, so any reload or index rebuild makes old entries miss.
+    """
 
     def __init__(self):
-        self.embeddings = OpenAIEmbeddings(
-            model=settings.embedding_model,
-            openai_api_key=settings.openai_api_key
+        self.embeddings = CachedEmbeddings(
+            OpenAIEmbeddings(model=settings.embedding_model, openai_api_key=settings.openai_api_key),
+            settings.embedding_cache_size
         )
+        self._results = LRUCache(settings.search_cache_size, settings.search_cache_seconds)
+        self._results_state: Optional[tuple] = None
         self.persist_directory = Path(settings.chroma_persist_directory)
         self.persist_directory.mkdir(parents=True, exist_ok=True)
-        self.vectorstore: Optional[Chroma] = None
+        self._collection_file = self.persist_directory / "active_collection"
         self._initialized = False
+        self.generation = 0
+
+    @property
+    def vectorstore(self) -> Optional[VectorStore]:
+        """Vector index of the current dataset generation."""
+        return data_service.snapshot.vectorstore
 
     def initialize_vectorstore(self):
-        """Initialize or load the vector store."""
+        """Initialize or load the vector store and attach it to the current generation."""
+        data_service.attach_vectorstore(self._open_vectorstore())
+        self._initialized = True
+        self.generation += 1
+
+    def with_vectorstore(self, snapshot: DatasetSnapshot) -> DatasetSnapshot:
+        """Give an unpublished snapshot a vector index, opening one only if it has none."""
+        if snapshot.vectorstore is not None:
+            return snapshot
+        return replace(snapshot, vectorstore=self._open_vectorstore(snapshot))
+
+    def _active_collection(self) -> str:
+        if self._collection_file.exists():
+            return self._collection_file.read_text().strip() or DEFAULT_COLLECTION
+        return DEFAULT_COLLECTION
+
+    def _new_vectorstore(self, collection_name: str) -> VectorStore:
+        """The collection, or with ``vector_partition_by`` the partitioned collections, named ``collection_name``."""
+        if settings.vector_partition_by:
+            return PartitionedVectorStore(collection_name, settings.vector_partition_by,
+                                          str(self.persist_directory), self.embeddings)
+        return Chroma(
+            collection_name=collection_name,
+            persist_directory=str(self.persist_directory),
+            embedding_function=self.embeddings
+        )
+
+    @staticmethod
+    def _collections(vectorstore: VectorStore) -> List[Any]:
+        if isinstance(vectorstore, PartitionedVectorStore):
+            return vectorstore.collections
+        return [vectorstore._collection]
+
+    def _count(self, vectorstore: VectorStore) -> int:
+        return sum(collection.count() for collection in self._collections(vectorstore))
+
+    def _open_vectorstore(self, snapshot: Optional[DatasetSnapshot] = None) -> Optional[VectorStore]:
+        """Load the persisted collection, building it from the data if it is empty."""
+        collection_name = self._active_collection()
         try:
             # Try to load existing vectorstore
-            self.vectorstore = Chroma(
-                persist_directory=str(self.persist_directory),
-                embedding_function=self.embeddings
-            )
+            vectorstore = self._new_vectorstore(collection_name)
 
             # Check if it's empty
-            if self.vectorstore._collection.count() == 0:
+            if self._count(vectorstore) == 0:
                 logger.info("Vector store is empty, building from data...")
-                self._build_vectorstore()
-            else:
-                logger.info("Loaded existing vector store")
+                return self._build_vectorstore(collection_name, snapshot)
+
+            logger.info("Loaded existing vector store")
+            return vectorstore
 
         except Exception as e:
             logger.warning(f"Could not load existing vector store: {e}")
             logger.info("Building new vector store...")
-            self._build_vectorstore()
+            return self._build_vectorstore(collection_name, snapshot)
+
+    def _build_vectorstore(self, collection_name: str,
+                           snapshot: Optional[DatasetSnapshot] = None) -> Optional[VectorStore]:
+        """Build a vector store collection from the PQRS data of ``snapshot`` (current by default).
+
+        Records are read from storage and embedded in batches, so the whole
+        PQRS history is never held in memory at once.
+        """
+        vectorstore, records, chunks = None, 0, 0
+        with data_service.reading(snapshot):
+            for pqrs_records in data_service.iter_pqrs_records(chunk_rows=BUILD_BATCH_RECORDS):
+                records += len(pqrs_records)
+                documents = self._documents_for(pqrs_records)
+                if not documents:
+                    continue
+                split_docs = self._split(documents)
+                if vectorstore is None:
+                    vectorstore = self._new_vectorstore(collection_name)
+                vectorstore.add_documents(split_docs)
+                chunks += len(split_docs)
+
+        if vectorstore is None:
+            logger.warning("No documents to add to vector store")
+            return None
 
-        self._initialized = True
+        logger.info(f"Created vector store with {chunks} document chunks from {records} PQRS records")
+        return vectorstore
 
-    def _build_vectorstore(self):
-        """Build vector store from PQRS data."""
+    @staticmethod
+    def _documents_for(pqrs_records: List[PQRSRecord]) -> List[Document]:
+        """One searchable document per PQRS with text in its relevant fields."""
         documents = []
-
-        # Get PQRS records
-        pqrs_records = data_service.get_pqrs_records()
-        logger.info(f"Building vector store from {len(pqrs_records)} PQRS records")
-
         for record in pqrs_records:
             # Create searchable text from relevant fields
             text_parts = []
@@ -91,41 +207,110 @@ class RAGService:
                         "comuna": record.comuna_hecho,
                         "barrio": record.barrio_hecho,
                         "fecha_radicacion": record.fecha_radicacion.isoformat() if record.fecha_radicacion else None,
+                        "ano": (int(record.ano) if record.ano is not None
+                                else record.fecha_radicacion.year if record.fecha_radicacion else None),
                     }
                 )
                 documents.append(doc)
 
-        if documents:
-            # Split documents if they're too long
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=1000,
-                chunk_overlap=200
-            )
-            split_docs = text_splitter.split_documents(documents)
-
-            # Create vector store
-            self.vectorstore = Chroma.from_documents(
-                documents=split_docs,
-                embedding=self.embeddings,
-                persist_directory=str(self.persist_directory)
-            )
-
-            logger.info(f"Created vector store with {len(split_docs)} document chunks")
-        else:
-            logger.warning("No documents to add to vector store")
+        return documents
+
+    @staticmethod
+    def _split(documents: List[Document]) -> List[Document]:
+        """Split documents if they're too long."""
+        text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=1000,
+            chunk_overlap=200
+        )
+        return text_splitter.split_documents(documents)
+
+    def upsert_records(self, vectorstore: Optional[VectorStore], pqrs_records: List[PQRSRecord],
+                       previous: Optional[Dict[str, PQRSRecord]] = None,
+                       removed: Optional[List[str]] = None) -> Dict[str, int]:
+        """Bring the chunks of the given PQRS up to date, embedding only changed texts.
+
+        ``previous`` maps radicados to their records before the change. PQRS
+        whose searchable text is unchanged only get their chunk metadata
+        (estado, tipo...) rewritten; the others, and those that moved to
+        another partition of a partitioned index, are dropped and re-embedded.
+        Chunks of the ``removed`` radicados are deleted. The index generation
+        is not bumped: cached search results turn over when the caller
+        publishes the data generation these records belong to.
+        """
+        if vectorstore is None or not (pqrs_records or removed):
+            return {"embedded_chunks": 0, "retagged_chunks": 0, "removed_pqrs": 0}
+
+        partition_of = (vectorstore.partition_of if isinstance(vectorstore, PartitionedVectorStore)
+                        else lambda metadata: None)
+        old = {doc.metadata["radicado"]: doc for doc in self._documents_for(list((previous or {}).values()))}
+        documents = self._documents_for(pqrs_records)
+        retag = {doc.metadata["radicado"]: doc.metadata for doc in documents
+                 if doc.metadata["radicado"] in old
+                 and old[doc.metadata["radicado"]].page_content == doc.page_content
+                 and partition_of(old[doc.metadata["radicado"]].metadata) == partition_of(doc.metadata)}
+        embed = [doc for doc in documents if doc.metadata["radicado"] not in retag]
+
+        collections = self._collections(vectorstore)
+        retagged = 0
+        if retag:
+            for collection in collections:
+                found = collection.get(where={"radicado": {"$in": list(retag)}}, include=["metadatas"])
+                if found["ids"]:
+                    collection.update(ids=found["ids"],
+                                      metadatas=[retag[metadata["radicado"]] for metadata in found["metadatas"]])
+                    retagged += len(found["ids"])
+
+        stale = [record.numero_radicado_entrada for record in pqrs_records
+                 if record.numero_radicado_entrada not in retag] + list(removed or [])
+        if stale:
+            for collection in collections:
+                collection.delete(where={"radicado": {"$in": stale}})
+
+        split_docs = self._split(embed) if embed else []
+        if split_docs:
+            vectorstore.add_documents(split_docs)
+
+        logger.info(f"Vector index upsert: {len(split_docs)} chunks embedded, {retagged} retagged, "
+                    f"{len(removed or [])} PQRS removed")
+        return {"embedded_chunks": len(split_docs), "retagged_chunks": retagged, "removed_pqrs": len(removed or [])}
+
+    def _result_key(self, query: str, limit: int, filters: Optional[Dict[str, Any]]) -> tuple:
+        """Cache key of a search; a newer data or index generation drops all cached results."""
+        state = (data_service.generation, self.generation)
+        if self._results_state is None or state > self._results_state:
+            self._results.clear()
+            self._results_state = state
+        return " ".join(query.split()), json.dumps(filters or {}, sort_keys=True, default=str), limit, state
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Size, hit ratio and approximate memory of the embedding and result caches."""
+        return {"query_embeddings": self.embeddings.cache.stats(), "search_results": self._results.stats()}
 
     def semantic_search(self, query: str, limit: int = 10, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
-        """Perform semantic search on PQRS data."""
+        """Perform semantic search on PQRS data.
+
+        Results of a repeated search are served from the result cache until
+        it expires or the data or index generation changes.
+        """
         if not self._initialized:
             self.initialize_vectorstore()
 
-        if not self.vectorstore:
+        key = self._result_key(query, limit, filters)
+        cached = self._results.get(key)
+        if cached is not MISSING:
+            return list(cached)
+
+        vectorstore = self.vectorstore
+        if not vectorstore:
             logger.error("Vector store not available")
             return []
 
         try:
-            # Perform similarity search
-            docs = self.vectorstore.similarity_search(query, k=limit)
+            # Perform similarity search; a partitioned index only searches the partitions the filters allow
+            if isinstance(vectorstore, PartitionedVectorStore):
+                docs = vectorstore.similarity_search(query, k=limit, filters=filters)
+            else:
+                docs = vectorstore.similarity_search(query, k=limit)
 
             results = []
             for doc in docs:
@@ -141,7 +326,8 @@ class RAGService:
                         }
                         results.append(result)
 
-            return results
+            self._results.put(key, results)
+            return list(results)
 
         except Exception as e:
             logger.error(f"Error in semantic search: {e}")
@@ -149,44 +335,195 @@ class RAGService:
 
     def search_by_filters(self, filters: Dict[str, Any], limit: int = 10) -> List[PQRSRecord]:
         """Search PQRS records by structured filters."""
-        return data_service.get_pqrs_records(filters)[:limit]
+        return data_service.get_pqrs_records(filters, limit=limit)
+
+    @staticmethod
+    def _where_for(filters: Optional[Dict[str, Any]]) -> Tuple[Optional[Dict[str, Any]], List[str]]:
+        """Chroma ``where`` for the filters found in chunk metadata, and the filters left to post-filter."""
+        clauses, residual = [], []
+        for column, value in (filters or {}).items():
+            if column not in METADATA_FILTERS:
+                residual.append(column)
+                continue
+            values = value if isinstance(value, list) else [value]
+            if column == "ano":
+                try:
+                    values = [int(v) for v in values]
+                except (TypeError, ValueError):
+                    residual.append(column)
+                    continue
+            elif column == "numero_radicado_entrada":
+                values = [_as_str(v) for v in values]
+            clauses.append({METADATA_FILTERS[column]: {"$in": values}})
+
+        if not clauses:
+            return None, residual
+        return (clauses[0] if len(clauses) == 1 else {"$and": clauses}), residual
+
+    def _searched_collections(self, vectorstore: VectorStore, filters: Optional[Dict[str, Any]]) -> List[Any]:
+        if isinstance(vectorstore, PartitionedVectorStore):
+            return vectorstore.collections_for(filters)
+        return [vectorstore._collection]
+
+    def plan_hybrid_search(self, filters: Optional[Dict[str, Any]], vectorstore: Optional[VectorStore] = None,
+                           limit: int = 10) -> Dict[str, Any]:
+        """Choose how to run a filtered search from the estimated selectivity of its filters.
+
+        ``exact_candidates`` scores every PQRS matching the filters against
+        the query; ``ann_where`` runs the approximate search with the
+        metadata filters pushed down into the index, post-filtering the rest.
+        ANN is charged for the hits the post-filter discards, and is not used
+        when even ``ANN_MAX_HITS`` hits are not expected to yield ``limit`` matches.
+        """
+        vectorstore = vectorstore or self.vectorstore
+        where, residual = self._where_for(filters)
+        if not filters:
+            return {"plan": "ann", "estimated_candidates": None, "estimated_cost_ms": None,
+                    "pushed_down": [], "post_filtered": []}
+
+        estimated = data_service.estimate_pqrs_count(filters)
+        pushed_down = [c for c in filters if c not in residual]
+        # Share of the PQRS passing the pushed-down filters that also pass the residual ones
+        selectivity = 1.0
+        if residual:
+            base = data_service.estimate_pqrs_count({c: filters[c] for c in pushed_down})
+            selectivity = min(estimated / base, 1.0) if base else 0.0
+        wanted = limit * (ANN_OVERFETCH if residual else 1)
+        ann_hits = min(ANN_MAX_HITS, math.ceil(wanted / selectivity)) if selectivity else ANN_MAX_HITS
+        ann_fills = ann_hits * selectivity >= min(limit, estimated)
+
+        chunks = sum(c.count() for c in self._searched_collections(vectorstore, filters)) if vectorstore else 0
+        cost_exact = EXACT_FIXED_MS + EXACT_PER_CANDIDATE_MS * estimated
+        cost_ann = ANN_FIXED_MS + (ANN_WHERE_PER_CHUNK_MS * chunks if where else 0.0) + ANN_PER_HIT_MS * ann_hits
+        exact = estimated <= EXACT_MAX_CANDIDATES and (cost_exact <= cost_ann or not ann_fills)
+        return {
+            "plan": "exact_candidates" if exact else "ann_where",
+            "estimated_candidates": estimated,
+            "indexed_chunks": chunks,
+            "ann_hits": ann_hits,
+            "estimated_cost_ms": round(cost_exact if exact else cost_ann, 2),
+            "alternative_cost_ms": round(cost_ann if exact else cost_exact, 2),
+            "pushed_down": [] if exact else pushed_down,
+            "post_filtered": [] if exact else residual,
+        }
+
+    def _exact_search(self, vectorstore: VectorStore, query: str, filters: Dict[str, Any],
+                      limit: int, candidates: set) -> List[Dict[str, Any]]:
+        """Rank the candidate PQRS by the distance of their nearest chunk to the query."""
+        candidates = sorted(candidates)
+        if not candidates:
+            return []
 
-    def hybrid_search(self, query: str, filters: Optional[Dict[str, Any]] = None, limit: int = 10) -> List[Dict[str, Any]]:
-        """Perform hybrid search combining semantic and structured filters."""
-        # First, get semantic search results
-        semantic_results = self.semantic_search(query, limit * 2, filters)
+        query_vector = np.asarray(self.embeddings.embed_query(query), dtype=np.float32)
+        best: Dict[str, Tuple[float, str]] = {}
+        for collection in self._searched_collections(vectorstore, filters):
+            for start in range(0, len(candidates), EXACT_FETCH_BATCH):
+                found = collection.get(where={"radicado": {"$in": candidates[start:start + EXACT_FETCH_BATCH]}},
+                                       include=["embeddings", "documents", "metadatas"])
+                if not found["ids"]:
+                    continue
+                distances = ((np.asarray(found["embeddings"], dtype=np.float32) - query_vector) ** 2).sum(axis=1)
+                for distance, document, metadata in zip(distances, found["documents"], found["metadatas"]):
+                    radicado = metadata["radicado"]
+                    if radicado not in best or distance < best[radicado][0]:
+                        best[radicado] = (float(distance), document)
+
+        top = sorted(best.items(), key=lambda item: item[1][0])[:limit]
+        records = {record.numero_radicado_entrada: record for record in
+                   data_service.get_pqrs_records({"numero_radicado_entrada": [r for r, _ in top]}, limit=len(top))}
+        return [{"record": records[radicado],
+                 "relevance_score": round(1 / (1 + distance), 4),
+                 "matched_content": document[:200] + "..."}
+                for radicado, (distance, document) in top if radicado in records]
+
+    def _ann_where_search(self, vectorstore: VectorStore, query: str, filters: Dict[str, Any],
+                          limit: int, hits: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Approximate search with the metadata filters pushed down and the rest applied afterwards.
+
+        ``hits`` is how many nearest chunks to fetch before post-filtering.
+        """
+        where, residual = self._where_for(filters)
+        k = hits or (limit * ANN_OVERFETCH if residual else limit)
+        if isinstance(vectorstore, PartitionedVectorStore):
+            scored = vectorstore.similarity_search_with_score(query, k=k, filters=filters, where=where)
+        else:
+            scored = vectorstore.similarity_search_with_score(query, k=k, filter=where)
+
+        matching = data_service.matching_radicados(filters) if residual else None
+        results, seen = [], set()
+        for doc, distance in scored:
+            radicado = doc.metadata.get("radicado")
+            if not radicado or radicado in seen or (matching is not None and radicado not in matching):
+                continue
+            seen.add(radicado)
+            pqrs_record = data_service.get_pqrs_by_radicado(radicado)
+            if pqrs_record:
+                results.append({"record": pqrs_record,
+                                "relevance_score": round(1 / (1 + distance), 4),
+                                "matched_content": doc.page_content[:200] + "..."})
+        return results[:limit]
+
+    def hybrid_search_with_plan(self, query: str, filters: Optional[Dict[str, Any]] = None,
+                                limit: int = 10) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """Hybrid search results together with the plan chosen to produce them."""
+        if not filters:
+            return self.semantic_search(query, limit), self.plan_hybrid_search(None)
+        if not self._initialized:
+            self.initialize_vectorstore()
 
-        # Apply additional filters if provided
-        if filters:
-            filtered_results = []
-            for result in semantic_results:
-                record = result["record"]
-                match = True
+        vectorstore = self.vectorstore
+        if not vectorstore:
+            logger.error("Vector store not available")
+            return [], self.plan_hybrid_search(filters, None)
 
-                for key, value in filters.items():
-                    record_value = getattr(record, key, None)
-                    if record_value != value:
-                        match = False
-                        break
+        plan = self.plan_hybrid_search(filters, vectorstore, limit)
+        key = self._result_key(query, limit, {"plan": plan["plan"], "filters": filters})
+        cached = self._results.get(key)
+        if cached is not MISSING:
+            return list(cached), plan
+
+        started = time.perf_counter()
+        try:
+            candidates = data_service.matching_radicados(filters) if plan["plan"] == "exact_candidates" else None
+            if candidates is not None and len(candidates) > EXACT_MAX_CANDIDATES:
+                # The estimate assumes independent filters; the real candidate set is too large to score
+                _, residual = self._where_for(filters)
+                plan.update(plan="ann_where", actual_candidates=len(candidates),
+                            pushed_down=[c for c in filters if c not in residual], post_filtered=residual)
+                candidates = None
+            if candidates is not None:
+                results = self._exact_search(vectorstore, query, filters, limit, candidates)
+            else:
+                results = self._ann_where_search(vectorstore, query, filters, limit, plan["ann_hits"])
+        except Exception as e:
+            logger.error(f"Error in hybrid search ({plan['plan']}): {e}")
+            return [], plan
 
-                if match:
-                    filtered_results.append(result)
+        plan["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        self._results.put(key, results)
+        return list(results), plan
 
-            semantic_results = filtered_results
+    def hybrid_search(self, query: str, filters: Optional[Dict[str, Any]] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """Perform hybrid search combining semantic and structured filters.
 
-        return semantic_results[:limit]
+        Filters are applied through the plan ``plan_hybrid_search`` picks:
+        exact scoring of the matching PQRS when they are few, otherwise
+        approximate search with the filters pushed into the index.
+        """
+        return self.hybrid_search_with_plan(query, filters, limit)[0]
 
     def get_search_suggestions(self, partial_query: str, limit: int = 5) -> List[str]:
         """Get search suggestions based on partial query."""
         if not self._initialized:
             self.initialize_vectorstore()
 
-        if not self.vectorstore:
+        vectorstore = self.vectorstore
+        if not vectorstore:
             return []
 
         try:
             # Get similar documents for suggestions
-            docs = self.vectorstore.similarity_search(partial_query, k=limit * 2)
+            docs = vectorstore.similarity_search(partial_query, k=limit * 2)
 
             suggestions = []
             seen = set()
@@ -214,16 +551,62 @@ class RAGService:
             logger.error(f"Error getting search suggestions: {e}")
             return []
 
+    def rebuild_partition(self, value: Any) -> Dict[str, Any]:
+        """Re-embed one partition of a partitioned index (a year or a comuna) from current data.
+
+        Only the PQRS whose partition column equals ``value`` are read and
+        embedded; searches keep using the other partitions meanwhile.
+        """
+        vectorstore = self.vectorstore
+        if not isinstance(vectorstore, PartitionedVectorStore):
+            raise ValueError("The vector index is not partitioned; set VECTOR_PARTITION_BY")
+
+        def batches():
+            for pqrs_records in data_service.iter_pqrs_records({vectorstore.column: value},
+                                                               chunk_rows=BUILD_BATCH_RECORDS):
+                documents = self._documents_for(pqrs_records)
+                if documents:
+                    yield self._split(documents)
+
+        partition = vectorstore.partition_of({vectorstore.key: value})
+        chunks = vectorstore.rebuild_partition(partition, batches())
+        self.generation += 1
+        return {"partition": partition, "document_chunks": chunks}
+
+    def check_health(self) -> Dict[str, Any]:
+        """Confirm the vector store answers and report how many chunks it holds."""
+        vectorstore = self.vectorstore
+        if not vectorstore:
+            return {"status": "failed", "error": "Vector store not initialized"}
+
+        try:
+            health = {"status": "ok", "document_chunks": self._count(vectorstore)}
+            if isinstance(vectorstore, PartitionedVectorStore):
+                health["partitions"] = vectorstore.partitions
+            return health
+        except Exception as e:
+            return {"status": "failed", "error": str(e)}
+
     def rebuild_index(self):
-        """Rebuild the vector index from current data."""
+        """Rebuild the vector index from current data.
+
+        The new index is built in a fresh collection while searches keep using
+        the old one; the old collection is dropped once no request reads it.
+        Data updates wait for the rebuild, so none is missing from the new index.
+        """
         logger.info("Rebuilding vector index...")
         try:
-            # Clear existing index
-            if self.vectorstore:
-                self.vectorstore.delete_collection()
-
-            # Rebuild
-            self._build_vectorstore()
+            with data_service.updating() as base:
+                collection_name = f"pqrs_{int(time.time() * 1000)}"
+                vectorstore = self._build_vectorstore(collection_name, base)
+
+                previous = base.vectorstore
+                data_service.attach_vectorstore(
+                    vectorstore,
+                    on_retired=previous.delete_collection if previous is not None else None
+                )
+                self._collection_file.write_text(collection_name)
+                self.generation += 1
             logger.info("Vector index rebuilt successfully")
 
         except Exception as e:
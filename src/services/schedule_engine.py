@@ -0,0 +1,332 @@
+"""Schedule engine that plans active PQRS onto personnel shifts over a multi-day horizon."""
+
+import heapq
+import logging
+import time as timer
+from dataclasses import dataclass, field
+from datetime import datetime, time, timedelta
+from typing import Dict, List, Optional, Any, Tuple
+
+import numpy as np
+
+from .assignment_ledger import ResourceSchedule
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_RANK = {"high": 0, "medium": 1, "low": 2}
+PRIORITY_WEIGHT = {"high": 3.0, "medium": 2.0, "low": 1.0}
+
+DEFAULT_SHIFT_START = time(8, 0)
+DEFAULT_SHIFT_END = time(17, 0)
+
+
+def parse_shift_time(value: Optional[str], default: time) -> time:
+    """Parse a shift boundary such as '08:00', '8:00:00' or '08:00 AM'."""
+    if not value:
+        return default
+
+    for fmt in ("%H:%M", "%H:%M:%S", "%I:%M %p", "%I:%M%p"):
+        try:
+            return datetime.strptime(str(value).strip(), fmt).time()
+        except ValueError:
+            continue
+
+    logger.warning(f"Unrecognized shift time '{value}', using {default}")
+    return default
+
+
+@dataclass
+class ScheduleTask:
+    """A PQRS waiting to be planned."""
+
+    pqrs_id: str
+    priority: str = "medium"
+    due: Optional[datetime] = None
+    hours: float = 2.0
+
+
+@dataclass
+class CrewShift:
+    """A personnel member's daily working window."""
+
+    employee_id: str
+    shift_start: time = DEFAULT_SHIFT_START
+    shift_end: time = DEFAULT_SHIFT_END
+
+
+@dataclass
+class Visit:
+    """A planned visit of a crew to a PQRS."""
+
+    task: ScheduleTask
+    employee_id: str
+    start: datetime
+    end: datetime
+
+    @property
+    def lateness_hours(self) -> float:
+        if self.task.due is None:
+            return 0.0
+        return max(0.0, (self.end - self.task.due).total_seconds() / 3600)
+
+    def to_dict(self, day0: datetime) -> Dict[str, Any]:
+        return {
+            "pqrs_id": self.task.pqrs_id,
+            "employee_id": self.employee_id,
+            "day": (self.start.date() - day0.date()).days,
+            "start": self.start.isoformat(),
+            "end": self.end.isoformat(),
+            "hours": self.task.hours,
+            "priority": self.task.priority,
+            "fecha_vencimiento": self.task.due.isoformat() if self.task.due else None,
+            "late": self.lateness_hours > 0
+        }
+
+
+@dataclass
+class SchedulePlan:
+    """A feasible multi-day plan for one zone, updatable one PQRS at a time."""
+
+    zone: str
+    start: datetime
+    days: int
+    crews: List[CrewShift]
+    calendars: Dict[str, ResourceSchedule]
+    booked_hours: Dict[str, float]
+    visits: Dict[str, Visit] = field(default_factory=dict)
+    unscheduled: List[str] = field(default_factory=list)
+    planning_seconds: float = 0.0
+
+    def __post_init__(self):
+        self._loads: Dict[str, float] = {}
+        # First horizon day that may still fit a task of a given length, per crew
+        self._day_cursor: Dict[Tuple[str, float], int] = {}
+
+    def window(self, crew: CrewShift, day: int) -> Tuple[float, float]:
+        """Epoch-second bounds of a crew's shift on a horizon day."""
+        date = (self.start + timedelta(days=day)).date()
+        open_at = datetime.combine(date, crew.shift_start)
+        close_at = datetime.combine(date, crew.shift_end)
+        if close_at <= open_at:
+            close_at += timedelta(days=1)
+        return max(open_at, self.start).timestamp(), close_at.timestamp()
+
+    def earliest_slot(self, crew: CrewShift, hours: float) -> Optional[float]:
+        """Earliest start inside the horizon where the crew has ``hours`` free within one shift."""
+        duration = hours * 3600
+        calendar = self.calendars[crew.employee_id]
+        cursor_key = (crew.employee_id, hours)
+
+        for day in range(self._day_cursor.get(cursor_key, 0), self.days):
+            open_ts, close_ts = self.window(crew, day)
+            start = calendar.next_free(open_ts, duration)
+            if start + duration <= close_ts:
+                self._day_cursor[cursor_key] = day
+                return start
+        self._day_cursor[cursor_key] = self.days
+        return None
+
+    def place(self, task: ScheduleTask) -> Optional[Visit]:
+        """Greedily place a task at the earliest slot, preferring the least-loaded crew on ties."""
+        best = None
+        for crew in self.crews:
+            start = self.earliest_slot(crew, task.hours)
+            if start is None:
+                continue
+            key = (start, self.booked_hours[crew.employee_id] + self._loads.get(crew.employee_id, 0.0))
+            if best is None or key < best[0]:
+                best = (key, crew, start)
+
+        if best is None:
+            self.unscheduled.append(task.pqrs_id)
+            return None
+
+        _, crew, start = best
+        visit = Visit(task, crew.employee_id, datetime.fromtimestamp(start),
+                      datetime.fromtimestamp(start + task.hours * 3600))
+        self._commit(visit)
+        return visit
+
+    def _commit(self, visit: Visit):
+        self.calendars[visit.employee_id].add(visit.start.timestamp(), visit.end.timestamp(), visit.task.pqrs_id)
+        self._loads[visit.employee_id] = self._loads.get(visit.employee_id, 0.0) + visit.task.hours
+        self.visits[visit.task.pqrs_id] = visit
+
+    def _uncommit(self, visit: Visit):
+        self.calendars[visit.employee_id].remove_pqrs(visit.task.pqrs_id)
+        self._loads[visit.employee_id] -= visit.task.hours
+        del self.visits[visit.task.pqrs_id]
+        # Freed time may reopen earlier days for this crew
+        for key in [k for k in self._day_cursor if k[0] == visit.employee_id]:
+            del self._day_cursor[key]
+
+    def total_lateness(self) -> float:
+        return sum(v.lateness_hours * PRIORITY_WEIGHT.get(v.task.priority, 1.0) for v in self.visits.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        workload = {
+            crew.employee_id: round(self.booked_hours[crew.employee_id] + self._loads.get(crew.employee_id, 0.0), 2)
+            for crew in self.crews
+        }
+        visits = sorted(self.visits.values(), key=lambda v: (v.start, v.employee_id))
+
+        return {
+            "zone": self.zone,
+            "assignments": [v.to_dict(self.start) for v in visits],
+            "unscheduled": list(self.unscheduled),
+            "workload_distribution": workload,
+            "late_visits": sum(1 for v in visits if v.lateness_hours > 0),
+            "weighted_lateness_hours": round(self.total_lateness(), 2),
+            "planning_seconds": round(self.planning_seconds, 4)
+        }
+
+
+class ScheduleEngine:
+    """Greedy + local-search scheduler for PQRS visits."""
+
+    def __init__(self, max_improvement_rounds: int = 3, max_rebalance_moves: int = 200):
+        self.max_improvement_rounds = max_improvement_rounds
+        self.max_rebalance_moves = max_rebalance_moves
+
+    def build_plan(self, zone: str, tasks: List[ScheduleTask], crews: List[CrewShift],
+                   start: datetime, days: int,
+                   bookings: Optional[List[Dict[str, Any]]] = None) -> SchedulePlan:
+        """Plan tasks for one zone. ``bookings`` are existing ledger bookings that block crew time."""
+        started = timer.perf_counter()
+
+        calendars = {crew.employee_id: ResourceSchedule() for crew in crews}
+        booked_hours = {crew.employee_id: 0.0 for crew in crews}
+        for booking in bookings or []:
+            employee_id = booking["resource_id"]
+            if employee_id in calendars:
+                calendars[employee_id].add(
+                    datetime.fromisoformat(booking["start"]).timestamp(),
+                    datetime.fromisoformat(booking["end"]).timestamp(),
+                    booking["pqrs_id"]
+                )
+                booked_hours[employee_id] += booking["hours"]
+
+        plan = SchedulePlan(zone, start, days, crews, calendars, booked_hours)
+
+        # Greedy pass: most urgent first, then earliest due date
+        ordered = sorted(tasks, key=lambda t: (PRIORITY_RANK.get(t.priority, 1), t.due or datetime.max))
+        for task in ordered:
+            plan.place(task)
+
+        self._improve(plan)
+
+        plan.planning_seconds = timer.perf_counter() - started
+        logger.info(
+            f"Planned {len(plan.visits)} visits for zone {zone} "
+            f"({len(plan.unscheduled)} unscheduled) in {plan.planning_seconds:.3f}s"
+        )
+        return plan
+
+    def add_task(self, plan: SchedulePlan, task: ScheduleTask) -> Optional[Visit]:
+        """Insert a single new PQRS into an existing plan without replanning."""
+        if task.pqrs_id in plan.visits:
+            return plan.visits[task.pqrs_id]
+        if task.pqrs_id in plan.unscheduled:
+            plan.unscheduled.remove(task.pqrs_id)
+
+        visit = plan.place(task)
+        if visit is not None and visit.lateness_hours > 0:
+            self._swap_pass(plan, [visit.task.pqrs_id])
+        return plan.visits.get(task.pqrs_id)
+
+    def _improve(self, plan: SchedulePlan):
+        """Local search: lateness-reducing swaps, then workload rebalancing."""
+        for _ in range(self.max_improvement_rounds):
+            late = [pid for pid, v in plan.visits.items() if v.lateness_hours > 0]
+            swapped = self._swap_pass(plan, late) if late else 0
+            moved = self._rebalance_pass(plan)
+            if not swapped and not moved:
+                break
+
+    def _swap_pass(self, plan: SchedulePlan, late_ids: List[str]) -> int:
+        """Swap late visits with equally long visits whose slot serves them better.
+
+        Candidate swaps for a late visit are scored in one vectorized step over
+        all visits of the same duration.
+        """
+        visits = list(plan.visits.values())
+        if len(visits) < 2:
+            return 0
+
+        index = {v.task.pqrs_id: i for i, v in enumerate(visits)}
+        ends = np.array([v.end.timestamp() for v in visits])
+        dues = np.array([v.task.due.timestamp() if v.task.due else np.inf for v in visits])
+        weights = np.array([PRIORITY_WEIGHT.get(v.task.priority, 1.0) for v in visits])
+        durations = np.array([v.task.hours for v in visits])
+
+        swaps = 0
+        for pqrs_id in late_ids:
+            i = index.get(pqrs_id)
+            if i is None:
+                continue
+
+            current = (np.maximum(0, ends[i] - dues[i]) * weights[i] +
+                       np.maximum(0, ends - dues) * weights)
+            swapped = (np.maximum(0, ends - dues[i]) * weights[i] +
+                       np.maximum(0, ends[i] - dues) * weights)
+            delta = np.where(durations == durations[i], swapped - current, np.inf)
+            delta[i] = np.inf
+
+            j = int(np.argmin(delta))
+            if delta[j] >= -1e-9:
+                continue
+
+            a, b = visits[i], visits[j]
+            plan._uncommit(a)
+            plan._uncommit(b)
+            visits[i] = Visit(a.task, b.employee_id, b.start, b.end)
+            visits[j] = Visit(b.task, a.employee_id, a.start, a.end)
+            plan._commit(visits[i])
+            plan._commit(visits[j])
+            ends[i], ends[j] = ends[j], ends[i]
+            swaps += 1
+
+        return swaps
+
+    def _rebalance_pass(self, plan: SchedulePlan) -> int:
+        """Move visits from the busiest crew to a less loaded one when it does not finish later."""
+        if len(plan.crews) < 2:
+            return 0
+
+        def load(employee_id):
+            return plan.booked_hours[employee_id] + plan._loads.get(employee_id, 0.0)
+
+        moves = 0
+        crews_by_id = {crew.employee_id: crew for crew in plan.crews}
+        for _ in range(min(len(plan.visits), self.max_rebalance_moves)):
+            loads = [(load(c.employee_id), c.employee_id) for c in plan.crews]
+            busiest_load, busiest = max(loads)
+            lightest_load, lightest = min(loads)
+
+            candidates = [v for v in plan.visits.values() if v.employee_id == busiest]
+            if not candidates:
+                break
+
+            # Try the busiest crew's latest visits first
+            moved = False
+            for visit in heapq.nlargest(3, candidates, key=lambda v: v.start):
+                if busiest_load - lightest_load <= visit.task.hours:
+                    break
+                start = plan.earliest_slot(crews_by_id[lightest], visit.task.hours)
+                if start is None or start > visit.start.timestamp():
+                    continue
+                plan._uncommit(visit)
+                plan._commit(Visit(visit.task, lightest, datetime.fromtimestamp(start),
+                                   datetime.fromtimestamp(start + visit.task.hours * 3600)))
+                moves += 1
+                moved = True
+                break
+
+            if not moved:
+                break
+
+        return moves
+
+
+# Global instance
+schedule_engine = ScheduleEngine()
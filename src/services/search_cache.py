@@ -0,0 +1,113 @@
+"""Bounded caches for query embeddings and search results, with hit and memory counters."""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional
+
+from langchain_core.embeddings import Embeddings
+from pydantic import BaseModel
+
+# Returned by ``get`` on a miss, so cached ``None`` values can be told apart
+MISSING = object()
+
+
+def approx_bytes(value: Any) -> int:
+    """Rough resident size of a value and what it references (records, lists, dicts, strings)."""
+    size = sys.getsizeof(value)
+    if isinstance(value, BaseModel):
+        return size + approx_bytes(value.__dict__)
+    if isinstance(value, dict):
+        return size + sum(approx_bytes(k) + approx_bytes(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return size + sum(approx_bytes(item) for item in value)
+    return size
+
+
+class LRUCache:
+    """Thread-safe mapping holding the ``maxsize`` most recently used entries.
+
+    With ``ttl_seconds``, entries also expire that long after being stored.
+    A ``maxsize`` of 0 disables the cache.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is not None and entry[0] < time.monotonic():
+                self._pop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any):
+        if self.maxsize <= 0:
+            return
+        expires = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        size = approx_bytes(value)
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+            self._entries[key] = (expires, value, size)
+            self._bytes += size
+            while len(self._entries) > self.maxsize:
+                self._pop(next(iter(self._entries)))
+
+    def _pop(self, key: Hashable):
+        self._bytes -= self._entries.pop(key)[2]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+            "approx_bytes": self._bytes
+        }
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings whose query vectors are kept in an LRU cache keyed by the query text.
+
+    Document embeddings are passed through; only ``embed_query`` repeats
+    often enough to be worth caching.
+    """
+
+    def __init__(self, embeddings: Embeddings, maxsize: int):
+        self.embeddings = embeddings
+        self.cache = LRUCache(maxsize)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        vector = self.cache.get(text)
+        if vector is MISSING:
+            vector = self.embeddings.embed_query(text)
+            self.cache.put(text, vector)
+        return vector
@@ -0,0 +1,239 @@
+"""Memory-mapped Arrow IPC copy of the cleaned tables, shared by all uvicorn workers."""
+
+import json
+import logging
+import os
+import pickle
+import shutil
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..config import settings
+from .dataset import _as_str
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+except ImportError:  # optional: only needed when SHARED_DATASET_DIR is set
+    pa = None
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows; the loader lock is skipped
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+Frames = Dict[str, Optional[pd.DataFrame]]
+
+
+class SharedDatasetStore:
+    """One process parses the workbooks; every worker maps the result.
+
+    Cleaned tables are written as Arrow IPC files under
+    ``<dir>/<version>/<dataset>.arrow`` and ``manifest.json`` names the
+    current version with the size and mtime of the workbooks it came from.
+    An exclusive file lock lets the first worker to start do the Excel parse
+    while the others wait; once the manifest matches the workbooks, a worker
+    only memory-maps the files. Columns are built over the mapped buffers, so
+    their pages are shared through the OS page cache instead of copied per
+    worker; only columns whose Arrow layout pandas cannot view (booleans,
+    columns with nulls other than text) are converted. Values derived from a
+    version (e.g. indexes) are computed once and pickled next to it.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = Path(directory) if directory else None
+        self._version: Optional[str] = None
+        self._mapped_bytes = 0
+        self._converted_columns: List[str] = []
+        self.details: Dict[str, Any] = {}
+
+    @property
+    def enabled(self) -> bool:
+        if self.directory is None:
+            return False
+        if pa is None:
+            logger.warning("SHARED_DATASET_DIR is set but pyarrow is not installed; loading workbooks per worker")
+            return False
+        return True
+
+    @staticmethod
+    def source_fingerprint(paths: Dict[str, Path]) -> Dict[str, Any]:
+        """``{dataset: [size, mtime_ns]}`` of the source workbooks (None when missing)."""
+        fingerprint = {}
+        for dataset, path in paths.items():
+            try:
+                stat = path.stat()
+                fingerprint[dataset] = [stat.st_size, stat.st_mtime_ns]
+            except FileNotFoundError:
+                fingerprint[dataset] = None
+        return fingerprint
+
+    @contextmanager
+    def _loader_lock(self) -> Iterator[None]:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / ".lock", "w") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _read_manifest(self) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads((self.directory / "manifest.json").read_text())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def load_or_build(self, build: Callable[[], Frames], fingerprint: Dict[str, Any],
+                      details: Optional[Callable[[], Dict[str, Any]]] = None) -> Frames:
+        """Map the current version, calling ``build`` and writing a new one if the workbooks changed.
+
+        Datasets of ``fingerprint`` that had no frame map to None. ``details``
+        is called after a build; its JSON-serializable result is kept in the
+        manifest and exposed to every worker as ``self.details``.
+        """
+        with self._loader_lock():
+            manifest = self._read_manifest()
+            if manifest is None or manifest.get("sources") != fingerprint:
+                started = time.perf_counter()
+                version = self._write(build())
+                manifest = {"version": version, "sources": fingerprint, "details": details() if details else {}}
+                (self.directory / "manifest.tmp").write_text(json.dumps(manifest, default=str))
+                os.replace(self.directory / "manifest.tmp", self.directory / "manifest.json")
+                self._remove_old_versions(version)
+                logger.info(f"Wrote shared dataset version {version} in {time.perf_counter() - started:.2f}s")
+            else:
+                version = manifest["version"]
+
+        started = time.perf_counter()
+        frames = self._map(version)
+        self.details = manifest.get("details", {})
+        logger.info(f"Mapped shared dataset version {version} in {(time.perf_counter() - started) * 1000:.1f}ms"
+                    + (f"; converted columns {self._converted_columns}" if self._converted_columns else ""))
+        return {dataset: frames.get(dataset) for dataset in fingerprint}
+
+    def shared(self, name: str, compute: Callable[[], Any]) -> Any:
+        """``compute()`` for the mapped version, computed by the first worker to ask and unpickled by the others."""
+        if self._version is None:
+            return compute()
+
+        path = self.directory / self._version / f"{name}.pickle"
+        with self._loader_lock():
+            if path.exists():
+                try:
+                    return pickle.loads(path.read_bytes())
+                except Exception as e:
+                    logger.warning(f"Could not read shared {name} of version {self._version}: {e}")
+            value = compute()
+            if path.parent.is_dir():
+                path.with_suffix(".tmp").write_bytes(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+                os.replace(path.with_suffix(".tmp"), path)
+        return value
+
+    def _write(self, frames: Frames) -> str:
+        version = str(time.time_ns())
+        target = self.directory / version
+        target.mkdir(parents=True)
+
+        for dataset, frame in frames.items():
+            if frame is None:
+                continue
+            table = pa.Table.from_pandas(self._arrow_ready(frame), preserve_index=False)
+            with pa.OSFile(str(target / f"{dataset}.arrow"), "wb") as sink:
+                with ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+
+        return version
+
+    @staticmethod
+    def _arrow_ready(frame: pd.DataFrame) -> pd.DataFrame:
+        """Object columns Arrow cannot type (e.g. numbers mixed with text) are stored as text."""
+        columns = {}
+        for column in frame.columns[frame.dtypes == object]:
+            try:
+                pa.array(frame[column], from_pandas=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                columns[column] = frame[column].map(lambda v: None if pd.isna(v) else _as_str(v))
+        return frame.assign(**columns) if columns else frame
+
+    def _map(self, version: str) -> Frames:
+        directory = self.directory / version
+        frames: Frames = {}
+        mapped, converted_columns = 0, []
+
+        for path in sorted(directory.glob("*.arrow")):
+            table = ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+            mapped += table.nbytes
+            dtypes = {column["name"]: column["numpy_type"] for column in table.schema.pandas_metadata["columns"]}
+
+            columns = {}
+            for name, column in zip(table.column_names, table.columns):
+                array = column.chunk(0) if column.num_chunks == 1 else column.combine_chunks()
+                columns[name] = self._mapped_column(array, dtypes.get(name))
+            converted = [name for name, values in columns.items() if values is None]
+            if converted:
+                # Converted with the pandas metadata, so e.g. nullable integers keep their dtype
+                columns.update(table.select(converted).to_pandas())
+                converted_columns += [f"{path.stem}.{name}" for name in converted]
+            frames[path.stem] = pd.DataFrame(columns, copy=False)
+
+        self._version, self._mapped_bytes, self._converted_columns = version, mapped, converted_columns
+        return frames
+
+    @staticmethod
+    def _mapped_column(array: "pa.Array", dtype: Optional[str]) -> Any:
+        """A pandas array over the mapped buffers of ``array``, or None if it has to be converted.
+
+        Text becomes Arrow-backed and categories keep the dictionary indices
+        as codes. Numbers and timestamps without nulls become read-only NumPy
+        views; nullable integers and floats view their values with an empty mask.
+        """
+        if pa.types.is_string(array.type) or pa.types.is_large_string(array.type):
+            return pd.arrays.ArrowExtensionArray(array)
+        if array.null_count:
+            return None
+        if pa.types.is_dictionary(array.type):
+            categories = pd.Index(array.dictionary.to_pandas())
+            return pd.Categorical.from_codes(array.indices.to_numpy(zero_copy_only=True), categories=categories,
+                                             ordered=array.type.ordered, validate=False)
+        if not (pa.types.is_integer(array.type) or pa.types.is_floating(array.type)
+                or pa.types.is_timestamp(array.type)) or dtype is None:
+            return None
+
+        values = array.to_numpy(zero_copy_only=True)
+        if str(values.dtype) == dtype:
+            return values
+        target = pd.api.types.pandas_dtype(dtype)
+        masked_values = isinstance(target, pd.api.extensions.ExtensionDtype) and getattr(target, "numpy_dtype", None)
+        if masked_values == values.dtype:
+            return target.construct_array_type()(values, np.zeros(len(values), dtype=bool))
+        return None
+
+    def _remove_old_versions(self, keep: str):
+        # Workers still mapping an old version keep their pages after the unlink
+        for path in self.directory.iterdir():
+            if path.is_dir() and path.name != keep:
+                shutil.rmtree(path, ignore_errors=True)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.directory is not None and pa is not None,
+            "directory": str(self.directory) if self.directory else None,
+            "version": self._version,
+            "mapped_bytes": self._mapped_bytes,
+            "converted_columns": self._converted_columns,
+            "worker_pid": os.getpid()
+        }
+
+
+# Global instance
+shared_store = SharedDatasetStore(settings.shared_dataset_dir)
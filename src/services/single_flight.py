@@ -0,0 +1,63 @@
+"""Coalescing of identical concurrent requests into one computation."""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Runs at most one computation per key at a time; concurrent callers share its result.
+
+    The computation runs in the event loop's thread pool as its own task, so
+    the event loop stays free while it runs and a caller that disconnects
+    does not cancel it for the others. Keys should include whatever makes
+    answers differ (query, filters, data generation...). Nothing is kept
+    once the computation finishes; this is not a cache.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.executions = 0
+        self.shared = 0
+
+    async def run(self, key: Hashable, fn: Callable[..., Any], *args: Any) -> Any:
+        """Result of ``fn(*args)``, computed once for all concurrent callers with ``key``."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None and future.get_loop() is loop:
+                self.shared += 1
+            else:
+                self.executions += 1
+                call = functools.partial(contextvars.copy_context().run, fn, *args)
+                future = self._inflight[key] = loop.run_in_executor(None, call)
+                future.add_done_callback(functools.partial(self._finished, key))
+
+        return await asyncio.shield(future)
+
+    def _finished(self, key: Hashable, future: asyncio.Future):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+        # Every waiter may have gone away; read the error so it is not reported as unretrieved
+        if not future.cancelled() and future.exception() is not None:
+            logger.debug(f"Coalesced computation {key!r} failed: {future.exception()}")
+
+    def stats(self) -> Dict[str, Any]:
+        calls = self.executions + self.shared
+        return {
+            "in_flight": len(self._inflight),
+            "executions": self.executions,
+            "shared": self.shared,
+            "shared_ratio": round(self.shared / calls, 3) if calls else None
+        }
+
+
+# Global instance
+single_flight = SingleFlight()
@@ -0,0 +1,166 @@
+"""Spatial index over zone centroids for nearest-available-resource lookups."""
+
+import heapq
+import logging
+import math
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .geo import EARTH_RADIUS_KM, ZoneLocator, haversine_km, normalize_name
+
+logger = logging.getLogger(__name__)
+
+# Same sphere as haversine_km, so projected and reported distances agree
+KM_PER_DEGREE = math.radians(EARTH_RADIUS_KM)
+# Extra tree matches re-ranked by great-circle distance, absorbing the projection error
+RERANK_EXTRA = 4
+
+
+class KDTree:
+    """Two-dimensional KD-tree with k-nearest queries filtered by a predicate."""
+
+    def __init__(self, points: np.ndarray):
+        self.points = np.asarray(points, dtype=float)
+        # Flat node arrays: point index, split axis, left child, right child (-1 = none)
+        self._index: List[int] = []
+        self._axis: List[int] = []
+        self._left: List[int] = []
+        self._right: List[int] = []
+        self.root = self._build(list(range(len(self.points))), 0)
+
+    def _build(self, indices: List[int], depth: int) -> int:
+        if not indices:
+            return -1
+
+        axis = depth % 2
+        indices.sort(key=lambda i: self.points[i, axis])
+        middle = len(indices) // 2
+
+        node = len(self._index)
+        self._index.append(indices[middle])
+        self._axis.append(axis)
+        self._left.append(-1)
+        self._right.append(-1)
+
+        self._left[node] = self._build(indices[:middle], depth + 1)
+        self._right[node] = self._build(indices[middle + 1:], depth + 1)
+        return node
+
+    def query(self, point: Tuple[float, float], k: int = 1,
+              accept: Optional[Callable[[int], bool]] = None) -> List[Tuple[float, int]]:
+        """The ``k`` nearest accepted points as (distance, point index), closest first."""
+        best: List[Tuple[float, int]] = []  # max-heap via negated distances
+        target = np.asarray(point, dtype=float)
+
+        def search(node: int):
+            if node < 0:
+                return
+
+            i = self._index[node]
+            axis = self._axis[node]
+            distance = float(np.hypot(*(self.points[i] - target)))
+
+            if accept is None or accept(i):
+                if len(best) < k:
+                    heapq.heappush(best, (-distance, i))
+                elif distance < -best[0][0]:
+                    heapq.heapreplace(best, (-distance, i))
+
+            diff = target[axis] - self.points[i, axis]
+            near, far = (self._left[node], self._right[node]) if diff < 0 else (self._right[node], self._left[node])
+            search(near)
+            if len(best) < k or abs(diff) < -best[0][0]:
+                search(far)
+
+        search(self.root)
+        return sorted((-d, i) for d, i in best)
+
+
+class ZoneSpatialIndex:
+    """KD-tree over commune centroids, filtered by available resource counts."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tree: Optional[KDTree] = None
+        self._keys: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._labels: List[str] = []
+        self._coords: List[Tuple[float, float]] = []
+        self._capacity: Callable[[str], Dict[str, int]] = lambda zone: {}
+        self._origin_lat = 0.0
+
+    @property
+    def is_built(self) -> bool:
+        return self._tree is not None
+
+    def build(self, locator: ZoneLocator, capacity: Callable[[str], Dict[str, int]]):
+        """Index every commune centroid.
+
+        ``capacity`` returns the live available personnel and vehicle counts
+        for a zone, so status changes are seen without rebuilding the tree.
+        """
+        keys = sorted(locator.communes)
+        coords = [locator.communes[key] for key in keys]
+        origin_lat = float(np.mean([c[0] for c in coords])) if coords else 0.0
+        projected = np.array([self._project(c, origin_lat) for c in coords]).reshape(-1, 2)
+
+        with self._lock:
+            self._keys = keys
+            self._positions = {key: i for i, key in enumerate(keys)}
+            self._labels = [locator.commune_labels.get(key, key) for key in keys]
+            self._coords = coords
+            self._origin_lat = origin_lat
+            self._capacity = capacity
+            self._tree = KDTree(projected) if coords else None
+
+        logger.info(f"Built spatial index over {len(keys)} zones")
+
+    def invalidate(self):
+        """Forget the index so it is rebuilt from current data."""
+        with self._lock:
+            self._tree = None
+
+    def nearest_zones(self, zone: str, k: int = 3, resource: str = "personnel",
+                      exclude_self: bool = True) -> List[Dict[str, Any]]:
+        """The ``k`` zones nearest to ``zone`` that have available ``resource`` capacity.
+
+        The tree ranks projected distances; its top matches are re-ranked by
+        great-circle distance.
+        """
+        with self._lock:
+            if self._tree is None:
+                return []
+
+            key = normalize_name(zone)
+            if key not in self._positions:
+                return []
+            origin = self._coords[self._positions[key]]
+
+            def accept(i: int) -> bool:
+                if exclude_self and self._keys[i] == key:
+                    return False
+                return self._capacity(self._keys[i]).get(resource, 0) > 0
+
+            matches = self._tree.query(self._project(origin, self._origin_lat), k + RERANK_EXTRA, accept)
+            nearest = sorted((haversine_km(*origin, *self._coords[i]), i) for _, i in matches)[:k]
+
+            return [
+                {
+                    "zone": self._labels[i],
+                    "distance_km": round(distance, 3),
+                    "available": self._capacity(self._keys[i]).get(resource, 0)
+                }
+                for distance, i in nearest
+            ]
+
+    @staticmethod
+    def _project(point: Tuple[float, float], origin_lat: float) -> Tuple[float, float]:
+        """Equirectangular projection to km so Euclidean distance approximates ground distance."""
+        lat, lon = point
+        return lon * KM_PER_DEGREE * math.cos(math.radians(origin_lat)), lat * KM_PER_DEGREE
+
+
+# Global instance
+spatial_index = ZoneSpatialIndex()
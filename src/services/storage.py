@@ -0,0 +1,476 @@
+"""Storage backends answering PQRS filters, ordering, limits and aggregates."""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .aggregate_cube import CUBE_DIMENSIONS
+from .dataset import DatasetSnapshot, _as_str
+from .date_index import split_date_filters
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows; the writer lock is skipped
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+TABLES = ("pqrs", "personnel", "transport", "zoning")
+
+# Columns indexed in the SQL backend; tuples are composite indexes
+INDEXED_COLUMNS = {
+    "pqrs": ["numero_radicado_entrada", "estado", "comuna_hecho", "tipo_solicitud",
+             "fecha_radicacion", "fecha_vencimiento", ("estado", "comuna_hecho")],
+    "personnel": ["employee_id", "zone"],
+    "transport": ["license_plate", "zone"],
+    "zoning": ["commune"],
+}
+
+# Dates are stored as text in this format, so text comparison orders them
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+# Row position in the snapshot frame; keeps SQL result order identical to the frame's
+POSITION_COLUMN = "_position"
+
+# Content key of the frame each stored table holds, written in the same transaction as the table
+CONTENTS_TABLE = "_contents"
+
+
+def _quote(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def content_key(frame: pd.DataFrame) -> str:
+    """Digest of a frame's columns and values; equal frames get equal keys in any process."""
+    digest = hashlib.sha1("\x1f".join(map(str, frame.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def parse_order(order_by: Optional[str]) -> Optional[Tuple[str, bool]]:
+    """``"-urgency_score"`` -> ``("urgency_score", True)`` (descending)."""
+    if not order_by:
+        return None
+    return (order_by[1:], True) if order_by.startswith("-") else (order_by, False)
+
+
+def _check_dimensions(group_by: Sequence[str], filters: Optional[Dict[str, Any]]):
+    unknown = [d for d in list(group_by) + list(filters or {}) if d not in CUBE_DIMENSIONS]
+    if unknown:
+        raise ValueError(f"Unknown cube dimensions {unknown}; available: {list(CUBE_DIMENSIONS)}")
+
+
+def where_sql(filters: Optional[Dict[str, Any]], columns: Iterable[str]) -> Tuple[str, List[Any]]:
+    """SQL ``WHERE`` clause and parameters for PQRS filters on a table with ``columns``.
+
+    Filters on columns the table does not have are ignored.
+    """
+    ranges, filters = split_date_filters(filters)
+    clauses, params = [], []
+    known = set(columns)
+
+    for field, (start, end) in ranges.items():
+        if field not in known:
+            continue
+        clauses.append(f'"{field}" IS NOT NULL')
+        if start is not None:
+            clauses.append(f'"{field}" >= ?')
+            params.append(start.strftime(DATE_FORMAT))
+        if end is not None:
+            clauses.append(f'"{field}" <= ?')
+            params.append(end.strftime(DATE_FORMAT))
+
+    for key, value in filters.items():
+        if key not in known:
+            continue
+        values = value if isinstance(value, list) else [value]
+        if key == "numero_radicado_entrada":
+            values = [_as_str(v) for v in values]
+        values = [v.item() if isinstance(v, np.generic) else v for v in values]
+        clauses.append(f'"{key}" IN ({", ".join("?" * len(values))})' if values else "0")
+        params.extend(values)
+
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def aggregate_sql(table: str, group_by: Sequence[str], filters: Optional[Dict[str, Any]],
+                  columns: Iterable[str]) -> Tuple[str, List[Any]]:
+    """``SELECT <group_by>, COUNT(*)`` over cube dimensions, largest groups first."""
+    _check_dimensions(group_by, filters)
+    filters = {
+        dim: [int(float(v)) if dim in ("ano", "mes") and v is not None else v
+              for v in (value if isinstance(value, (list, tuple, set)) else [value])]
+        for dim, value in (filters or {}).items()
+    }
+    where, params = where_sql(filters, columns)
+
+    known = set(columns)
+    selected = [
+        (f'CAST("{d}" AS INTEGER)' if d in ("ano", "mes") else f'"{d}"') if d in known else "NULL"
+        for d in group_by
+    ]
+    select = ", ".join(selected + ["COUNT(*)"])
+    sql = f'SELECT {select} FROM "{table}"{where}'
+    if group_by:
+        sql += f' GROUP BY {", ".join(str(i + 1) for i in range(len(group_by)))}'
+    sql += " ORDER BY COUNT(*) DESC"
+    return sql, params
+
+
+class StorageBackend(ABC):
+    """Answers filtered PQRS reads and aggregates for a dataset generation.
+
+    Filters are those of ``DataService.get_pqrs_records``: equality or
+    membership per column, radicado lookups and the date-range filters of
+    ``split_date_filters``. ``order_by`` names a column, prefixed with ``-``
+    for descending order; missing values sort last and ties keep row order.
+    """
+
+    name = ""
+
+    def publish(self, snapshot: DatasetSnapshot, changed_radicados: Optional[Iterable[str]] = None):
+        """Serve ``snapshot`` from now on; ``changed_radicados`` limits the PQRS rows to rewrite."""
+
+    def serves(self, snapshot: DatasetSnapshot) -> bool:
+        """Whether reads of ``snapshot`` can be answered by this backend."""
+        return True
+
+    def retire(self, snapshot: DatasetSnapshot):
+        """Called once ``snapshot`` has been replaced and its last reader has finished."""
+
+    @abstractmethod
+    def select(self, snapshot: DatasetSnapshot, filters: Optional[Dict[str, Any]] = None,
+               limit: Optional[int] = None, order_by: Optional[str] = None,
+               columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """PQRS rows matching ``filters``."""
+
+    @abstractmethod
+    def count(self, snapshot: DatasetSnapshot, filters: Optional[Dict[str, Any]] = None) -> int:
+        """Number of PQRS matching ``filters``."""
+
+    @abstractmethod
+    def aggregate(self, snapshot: DatasetSnapshot, group_by: Sequence[str],
+                  filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """PQRS counts grouped by cube dimensions, largest first."""
+
+    def iter_select(self, snapshot: DatasetSnapshot, filters: Optional[Dict[str, Any]] = None,
+                    columns: Optional[List[str]] = None, chunk_rows: int = 10000) -> Iterator[pd.DataFrame]:
+        """PQRS rows matching ``filters`` in frames of at most ``chunk_rows`` rows."""
+        df = self.select(snapshot, filters, columns=columns)
+        for start in range(0, len(df), chunk_rows):
+            yield df.iloc[start:start + chunk_rows]
+
+    def status(self) -> Dict[str, Any]:
+        return {"backend": self.name}
+
+
+class PandasBackend(StorageBackend):
+    """Answers from the in-memory frames and indexes of the snapshot itself."""
+
+    name = "memory"
+
+    @staticmethod
+    def positions(snapshot: DatasetSnapshot, filters: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """Row positions matching the filters, or None when nothing is filtered.
+
+        Radicado and date-range filters are resolved from the indexes; other
+        keys are equality (or membership, for lists) filters on the remaining rows.
+        """
+        ranges, filters = split_date_filters(filters)
+        positions: Optional[np.ndarray] = None
+
+        def narrow(found: np.ndarray):
+            nonlocal positions
+            positions = found if positions is None else np.intersect1d(positions, found, assume_unique=True)
+
+        radicado = filters.pop("numero_radicado_entrada", None)
+        if radicado is not None:
+            wanted = radicado if isinstance(radicado, list) else [radicado]
+            index = snapshot.radicado_positions
+            narrow(np.array(sorted({index[r] for r in map(_as_str, wanted) if r in index}), dtype=int))
+
+        for field, (start, end) in ranges.items():
+            index = snapshot.date_indexes.get(field)
+            if index is not None:
+                narrow(index.between(start, end))
+
+        df = snapshot.pqrs
+        filters = {key: value for key, value in filters.items() if key in df.columns}
+        if filters:
+            subset = df if positions is None else df.iloc[positions]
+            mask = np.ones(len(subset), dtype=bool)
+            for key, value in filters.items():
+                mask &= subset[key].isin(value if isinstance(value, list) else [value]).to_numpy()
+            narrow(np.flatnonzero(mask) if positions is None else positions[mask])
+
+        return positions
+
+    def select(self, snapshot, filters=None, limit=None, order_by=None, columns=None):
+        positions = self.positions(snapshot, filters)
+        df = snapshot.pqrs if positions is None else snapshot.pqrs.iloc[positions]
+
+        order = parse_order(order_by)
+        if order and order[0] in df.columns:
+            df = df.sort_values(order[0], ascending=not order[1], kind="stable", na_position="last")
+        if limit is not None:
+            df = df.head(limit)
+        return df[columns] if columns else df
+
+    def count(self, snapshot, filters=None):
+        positions = self.positions(snapshot, filters)
+        return len(snapshot.pqrs) if positions is None else len(positions)
+
+    def aggregate(self, snapshot, group_by, filters=None):
+        return snapshot.cube.query(group_by, filters)
+
+
+class SQLiteBackend(StorageBackend):
+    """Indexed tables in an on-disk SQLite database.
+
+    Filters, ordering, limits and group-bys run as SQL, so a request reads
+    only the matching rows. Only the published generation is stored; reads
+    of an older, still-pinned generation are answered from its frames.
+    Each thread uses its own connection; WAL mode lets reads run while a
+    new generation is being written.
+
+    The tables mirror the frames of the published snapshot, which stay in
+    memory: this backend speeds up queries, it does not bound memory. For
+    PQRS tables larger than memory use the partitioned backend.
+
+    Several worker processes may share the database file. An exclusive file
+    lock makes publishing single-writer across processes, and each table is
+    stored with the content key of its frame. A worker skips writing tables
+    that already hold its frames, and serves reads from SQL whenever the
+    stored PQRS key is its own, whoever wrote it; otherwise it answers from
+    its frames until its next publish. PQRS frames are only equal across
+    workers when they are scored once, as with ``SHARED_DATASET_DIR``.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.generation: Optional[int] = None
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._frames: Dict[str, Any] = {}
+        self._keys: Dict[str, str] = {}
+        self._columns: Dict[str, List[str]] = {}
+        self._date_columns: Dict[str, List[str]] = {}
+        self._fallback = PandasBackend()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {CONTENTS_TABLE} (name TEXT PRIMARY KEY, content TEXT)")
+            conn.commit()
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _writer_lock(self) -> Iterator[None]:
+        with open(f"{self.path}.lock", "w") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _stored_keys(conn: sqlite3.Connection) -> Dict[str, str]:
+        return dict(conn.execute(f"SELECT name, content FROM {CONTENTS_TABLE}").fetchall())
+
+    @contextmanager
+    def _reading(self) -> Iterator[Optional[sqlite3.Connection]]:
+        """Connection in a read transaction, or None when the PQRS table does not hold this process's frame."""
+        conn = self._connection()
+        conn.execute("BEGIN")
+        try:
+            ours = self.generation is not None and self._stored_keys(conn).get("pqrs") == self._keys.get("pqrs")
+            yield conn if ours else None
+        finally:
+            conn.rollback()
+
+    # Writes
+
+    def publish(self, snapshot, changed_radicados=None):
+        with self._write_lock, self._writer_lock():
+            conn = self._connection()
+            stored = self._stored_keys(conn)
+
+            for table in TABLES:
+                frame = getattr(snapshot, table)
+                if frame is None:
+                    continue
+                if frame is self._frames.get(table):
+                    key = self._keys[table]
+                    upsert = False
+                else:
+                    upsert = (table == "pqrs" and changed_radicados is not None and "pqrs" in self._keys
+                              and list(frame.columns) == self._columns.get(table))
+                    positions = sorted({snapshot.radicado_positions[r] for r in map(_as_str, changed_radicados)
+                                        if r in snapshot.radicado_positions}) if upsert else []
+                    # An upsert chains the previous key, so workers applying the same upserts agree
+                    key = (hashlib.sha1((self._keys["pqrs"] + content_key(frame.iloc[positions])).encode()).hexdigest()
+                           if upsert else content_key(frame))
+
+                if stored.get(table) != key:
+                    if upsert and stored.get(table) == self._keys[table]:
+                        self._upsert_rows(conn, frame, positions, changed_radicados, key)
+                    else:
+                        self._write_table(conn, table, frame, key)
+                self._frames[table], self._keys[table] = frame, key
+                self._columns[table] = list(frame.columns)
+                self._date_columns[table] = self._dates(table, frame)
+
+            self.generation = snapshot.generation
+
+    @staticmethod
+    def _dates(table: str, frame: pd.DataFrame) -> List[str]:
+        """Columns stored as date text: datetime columns, and the PQRS date fields."""
+        dates = [c for c in frame.columns if pd.api.types.is_datetime64_any_dtype(frame[c])]
+        if table == "pqrs":
+            dates += [c for c in ("fecha_radicacion", "fecha_vencimiento") if c in frame.columns and c not in dates]
+        return dates
+
+    def _set_key(self, conn: sqlite3.Connection, table: str, key: str):
+        conn.execute(f"INSERT OR REPLACE INTO {CONTENTS_TABLE} VALUES (?, ?)", (table, key))
+
+    def _prepare(self, table: str, frame: pd.DataFrame, positions: Optional[Sequence[int]] = None) -> pd.DataFrame:
+        """Frame as stored: dates as sortable text, radicados as strings, plus row positions."""
+        stored = frame.copy()
+        for column in self._dates(table, frame):
+            stored[column] = pd.to_datetime(stored[column], errors="coerce").dt.strftime(DATE_FORMAT)
+        for column in stored.columns[stored.dtypes == object]:
+            stored[column] = stored[column].map(
+                lambda v: v.strftime(DATE_FORMAT) if isinstance(v, datetime) else v)
+        if "numero_radicado_entrada" in stored.columns:
+            stored["numero_radicado_entrada"] = stored["numero_radicado_entrada"].map(
+                lambda v: _as_str(v) if pd.notna(v) else None)
+        stored[POSITION_COLUMN] = np.arange(len(stored)) if positions is None else positions
+        return stored
+
+    def _write_table(self, conn: sqlite3.Connection, table: str, frame: pd.DataFrame, key: str):
+        """Write the table under a temporary name, then swap it in with its indexes and key in one transaction."""
+        stored = self._prepare(table, frame)
+        stored.to_sql(f"{table}__new", conn, index=False, if_exists="replace")
+
+        with conn:
+            conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+            conn.execute(f'ALTER TABLE "{table}__new" RENAME TO "{table}"')
+            for columns in INDEXED_COLUMNS.get(table, []) + [POSITION_COLUMN]:
+                columns = columns if isinstance(columns, tuple) else (columns,)
+                if all(c in stored.columns for c in columns):
+                    name = f"ix_{table}_{'_'.join(columns)}"
+                    conn.execute(f'CREATE INDEX "{name}" ON "{table}" ({", ".join(map(_quote, columns))})')
+            self._set_key(conn, table, key)
+
+        logger.info(f"Stored {len(frame)} {table} rows in {self.path}")
+
+    def _upsert_rows(self, conn: sqlite3.Connection, frame: pd.DataFrame, positions: List[int],
+                     radicados: Iterable[str], key: str):
+        """Replace only the rows of the given radicados, found at ``positions`` of the frame."""
+        radicados = [_as_str(r) for r in radicados]
+        stored = self._prepare("pqrs", frame.iloc[positions], positions=positions)
+
+        columns = list(stored.columns)
+        rows = stored.astype(object).where(stored.notna(), None).itertuples(index=False, name=None)
+        with conn:
+            for chunk in range(0, len(radicados), 500):
+                batch = radicados[chunk:chunk + 500]
+                conn.execute(f'DELETE FROM pqrs WHERE numero_radicado_entrada IN ({", ".join("?" * len(batch))})',
+                             batch)
+            conn.executemany(
+                f'INSERT INTO pqrs ({", ".join(map(_quote, columns))}) '
+                f'VALUES ({", ".join("?" * len(columns))})',
+                [tuple(v.item() if isinstance(v, np.generic) else v for v in row) for row in rows]
+            )
+            self._set_key(conn, "pqrs", key)
+
+    # Reads
+
+    def serves(self, snapshot):
+        return self.generation is not None and snapshot.generation == self.generation
+
+    def _where(self, filters: Optional[Dict[str, Any]]) -> Tuple[str, List[Any]]:
+        return where_sql(filters, self._columns.get("pqrs", []))
+
+    def select(self, snapshot, filters=None, limit=None, order_by=None, columns=None):
+        with self._reading() as conn:
+            if conn is None:
+                return self._fallback.select(snapshot, filters, limit, order_by, columns)
+
+            where, params = self._where(filters)
+            wanted = [c for c in (columns or self._columns["pqrs"]) if c in self._columns["pqrs"]]
+
+            order = parse_order(order_by)
+            order_sql = f'"{POSITION_COLUMN}"'
+            if order and order[0] in self._columns["pqrs"]:
+                order_sql = f'"{order[0]}" IS NULL, "{order[0]}" {"DESC" if order[1] else "ASC"}, {order_sql}'
+
+            sql = f'SELECT {", ".join(map(_quote, wanted))} FROM pqrs{where} ORDER BY {order_sql}'
+            if limit is not None:
+                sql += " LIMIT ?"
+                params.append(int(limit))
+
+            df = pd.read_sql_query(sql, conn, params=params)
+        for column in self._date_columns.get("pqrs", []):
+            if column in df.columns:
+                df[column] = pd.to_datetime(df[column], format=DATE_FORMAT, errors="coerce")
+        return df
+
+    def count(self, snapshot, filters=None):
+        with self._reading() as conn:
+            if conn is None:
+                return self._fallback.count(snapshot, filters)
+            where, params = self._where(filters)
+            return conn.execute(f"SELECT COUNT(*) FROM pqrs{where}", params).fetchone()[0]
+
+    def aggregate(self, snapshot, group_by, filters=None):
+        with self._reading() as conn:
+            if conn is None:
+                return self._fallback.aggregate(snapshot, group_by, filters)
+            sql, params = aggregate_sql("pqrs", group_by, filters, self._columns["pqrs"])
+            rows = conn.execute(sql, params).fetchall()
+        return [dict(zip(group_by, row[:-1]), count=row[-1]) for row in rows if row[-1]]
+
+    def status(self):
+        if self.generation is None:
+            return {"backend": self.name, "path": str(self.path), "generation": None}
+        with self._reading() as conn:
+            if conn is None:
+                return {"backend": self.name, "path": str(self.path), "generation": self.generation,
+                        "pqrs_stored_by_other_process": True}
+            return {
+                "backend": self.name,
+                "path": str(self.path),
+                "generation": self.generation,
+                "rows": {table: conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+                         for table in TABLES if table in self._columns}
+            }
+
+
+def create_backend(name: str, path: Optional[str] = None) -> StorageBackend:
+    """Backend for the ``storage_backend`` setting: ``memory``, ``sqlite`` or ``partitioned``."""
+    if name == "memory":
+        return PandasBackend()
+    if name == "sqlite":
+        return SQLiteBackend(path)
+    if name == "partitioned":
+        from .partitioned_store import PartitionedBackend
+        return PartitionedBackend(path)
+    raise ValueError(f"Unknown storage backend '{name}'; expected 'memory', 'sqlite' or 'partitioned'")
@@ -0,0 +1,167 @@
+"""Vector index split into one Chroma collection per partition, searched as a single index."""
+
+import heapq
+import logging
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import chromadb
+from langchain.docstore.document import Document
+from langchain_community.vectorstores import Chroma
+
+from .date_index import split_date_filters
+from .geo import normalize_name
+
+logger = logging.getLogger(__name__)
+
+# PQRS column the index can be partitioned by -> document metadata key holding its value
+PARTITION_KEYS = {"ano": "ano", "comuna_hecho": "comuna"}
+
+# Partition name of documents without a value for the partition key
+UNKNOWN_PARTITION = "none"
+
+# Collections searched at the same time by one query
+SEARCH_WORKERS = 8
+
+
+def partition_name(value: Any) -> str:
+    """Collection-safe partition name of a key value: "2024", "la-candelaria"..."""
+    if value is None or value == "":
+        return UNKNOWN_PARTITION
+    try:
+        number = float(value)
+        if number.is_integer():
+            return str(int(number))
+    except (TypeError, ValueError):
+        pass
+    return re.sub(r"[^a-z0-9]+", "-", normalize_name(value)).strip("-") or UNKNOWN_PARTITION
+
+
+class PartitionedVectorStore:
+    """PQRS chunks in one collection per value of a PQRS column (the year or the comuna).
+
+    Collections are named ``<base>__<partition>``, with a ``.<version>``
+    suffix once a partition has been rebuilt. A query is embedded once and
+    searched in every collection its filters can match, in parallel; the
+    per-collection top-k lists are merged by distance. Comuna names are
+    matched case- and accent-insensitively.
+    """
+
+    def __init__(self, base_name: str, column: str, persist_directory: str, embeddings: Any):
+        if column not in PARTITION_KEYS:
+            raise ValueError(f"Cannot partition the vector index by '{column}'; expected one of {list(PARTITION_KEYS)}")
+        self.base_name = base_name
+        self.column = column
+        self.key = PARTITION_KEYS[column]
+        self.embeddings = embeddings
+        self._client = chromadb.PersistentClient(path=persist_directory)
+        self._stores: Dict[str, Chroma] = {}
+
+        # Sorted names put the latest rebuild of a partition last, so it wins
+        prefix = f"{base_name}__"
+        names = sorted(getattr(collection, "name", collection) for collection in self._client.list_collections())
+        for name in names:
+            if name.startswith(prefix):
+                self._stores[name[len(prefix):].split(".", 1)[0]] = self._chroma(name)
+
+    def _chroma(self, collection_name: str) -> Chroma:
+        return Chroma(collection_name=collection_name, embedding_function=self.embeddings, client=self._client)
+
+    def _store(self, partition: str) -> Chroma:
+        store = self._stores.get(partition)
+        if store is None:
+            store = self._stores[partition] = self._chroma(f"{self.base_name}__{partition}")
+        return store
+
+    def partition_of(self, metadata: Dict[str, Any]) -> str:
+        return partition_name(metadata.get(self.key))
+
+    @property
+    def partitions(self) -> List[str]:
+        return sorted(self._stores)
+
+    @property
+    def collections(self) -> List[Any]:
+        """The underlying Chroma collections, for direct metadata reads and writes."""
+        return self.collections_for(None)
+
+    def collections_for(self, filters: Optional[Dict[str, Any]]) -> List[Any]:
+        """Chroma collections of the partitions ``filters`` allow."""
+        return [self._stores[partition]._collection for partition in self.partitions_for(filters)]
+
+    def add_documents(self, documents: List[Document]) -> List[str]:
+        """Add documents to the collections of their partitions."""
+        grouped: Dict[str, List[Document]] = {}
+        for document in documents:
+            grouped.setdefault(self.partition_of(document.metadata), []).append(document)
+        ids = []
+        for partition, group in grouped.items():
+            ids.extend(self._store(partition).add_documents(group))
+        return ids
+
+    def partitions_for(self, filters: Optional[Dict[str, Any]]) -> List[str]:
+        """Partitions that can hold documents matching ``filters``; all of them without a usable filter."""
+        filters = dict(filters or {})
+        wanted = None
+        if self.column in filters:
+            values = filters[self.column] if isinstance(filters[self.column], list) else [filters[self.column]]
+            wanted = {partition_name(value) for value in values}
+        elif self.column == "ano":
+            ranges, _ = split_date_filters(filters)
+            if "fecha_radicacion" in ranges:
+                start, end = ranges["fecha_radicacion"]
+                wanted = {p for p in self._stores if p != UNKNOWN_PARTITION
+                          and (start is None or int(p) >= start.year) and (end is None or int(p) <= end.year)}
+        return [p for p in self.partitions if wanted is None or p in wanted]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, filters: Optional[Dict[str, Any]] = None,
+                                     where: Optional[Dict[str, Any]] = None) -> List[Tuple[Document, float]]:
+        """The ``k`` nearest chunks over the partitions ``filters`` allow, with their distances.
+
+        ``where`` is a Chroma metadata filter applied inside each partition's search.
+        """
+        partitions = self.partitions_for(filters)
+        if not partitions:
+            return []
+
+        embedding = self.embeddings.embed_query(query)
+        search = lambda partition: self._stores[partition].similarity_search_by_vector_with_relevance_scores(
+            embedding, k=k, filter=where)
+        if len(partitions) == 1:
+            results = [search(partitions[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(SEARCH_WORKERS, len(partitions))) as pool:
+                results = list(pool.map(search, partitions))
+
+        return heapq.nsmallest(k, (hit for hits in results for hit in hits), key=lambda hit: hit[1])
+
+    def similarity_search(self, query: str, k: int = 4, filters: Optional[Dict[str, Any]] = None) -> List[Document]:
+        return [document for document, _ in self.similarity_search_with_score(query, k, filters)]
+
+    def rebuild_partition(self, partition: str, batches: Iterable[List[Document]]) -> int:
+        """Re-embed one partition into a new collection and swap it in; returns the chunks added.
+
+        The other partitions, and this one until the swap, keep answering
+        searches while the new collection is filled.
+        """
+        store = self._chroma(f"{self.base_name}__{partition}.{time.time_ns()}")
+        added = 0
+        for documents in batches:
+            store.add_documents(documents)
+            added += len(documents)
+
+        previous, self._stores[partition] = self._stores.get(partition), store
+        if previous is not None:
+            previous.delete_collection()
+        logger.info(f"Rebuilt vector partition {self.column}={partition} with {added} chunks")
+        return added
+
+    def count(self) -> int:
+        return sum(collection.count() for collection in self.collections)
+
+    def delete_collection(self):
+        """Drop every partition's collection."""
+        for partition in list(self._stores):
+            self._stores.pop(partition).delete_collection()
@@ -0,0 +1,68 @@
+"""Shared fixtures: synthetic PQRS frames and the global services, restored after each test."""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ..config import settings
+from ..services.assignment_ledger import assignment_ledger
+from ..services.data_service import data_service
+from ..services.dataset import SnapshotRegistry
+from ..services.job_service import job_service
+from ..services.rag_service import rag_service
+from ..services.search_cache import LRUCache
+
+
+def _pqrs_frame(n: int = 300) -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    now = datetime.now()
+    due = [now + timedelta(days=int(d)) for d in rng.integers(-20, 20, n)]
+    due[3] = pd.NaT
+    return pd.DataFrame({
+        "numero_radicado_entrada": [float(1000 + i) for i in range(n)],
+        "estado": rng.choice(["activo", "cerrado", "en_tramite"], n),
+        "comuna_hecho": rng.choice(["Popular", "Laureles", "Belén", None], n),
+        "tipo_solicitud": rng.choice(["peticion", "queja"], n),
+        "asunto": rng.choice(["hueco", "poste urgente", "alumbrado"], n),
+        "ano": rng.choice([2024, 2025], n),
+        "mes": rng.integers(1, 13, n),
+        "fecha_radicacion": [now - timedelta(days=int(d)) for d in rng.integers(0, 120, n)],
+        "fecha_vencimiento": due,
+    })
+
+
+@pytest.fixture
+def pqrs_frame():
+    """Factory of seeded PQRS frames with ``n`` rows, dated relative to now; one due date is missing."""
+    return _pqrs_frame
+
+
+@pytest.fixture
+def services(monkeypatch):
+    """The global data and RAG services, put back as they were when the test ends.
+
+    The test gets an empty snapshot registry and result cache of its own, so
+    the generations, vector stores and results it publishes do not leak into
+    later tests.
+    """
+    for service in (data_service, rag_service):
+        for name, value in list(vars(service).items()):
+            monkeypatch.setattr(service, name, value)
+    monkeypatch.setattr(data_service, "_snapshots", SnapshotRegistry())
+    monkeypatch.setattr(rag_service, "_results", LRUCache(rag_service._results.maxsize, rag_service._results.ttl_seconds))
+    return data_service, rag_service
+
+
+@pytest.fixture(autouse=True)
+def state_dirs(tmp_path, monkeypatch):
+    """Point the vector store, job and ledger databases at the test's own directories."""
+    chroma, state = tmp_path / "chroma_db", tmp_path / "state"
+    chroma.mkdir()
+    monkeypatch.setattr(settings, "chroma_persist_directory", str(chroma))
+    monkeypatch.setattr(settings, "state_dir", str(state))
+    monkeypatch.setattr(rag_service, "persist_directory", chroma)
+    monkeypatch.setattr(rag_service, "_collection_file", chroma / "active_collection")
+    monkeypatch.setattr(job_service, "db_path", state / "jobs.db")
+    monkeypatch.setattr(assignment_ledger, "db_path", state / "ledger.db")
@@ -0,0 +1,73 @@
+"""Tests for the aggregate cube against pandas group-bys."""
+
+import numpy as np
+import pandas as pd
+
+from ..services.aggregate_cube import AggregateCube
+from ..services.data_service import DataService
+
+
+def _pqrs(n, seed=0, start=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "numero_radicado_entrada": [str(i) for i in range(start, start + n)],
+        "estado": rng.choice(["activo", "cerrado", None], n, p=[0.5, 0.45, 0.05]),
+        "tipo_solicitud": rng.choice(["Petición", "Queja", "Reclamo"], n),
+        "comuna_hecho": rng.choice(["Popular", "Laureles", "Belén", None], n),
+        "ano": rng.choice([2023, 2024], n),
+        "mes": rng.integers(1, 13, n),
+    })
+
+
+def _groupby(df, group_by, filters=None):
+    """``{group: count}`` of the rows matching ``filters``, computed with pandas."""
+    for dim, values in (filters or {}).items():
+        df = df[df[dim].isin(values if isinstance(values, list) else [values])]
+    if not group_by:
+        return {(): len(df)} if len(df) else {}
+    sizes = df.groupby(list(group_by), dropna=False).size()
+    return {
+        (tuple(None if pd.isna(v) else v for v in key) if isinstance(key, tuple) else
+         (None if pd.isna(key) else key,)): int(count)
+        for key, count in sizes.items()
+    }
+
+
+def _cube(cube, group_by, filters=None):
+    return {tuple(g[d] for d in group_by): g["count"] for g in cube.query(group_by, filters)}
+
+
+QUERIES = [
+    ((), None),
+    (("estado",), None),
+    (("comuna_hecho", "tipo_solicitud"), None),
+    (("ano", "mes"), {"estado": "activo"}),
+    (("comuna_hecho",), {"tipo_solicitud": ["Queja", "Reclamo"], "ano": 2024}),
+    (("estado", "comuna_hecho", "tipo_solicitud", "ano", "mes"), None),
+]
+
+
+def test_roll_ups_and_slices_match_a_groupby():
+    df = _pqrs(3000)
+    cube = AggregateCube()
+    cube.build(df)
+
+    for group_by, filters in QUERIES:
+        assert _cube(cube, group_by, filters) == _groupby(df, group_by, filters)
+    assert cube.total({"estado": "activo"}) == int((df["estado"] == "activo").sum())
+
+
+def test_cube_matches_a_groupby_after_an_upsert():
+    service = DataService()
+    service.publish(service.build_snapshot(_pqrs(2000)))
+
+    updates = _pqrs(300, seed=1, start=1500)  # existing radicados 1500-1799
+    inserts = _pqrs(200, seed=2, start=5000)
+    snapshot, summary = service.upsert_pqrs(pd.concat([updates, inserts], ignore_index=True))
+    assert (summary["updated"], summary["inserted"]) == (300, 200)
+
+    df = snapshot.pqrs.astype({"ano": int, "mes": int})
+    for column in ("estado", "tipo_solicitud", "comuna_hecho"):
+        df[column] = df[column].astype(object)
+    for group_by, filters in QUERIES:
+        assert _cube(snapshot.cube, group_by, filters) == _groupby(df, group_by, filters)
@@ -0,0 +1,104 @@
+"""Tests for the data directory watcher."""
+
+import os
+import threading
+
+import pandas as pd
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from langchain_community.vectorstores import Chroma
+
+from ..agents.data_agent import data_agent
+from ..config import settings
+from ..services.data_watcher import DataWatcher
+from ..services.ingest_service import ingest_service
+from ..services.search_cache import CachedEmbeddings
+
+
+def test_watcher_debounces_and_skips_unchanged_content(tmp_path):
+    """A burst of writes queues one refresh once quiet; a touch without new content queues none."""
+    workbook = tmp_path / settings.personnel_data_file
+    workbook.write_bytes(b"v1")
+    queued = []
+    watcher = DataWatcher(str(tmp_path), interval=1, debounce=5,
+                          submit=lambda dataset, fingerprint: queued.append(dataset))
+    watcher.prime()
+
+    workbook.write_bytes(b"v2 partial")
+    assert watcher.poll(now=100) == []
+    workbook.write_bytes(b"v2 partial, complete")
+    assert watcher.poll(now=103) == []
+    assert watcher.poll(now=107) == []  # still within 5s of the last write
+    assert watcher.poll(now=109) == ["personnel"]
+    assert watcher.poll(now=200) == []
+
+    stat = workbook.stat()
+    os.utime(workbook, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    watcher.poll(now=300)
+    assert watcher.poll(now=310) == []
+    assert queued == ["personnel"]
+
+
+def test_full_pqrs_refresh_reindexes_changed_and_dropped_records(services, pqrs_frame, tmp_path, monkeypatch):
+    """A refresh that drops radicados is published in full, with the vector index brought up to date."""
+    data_service, rag_service = services
+    embeddings = CachedEmbeddings(DeterministicFakeEmbedding(size=16), maxsize=100)
+    monkeypatch.setattr(rag_service, "embeddings", embeddings)
+    workbook = pqrs_frame(20)
+    data_service.publish(data_service.build_snapshot(data_service._cleaned("pqrs", workbook)))
+    store = Chroma(collection_name="refresh_test", persist_directory=str(tmp_path), embedding_function=embeddings)
+    store.add_documents(rag_service._documents_for(data_service.get_pqrs_records()))
+    data_service.attach_vectorstore(store)
+    rag_service._initialized = True
+
+    export = workbook.iloc[:-1].copy()
+    export.loc[0, "asunto"] = "árbol caído sobre la vía del parque"
+    monkeypatch.setattr(data_service, "read_dataset", lambda dataset: data_service._cleaned(dataset, export))
+    refreshed = data_service.get_pqrs_by_radicado("1000").model_copy(update={"asunto": export.loc[0, "asunto"]})
+    query = rag_service._documents_for([refreshed])[0].page_content
+    rag_service.semantic_search(query, limit=1)
+    assert store.similarity_search_with_score(query, k=1)[0][1] > 0
+
+    result = data_agent.refresh_dataset("pqrs")
+    assert (result["status"], result["mode"], result["changed"], result["removed_pqrs"]) == \
+        ("completed", "full", 1, 1)
+
+    found = rag_service.semantic_search(query, limit=1)
+    assert found[0]["record"].numero_radicado_entrada == "1000"
+    assert store.similarity_search_with_score(query, k=1)[0][1] < 1e-6
+    assert found[0]["record"].asunto == "árbol caído sobre la vía del parque"
+    assert store.get(where={"radicado": "1019"})["ids"] == []
+
+
+def test_refresh_does_not_drop_an_ingest_arriving_meanwhile(services, pqrs_frame, monkeypatch):
+    """An ingest waits for a refresh that is building its generation, then is published on top of it."""
+    data_service, _ = services
+    data_service.publish(data_service.build_snapshot(data_service._cleaned("pqrs", pqrs_frame(20))))
+    transport = pd.DataFrame({"license_plate": ["ABC123"], "vehicle_type": ["moto"],
+                              "zone": ["Belén"], "status": ["available"]})
+    monkeypatch.setattr(data_service, "read_dataset", lambda dataset: transport)
+
+    derived, release = threading.Event(), threading.Event()
+    replace_dataset = data_service.replace_dataset
+
+    def slow_replace(dataset, frame):
+        snapshot = replace_dataset(dataset, frame)
+        derived.set()
+        release.wait(5)
+        return snapshot
+
+    monkeypatch.setattr(data_service, "replace_dataset", slow_replace)
+    refresh = threading.Thread(target=data_agent.refresh_dataset, args=("transport",))
+    refresh.start()
+    assert derived.wait(5)
+
+    ingest = threading.Thread(target=ingest_service.ingest_records,
+                              args=([{"numero_radicado_entrada": "5000", "estado": "activo"}],))
+    ingest.start()
+    ingest.join(0.2)
+    assert ingest.is_alive()
+    release.set()
+    refresh.join(5)
+    ingest.join(5)
+
+    assert data_service.get_pqrs_by_radicado("5000") is not None
+    assert data_service.snapshot.transport is transport
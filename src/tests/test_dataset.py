@@ -0,0 +1,22 @@
+"""Tests for dataset snapshot generations."""
+
+from ..services.dataset import DatasetSnapshot, SnapshotRegistry
+
+
+def test_reading_pins_generation_across_publish():
+    """A reader keeps its generation after a swap; cleanup waits for it to finish."""
+    registry = SnapshotRegistry()
+    first = DatasetSnapshot(generation=registry.next_generation())
+    registry.publish(first)
+    retired = []
+
+    with registry.reading() as pinned:
+        registry.publish(DatasetSnapshot(generation=registry.next_generation()),
+                         on_retired=lambda: retired.append(first.generation))
+
+        assert registry.current is pinned is first
+        assert retired == []
+
+    assert retired == [first.generation]
+    assert registry.current.generation == first.generation + 1
+    assert registry.status()["readers"] == {}
@@ -0,0 +1,43 @@
+"""Tests for the date-range index and date filters."""
+
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from ..services.date_index import DateRangeIndex, split_date_filters, with_live_days
+
+
+NOW = datetime(2025, 3, 3, 8, 0)
+
+
+def test_range_queries_match_a_scan():
+    """Binary-searched ranges return the same rows as a full comparison."""
+    dates = pd.Series([NOW + timedelta(days=d) for d in (5, -2, 0, 9, -7)] + [None])
+    index = DateRangeIndex(dates)
+
+    assert len(index) == 5
+    assert index.between(NOW - timedelta(days=2), NOW + timedelta(days=5)).tolist() == [0, 1, 2]
+    assert index.between(end=NOW).tolist() == [1, 2, 4]
+    assert index.between(start=NOW + timedelta(days=10)).tolist() == []
+
+
+def test_date_filters_and_live_days():
+    """Dashboard shortcuts become date ranges and day counts follow the current date."""
+    ranges, remaining = split_date_filters(
+        {"estado": "activo", "overdue": True, "fecha_vencimiento_from": "2025-02-01",
+         "fecha_radicacion_to": "2025-02-28"},
+        now=NOW
+    )
+    assert remaining == {"estado": "activo"}
+    assert ranges["fecha_vencimiento"] == (datetime(2025, 2, 1), NOW)
+    assert ranges["fecha_radicacion"] == (None, datetime(2025, 2, 28, 23, 59, 59, 999999))
+
+    df = pd.DataFrame({
+        "fecha_radicacion": [NOW - timedelta(days=10), NOW - timedelta(days=40), None],
+        "fecha_radicado_respuesta": [None, NOW - timedelta(days=30), None],
+        "fecha_vencimiento": [NOW + timedelta(days=5), NOW - timedelta(days=25), None],
+        "dias_transcurridos": [1, 1, 7],
+    })
+    live = with_live_days(df, now=NOW)
+    assert live["dias_transcurridos"].tolist() == [10, 10, 7]
+    assert live["dias_restantes"].iloc[:2].tolist() == [5, -25]
@@ -0,0 +1,53 @@
+"""Tests for the compact PQRS dtypes and upserts on a compacted frame."""
+
+import numpy as np
+import pandas as pd
+
+from ..services.data_service import DataService
+from ..services.frame_dtypes import compact_pqrs, memory_report
+
+
+def _frame(n: int = 500) -> pd.DataFrame:
+    rng = np.random.default_rng(3)
+    return pd.DataFrame({
+        "numero_radicado_entrada": [str(i) for i in range(n)],
+        "estado": pd.Series(rng.choice(["activo", "cerrado"], n), dtype=object),
+        "comuna_hecho": pd.Series(rng.choice(["Popular", "Laureles", None], n), dtype=object),
+        "tipo_solicitud": pd.Series(rng.choice(["peticion", "queja"], n), dtype=object),
+        "asunto": pd.Series(["hueco en la via"] * n, dtype=object),
+        "ano": rng.choice([2024.0, np.nan], n),
+        "mes": rng.choice([1.0, 12.0], n),
+        "fecha_vencimiento": ["2025-03-01"] * (n - 1) + [None],
+    })
+
+
+def test_compact_pqrs_dtypes_and_report():
+    """Repeated text becomes categories, years/months nullable integers and date text datetimes."""
+    raw = _frame()
+    compact = compact_pqrs(raw)
+
+    assert isinstance(compact["estado"].dtype, pd.CategoricalDtype)
+    assert str(compact["ano"].dtype) == "Int16" and compact["ano"].isna().sum() == raw["ano"].isna().sum()
+    assert str(compact["mes"].dtype) == "Int8"
+    assert pd.api.types.is_datetime64_any_dtype(compact["fecha_vencimiento"])
+    assert compact_pqrs(compact, intern=False) is compact
+
+    report = memory_report(raw, compact)
+    assert report["total_bytes_after"] < report["total_bytes_before"]
+    assert report["columns"]["estado"]["bytes_after"] < report["columns"]["estado"]["bytes_before"]
+
+
+def test_upsert_keeps_compact_dtypes():
+    """New categories and inserted rows do not widen the compacted columns."""
+    service = DataService()
+    service.publish(service.build_snapshot(compact_pqrs(_frame())))
+
+    delta = pd.DataFrame({"numero_radicado_entrada": ["3", "9000"], "estado": ["anulado", "activo"],
+                          "ano": [2025, 2025]})
+    snapshot, summary = service.upsert_pqrs(delta)
+
+    assert summary["updated"] == 1 and summary["inserted"] == 1
+    assert isinstance(snapshot.pqrs["estado"].dtype, pd.CategoricalDtype)
+    assert str(snapshot.pqrs["ano"].dtype) == "Int16"
+    assert snapshot.pqrs["estado"].iloc[3] == "anulado"
+    assert snapshot.cube.counts_by("estado")["anulado"] == 1
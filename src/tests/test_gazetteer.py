@@ -0,0 +1,58 @@
+"""Tests for extracting filters from free-text queries."""
+
+import pandas as pd
+
+from ..agents.query_agent import query_agent
+from ..services.data_service import data_service
+from ..services.gazetteer import AhoCorasick, Gazetteer
+
+
+def _pqrs():
+    return pd.DataFrame({
+        "numero_radicado_entrada": ["1", "2", "3"],
+        "barrio_hecho": ["Laureles", "Belén Rincón", "San Javier"],
+        "comuna_hecho": ["Comuna 11 - Laureles Estadio", "Comuna 16 - Belén", "Comuna 13 - San Javier"],
+        "tipo_solicitud": ["Petición", "Queja", "Reclamo"],
+        "tema_principal": ["Alumbrado público", "Vías", None],
+        "estado": ["activo", "activo", "cerrado"],
+    })
+
+
+def test_automaton_reports_whole_word_occurrences():
+    matcher = AhoCorasick(["he", "she", "hers", "his"])
+    assert matcher.find("she said his hers") == [(0, 3, "she"), (9, 12, "his"), (13, 17, "hers")]
+
+
+def test_names_become_filters_without_case_or_accents():
+    zoning = pd.DataFrame({"name": ["El Rincón"], "commune": ["Belén"]})
+    gazetteer = Gazetteer.from_frames(_pqrs(), zoning)
+
+    filters, matches = gazetteer.extract("hueco en la calle 10 barrio LAURELES comuna 11")
+    assert filters == {"barrio_hecho": "Laureles", "comuna_hecho": "Comuna 11 - Laureles Estadio"}
+    assert [m["text"] for m in matches] == ["barrio laureles", "comuna 11"]
+
+    filters, _ = gazetteer.extract("queja de alumbrado publico en belen rincon y el rincon")
+    assert filters == {"tipo_solicitud": "Queja", "tema_principal": "Alumbrado público",
+                       "barrio_hecho": ["Belén Rincón", "El Rincón"]}
+
+    assert gazetteer.extract("comuna belén")[0] == {"comuna_hecho": "Comuna 16 - Belén"}
+
+
+def test_query_agent_searches_with_the_extracted_filters(monkeypatch):
+    """Names in the text scope the search; explicit filters for the same column win."""
+    data_service.publish(data_service.build_snapshot(_pqrs()))
+    calls = []
+
+    def hybrid_search_with_plan(query, filters=None, limit=10):
+        calls.append(filters)
+        return [], {"plan": "exact_candidates"}
+
+    monkeypatch.setattr(query_agent.rag_service, "hybrid_search_with_plan", hybrid_search_with_plan)
+
+    result = query_agent.process_query("poste caído en San Javier, petición", "semantic")
+    assert calls[-1] == {"barrio_hecho": "San Javier", "tipo_solicitud": "Petición"}
+    assert result["query_type"] == "advanced"
+    assert {m["column"] for m in result["search_metadata"]["extracted_filters"]} == {"barrio_hecho", "tipo_solicitud"}
+
+    query_agent.process_query("poste en San Javier", "advanced", filters={"barrio_hecho": "Laureles"})
+    assert calls[-1] == {"barrio_hecho": "Laureles"}
@@ -0,0 +1,52 @@
+"""Tests for the cached health snapshot and deep checks."""
+
+from fastapi.testclient import TestClient
+
+from ..api.routes import health as health_routes
+from ..config import settings
+from ..main import app
+from ..services.health_service import health_service
+
+
+def test_health_snapshot_is_reused_within_its_ttl_and_deep_checks_run_every_time(pqrs_frame, services, monkeypatch):
+    data_service, rag_service = services
+    data_service.publish(data_service.build_snapshot(pqrs_frame(5)))
+    monkeypatch.setattr(health_service, "_key", None)
+    monkeypatch.setattr(settings, "health_cache_seconds", 60)
+
+    calls = {"builds": 0, "integrity": 0}
+    build, integrity = health_routes._build_health, data_service.check_integrity
+
+    def counted(name, function):
+        def wrapper(*args, **kwargs):
+            calls[name] += 1
+            return function(*args, **kwargs)
+        return wrapper
+
+    monkeypatch.setattr(health_routes, "_build_health", counted("builds", build))
+    monkeypatch.setattr(data_service, "check_integrity", counted("integrity", integrity))
+    monkeypatch.setattr(rag_service, "check_health", lambda: {"status": "ok"})
+    client = TestClient(app)
+
+    first = client.get("/api/health/").json()
+    second = client.get("/api/health/").json()
+    assert calls["builds"] == 1
+    assert second["checked_at"] == first["checked_at"]
+    assert second.get("checks") is None
+
+    # A new data generation makes the cached snapshot stale
+    data_service.publish(data_service.build_snapshot(pqrs_frame(6)))
+    assert client.get("/api/health/").json()["generation"] == data_service.generation
+    assert calls["builds"] == 2
+
+    for expected in (1, 2):
+        deep = client.get("/api/health/", params={"deep": "true"}).json()
+        assert calls["integrity"] == expected
+        assert deep["checks"]["data_integrity"]["status"] == "ok"
+        assert set(deep["checks"]) == {"vector_store", "llm", "data_integrity"}
+    assert calls["builds"] == 4
+
+    # The TTL bounds how long a snapshot is served
+    monkeypatch.setattr(settings, "health_cache_seconds", 0)
+    client.get("/api/health/")
+    assert calls["builds"] == 5
@@ -0,0 +1,84 @@
+"""Tests for the selectivity-based hybrid search planner."""
+
+from datetime import datetime, timedelta
+
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from langchain_community.vectorstores import Chroma
+
+from ..services import rag_service as rag_module
+from ..services.search_cache import CachedEmbeddings
+
+
+def _index(services, pqrs_frame, tmp_path, monkeypatch):
+    data_service, rag_service = services
+    embeddings = CachedEmbeddings(DeterministicFakeEmbedding(size=16), maxsize=100)
+    monkeypatch.setattr(rag_service, "embeddings", embeddings)
+    data_service.publish(data_service.build_snapshot(pqrs_frame(300)))
+    store = Chroma(collection_name="planner_test", persist_directory=str(tmp_path), embedding_function=embeddings)
+    store.add_documents(rag_service._documents_for(data_service.get_pqrs_records(limit=300)))
+    data_service.attach_vectorstore(store)
+    monkeypatch.setattr(rag_service, "_initialized", True)
+    return store
+
+
+def test_selectivity_estimates_follow_the_filters(services, pqrs_frame):
+    data_service, _ = services
+    data_service.publish(data_service.build_snapshot(pqrs_frame(300)))
+    frame = data_service.snapshot.pqrs
+
+    assert data_service.estimate_pqrs_count({"estado": "activo"}) == (frame["estado"] == "activo").sum()
+    assert data_service.estimate_pqrs_count({"numero_radicado_entrada": ["1003", "1004"]}) <= 2
+    both = data_service.estimate_pqrs_count({"estado": "activo", "asunto": "hueco"})
+    assert 0 < both < data_service.estimate_pqrs_count({"estado": "activo"})
+
+
+def test_planner_scores_few_candidates_exactly_and_pushes_broad_filters_down(services, pqrs_frame, tmp_path,
+                                                                           monkeypatch):
+    """A handful of candidates are ranked exactly; broad filters run as ANN with a pushed-down where."""
+    _, rag_service = services
+    _index(services, pqrs_frame, tmp_path, monkeypatch)
+    # Price the 300-chunk index's where pass like a production-sized one
+    monkeypatch.setattr(rag_module, "ANN_WHERE_PER_CHUNK_MS", 0.05)
+
+    few = {"numero_radicado_entrada": ["1003", "1010", "1042"]}
+    results, plan = rag_service.hybrid_search_with_plan("Asunto: hueco", few, limit=2)
+    assert plan["plan"] == "exact_candidates" and plan["estimated_candidates"] == 3
+    assert len(results) == 2
+    assert {r["record"].numero_radicado_entrada for r in results} <= {"1003", "1010", "1042"}
+    assert results[0]["relevance_score"] >= results[1]["relevance_score"]
+
+    monkeypatch.setattr(rag_module, "ANN_WHERE_PER_CHUNK_MS", 0.0013)
+    broad = {"estado": "activo", "asunto": "hueco"}
+    results, plan = rag_service.hybrid_search_with_plan("Asunto: hueco", broad, limit=5)
+    assert plan["plan"] == "ann_where"
+    assert plan["pushed_down"] == ["estado"] and plan["post_filtered"] == ["asunto"]
+    assert results and all(r["record"].estado == "activo" and r["record"].asunto == "hueco" for r in results)
+
+
+def test_selective_filters_that_cannot_be_pushed_down_are_scored_exactly(services, pqrs_frame, tmp_path, monkeypatch):
+    """ANN would post-filter away almost every hit of a recent-date filter, so the exact plan runs."""
+    data_service, rag_service = services
+    _index(services, pqrs_frame, tmp_path, monkeypatch)
+    recent = {"fecha_radicacion_from": (datetime.now() - timedelta(days=4)).date().isoformat()}
+    matching = data_service.count_pqrs(recent)
+    assert 0 < matching < 30
+
+    results, plan = rag_service.hybrid_search_with_plan("Asunto: hueco", recent, limit=5)
+    assert plan["plan"] == "exact_candidates"
+    assert plan["ann_hits"] > 5 * 2
+    assert len(results) == min(5, matching)
+
+
+def test_exact_plan_falls_back_to_ann_when_the_real_candidates_are_too_many(services, pqrs_frame, tmp_path,
+                                                                          monkeypatch):
+    """The estimate assumes independent filters; the real candidate count is checked before scoring."""
+    data_service, rag_service = services
+    _index(services, pqrs_frame, tmp_path, monkeypatch)
+    monkeypatch.setattr(data_service, "estimate_pqrs_count", lambda filters=None: 3)
+    monkeypatch.setattr(rag_module, "EXACT_MAX_CANDIDATES", 50)
+    monkeypatch.setattr(rag_module, "ANN_WHERE_PER_CHUNK_MS", 0.05)
+
+    results, plan = rag_service.hybrid_search_with_plan("Asunto: hueco", {"estado": "activo"}, limit=5)
+    assert plan["plan"] == "ann_where"
+    assert plan["actual_candidates"] == data_service.count_pqrs({"estado": "activo"}) > 50
+    assert len(results) == 5 and all(r["record"].estado == "activo" for r in results)
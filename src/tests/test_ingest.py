@@ -0,0 +1,43 @@
+"""Tests for incremental PQRS upserts."""
+
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from ..services.data_service import DataService
+
+
+def test_upsert_matches_full_rebuild():
+    """Patched indexes and aggregates agree with a rebuild, and the old generation is untouched."""
+    now = datetime.now()
+    service = DataService()
+    service.publish(service.build_snapshot(pd.DataFrame({
+        "numero_radicado_entrada": [101.0, 102.0, 103.0],
+        "estado": ["activo", "activo", "cerrado"],
+        "comuna_hecho": ["Popular", "Laureles", "Popular"],
+        "asunto": ["hueco", "alumbrado", "anden"],
+        "tipo_solicitud": ["peticion", "peticion", "queja"],
+        "fecha_vencimiento": [now + timedelta(days=d) for d in (5, 10, 2)],
+    })))
+    before = service.snapshot
+
+    snapshot, summary = service.upsert_pqrs(pd.DataFrame([
+        {"numero_radicado_entrada": "102", "estado": "cerrado"},
+        {"numero_radicado_entrada": "103", "asunto": "poste caído urgente", "estado": "activo"},
+        {"numero_radicado_entrada": "104", "estado": "activo", "comuna_hecho": "Popular",
+         "asunto": "hueco", "fecha_vencimiento": (now - timedelta(days=1)).isoformat()},
+    ]))
+    service.publish(snapshot)
+
+    assert (summary["inserted"], summary["updated"]) == (1, 2)
+    assert service.get_pqrs_by_radicado("102").estado == "cerrado"
+    assert service.get_pqrs_by_radicado("102").comuna_hecho == "Laureles"  # not in the delta, kept
+    assert service.count_pqrs({"overdue": True}) == 1
+
+    rebuilt = service.build_snapshot(snapshot.pqrs.drop(columns=["urgency_score", "priority"]))
+    assert snapshot.cube.counts_by("estado") == rebuilt.cube.counts_by("estado")
+    assert snapshot.urgency_queue.top(10) == rebuilt.urgency_queue.top(10)
+    assert service.check_integrity()["issues"] == []
+
+    assert before.cube.counts_by("estado") == {"activo": 2, "cerrado": 1}
+    assert len(before.pqrs) == 3
@@ -0,0 +1,179 @@
+"""Tests for the background job service."""
+
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+from ..services.job_service import JobService, TERMINAL_STATUSES
+
+
+def wait_for(service, task_id, timeout=5.0):
+    """Poll a job until it reaches a terminal status."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = service.get_job(task_id, include_result=True)
+        if job["status"] in TERMINAL_STATUSES:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {task_id} did not finish")
+
+
+def test_job_completes_with_result(tmp_path):
+    """Submitted jobs run in the background and store their result."""
+    service = JobService(db_path=str(tmp_path / "jobs.db"), workers=1)
+    service.register_handler("echo", lambda params, ctx: {"echo": params["value"]})
+    service.start()
+
+    try:
+        job = service.submit("echo", {"value": 42})
+        assert job["status"] == "queued"
+
+        finished = wait_for(service, job["task_id"])
+        assert finished["status"] == "completed"
+        assert finished["result"] == {"echo": 42}
+    finally:
+        service.stop()
+
+
+def test_jobs_run_in_priority_order(tmp_path):
+    """Lower priority values run first."""
+    service = JobService(db_path=str(tmp_path / "jobs.db"), workers=1)
+    order = []
+    service.register_handler("record", lambda params, ctx: order.append(params["name"]) or {})
+
+    low = service.submit("record", {"name": "low"}, priority=9)
+    high = service.submit("record", {"name": "high"}, priority=0)
+    service.start()
+
+    try:
+        wait_for(service, low["task_id"])
+        wait_for(service, high["task_id"])
+        assert order == ["high", "low"]
+    finally:
+        service.stop()
+
+
+def test_running_job_can_be_cancelled(tmp_path):
+    """A running job stops at its next progress report after cancellation."""
+    service = JobService(db_path=str(tmp_path / "jobs.db"), workers=1)
+    started = threading.Event()
+
+    def slow(params, ctx):
+        started.set()
+        for i in range(500):
+            time.sleep(0.01)
+            ctx.report_progress(i, 500)
+        return {}
+
+    service.register_handler("slow", slow)
+    service.start()
+
+    try:
+        job = service.submit("slow")
+        assert started.wait(5)
+        service.cancel(job["task_id"])
+        assert wait_for(service, job["task_id"])["status"] == "cancelled"
+    finally:
+        service.stop()
+
+
+def test_cancellation_reaches_jobs_of_other_processes(tmp_path):
+    """A cancel handled by another service sharing the database stops the running job."""
+    db_path = str(tmp_path / "jobs.db")
+    started = threading.Event()
+
+    def slow(params, ctx):
+        started.set()
+        for i in range(500):
+            time.sleep(0.01)
+            ctx.report_progress(i, 500)
+        return {}
+
+    worker, api = JobService(db_path=db_path, workers=1), JobService(db_path=db_path, workers=1)
+    for service in (worker, api):
+        service.register_handler("slow", slow)
+    worker.start()
+
+    try:
+        running = worker.submit("slow")
+        assert started.wait(5)
+        assert api.cancel(running["task_id"])["status"] == "running"
+        assert wait_for(worker, running["task_id"])["status"] == "cancelled"
+
+        # A queued job is cancelled only if no worker claimed it first
+        queued = api.submit("slow")
+        assert api.cancel(queued["task_id"])["status"] == "cancelled"
+        assert not worker._claim(queued["task_id"])
+    finally:
+        worker.stop()
+
+
+def test_pending_jobs_survive_restart(tmp_path):
+    """Queued jobs are persisted and run after the service restarts."""
+    db_path = str(tmp_path / "jobs.db")
+    first = JobService(db_path=db_path, workers=1)
+    first.register_handler("echo", lambda params, ctx: {"ok": True})
+    job = first.submit("echo")
+
+    second = JobService(db_path=db_path, workers=1)
+    second.register_handler("echo", lambda params, ctx: {"ok": True})
+    second.start()
+
+    try:
+        assert wait_for(second, job["task_id"])["result"] == {"ok": True}
+    finally:
+        second.stop()
+
+
+def test_shared_database_runs_each_job_once(tmp_path):
+    """Workers sharing the job database claim each queued job atomically."""
+    db_path = str(tmp_path / "jobs.db")
+    runs = []
+    lock = threading.Lock()
+
+    def record(params, ctx):
+        with lock:
+            runs.append(params["n"])
+        return {}
+
+    services = [JobService(db_path=db_path, workers=2) for _ in range(2)]
+    for service in services:
+        service.register_handler("record", record)
+    jobs = [services[0].submit("record", {"n": n}) for n in range(20)]
+    for service in services:
+        service.start()
+
+    try:
+        for job in jobs:
+            wait_for(services[0], job["task_id"])
+        assert sorted(runs) == list(range(20))
+    finally:
+        for service in services:
+            service.stop()
+
+
+def test_startup_requeues_only_orphaned_jobs(tmp_path):
+    """Running jobs of a live worker are left alone; those of a dead process run again."""
+    db_path = str(tmp_path / "jobs.db")
+    first = JobService(db_path=db_path, workers=1)
+    first.register_handler("echo", lambda params, ctx: {"ok": True})
+    live, orphan = first.submit("echo"), first.submit("echo")
+
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    host = socket.gethostname()
+    first._update(live["task_id"], status="running", owner=f"{host}:{os.getppid()}")
+    first._update(orphan["task_id"], status="running", owner=f"{host}:{dead.pid}")
+
+    second = JobService(db_path=db_path, workers=1)
+    second.register_handler("echo", lambda params, ctx: {"ok": True})
+    second.start()
+
+    try:
+        assert wait_for(second, orphan["task_id"])["status"] == "completed"
+        assert second.get_job(live["task_id"])["status"] == "running"
+    finally:
+        second.stop()
@@ -0,0 +1,94 @@
+"""Tests for the assignment ledger."""
+
+import threading
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from ..services import assignment_service as module
+from ..services.assignment_ledger import AssignmentLedger
+
+
+BASE = datetime(2025, 3, 3, 8, 0)
+
+
+def hours(n):
+    return BASE + timedelta(hours=n)
+
+
+def test_booking_blocks_overlapping_windows(tmp_path):
+    """A booked interval makes overlapping windows unavailable but not adjacent ones."""
+    ledger = AssignmentLedger(db_path=str(tmp_path / "ledger.db"))
+    assert ledger.book("P1", [("personnel", "E1")], hours(0), hours(2)) == []
+
+    assert not ledger.is_available("personnel", "E1", hours(1), hours(3))
+    assert ledger.is_available("personnel", "E1", hours(2), hours(3))
+    assert ledger.is_available("personnel", "E2", hours(0), hours(2))
+
+    conflicts = ledger.book("P2", [("personnel", "E1")], hours(1), hours(2))
+    assert [c["pqrs_id"] for c in conflicts] == ["P1"]
+
+
+def test_earliest_common_slot_and_workload(tmp_path):
+    """The earliest common slot skips every resource's bookings."""
+    ledger = AssignmentLedger(db_path=str(tmp_path / "ledger.db"))
+    ledger.book("P1", [("personnel", "E1")], hours(0), hours(2))
+    ledger.book("P2", [("vehicle", "ABC123")], hours(2), hours(3))
+
+    slot = ledger.earliest_common_slot([("personnel", "E1"), ("vehicle", "ABC123")], hours(0), 1)
+    assert slot == hours(3)
+    assert ledger.get_workload_hours("personnel", "E1", hours(0), hours(24)) == 2.0
+
+
+def test_bookings_persist_and_release(tmp_path):
+    """Bookings are reloaded from disk and can be released per PQRS."""
+    db_path = str(tmp_path / "ledger.db")
+    AssignmentLedger(db_path=db_path).book("P1", [("personnel", "E1"), ("vehicle", "V1")], hours(0), hours(4))
+
+    reloaded = AssignmentLedger(db_path=db_path)
+    assert not reloaded.is_available("vehicle", "V1", hours(1), hours(2))
+
+    assert reloaded.release("P1") == 2
+    assert reloaded.is_available("vehicle", "V1", hours(1), hours(2))
+
+
+def test_concurrent_earliest_bookings_never_overlap(tmp_path):
+    """Finding and booking the earliest slot is atomic, so racing bookings get consecutive slots."""
+    ledger = AssignmentLedger(db_path=str(tmp_path / "ledger.db"))
+    resources = [("personnel", "E1"), ("vehicle", "V1")]
+    barrier = threading.Barrier(8)
+    booked = {}
+
+    def book(n):
+        barrier.wait()
+        booked[n] = ledger.book_earliest(f"P{n}", resources, hours(0), 1)
+
+    threads = [threading.Thread(target=book, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(b["start"] for b in booked.values()) == [hours(n) for n in range(8)]
+    assert ledger.get_workload_hours("vehicle", "V1", hours(0), hours(24)) == 8.0
+    # Releasing one PQRS reopens exactly its slot
+    assert ledger.release("P3") == 2
+    assert ledger.earliest_common_slot(resources, hours(0), 1) == booked[3]["start"]
+
+
+def test_assignment_keeps_only_known_free_candidates(tmp_path, monkeypatch):
+    """Unknown or busy IDs from the model are replaced by the best-ranked free candidates."""
+    ledger = AssignmentLedger(db_path=str(tmp_path / "ledger.db"))
+    monkeypatch.setattr(module, "assignment_ledger", ledger)
+    ledger.book("OTHER", [("personnel", "E1")], datetime.now(), datetime.now() + timedelta(hours=8))
+
+    personnel = [SimpleNamespace(employee_id=e) for e in ("E1", "E2", "E3")]
+    vehicles = [SimpleNamespace(license_plate="V1")]
+    assignment = {"pqrs_id": "P1", "assigned_personnel": ["E1", "GHOST"], "assigned_vehicles": ["V9"],
+                  "estimated_duration_hours": 2}
+    module.assignment_service._book_assignment(assignment, personnel, vehicles)
+
+    assert assignment["assigned_personnel"] == ["E2", "E3"]
+    assert assignment["assigned_vehicles"] == ["V1"]
+    assert {(r["resource_id"], r["reason"]) for r in assignment["rejected_resources"]} == {
+        ("E1", "busy"), ("GHOST", "unknown"), ("V9", "unknown")}
+    assert assignment["conflicts"] == []
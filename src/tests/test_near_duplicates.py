@@ -0,0 +1,68 @@
+"""Tests for near-duplicate PQRS clusters."""
+
+import pandas as pd
+
+from ..agents.query_agent import query_agent
+from ..services.assignment_service import assignment_service
+from ..services.data_service import DataService, data_service
+from ..services.near_duplicates import DuplicateIndex, duplicate_text
+
+
+def _pqrs():
+    return pd.DataFrame({
+        "numero_radicado_entrada": ["1", "2", "3", "4", "5"],
+        "estado": ["activo", "activo", "activo", "activo", "cerrado"],
+        "asunto": ["Hueco en la vía", "hueco en la via principal", "Poste de alumbrado caído",
+                   "Hueco en la vía", "Hueco en la vía"],
+        "direccion_hecho": ["Calle 10 # 43-21", "CL 10 No. 43-21", "Carrera 70 # 1-5",
+                            "Calle 10 # 43-21", "Calle 10 # 43-21"],
+        "comuna_hecho": ["Laureles", "Laureles", "Laureles", "Popular", "Laureles"],
+    })
+
+
+def test_near_duplicates_cluster_within_a_commune():
+    texts = [duplicate_text(a, d) for a, d in zip(_pqrs()["asunto"], _pqrs()["direccion_hecho"])]
+    assert texts[0] == "hueco en la via cl 10 43 21"
+
+    index = DuplicateIndex(["1", "2", "3", "4"], texts[:4], ["Laureles", "Laureles", "Laureles", "Popular"], 0.5)
+    assert index.cluster_of("1") == index.cluster_of("2") == "1"
+    assert index.cluster_of("3") is None and index.cluster_of("4") is None
+
+    changed = index.with_changes(removed=["1"], added=[("9", texts[0], "LAURELES")])
+    assert changed.members("2") == ["2", "9"]
+    assert index.members("1") == ["1", "2"]  # the original generation is untouched
+
+
+def test_clusters_follow_ingestion_and_reach_query_and_assignment(monkeypatch):
+    service = DataService()
+    service.publish(service.build_snapshot(_pqrs()))
+    assert service.get_duplicate_cluster("2") == ("1", ["1", "2"])
+    assert service.get_duplicate_cluster("5") == (None, [])  # closed PQRS are not clustered
+
+    snapshot, _ = service.upsert_pqrs(pd.DataFrame({
+        "numero_radicado_entrada": ["6", "2"],
+        "estado": ["activo", "cerrado"],
+        "asunto": ["HUECO en la vía", None],
+        "direccion_hecho": ["calle 10 #43-21", None],
+        "comuna_hecho": ["Laureles", None],
+    }))
+    service.publish(snapshot)
+    assert service.get_duplicate_cluster("6") == ("1", ["1", "6"])
+
+    data_service.publish(data_service.build_snapshot(_pqrs()))
+    result = query_agent.process_query("", "filter", {"estado": "activo"}, collapse_duplicates=True)
+    assert [r.numero_radicado_entrada for r in result["results"]] == ["1", "3", "4"]
+    assert result["results"][0].cluster_size == 2
+    assert result["search_metadata"]["collapsed_duplicates"] == 1
+
+    assigned = []
+
+    def assign(pqrs):
+        assigned.append(pqrs.numero_radicado_entrada)
+        return {"pqrs_id": pqrs.numero_radicado_entrada, "assigned_personnel": ["P1"], "assigned_vehicles": []}
+
+    monkeypatch.setattr(assignment_service, "_assign_single_pqrs", assign)
+    result = assignment_service.assign_pqrs_resources(["1", "2"])
+    assert assigned == ["1"]
+    assert result["assignments"][0]["covers_pqrs"] == ["2"]
+    assert result["assignments"][1]["covered_by"] == "1"
@@ -0,0 +1,102 @@
+"""Tests for the year/month partitioned PQRS store and the out-of-core load."""
+
+import pandas as pd
+
+from ..config import settings
+from ..services.data_service import DataService
+from ..services.partitioned_store import PartitionedBackend
+from ..services.storage import PandasBackend
+
+
+def test_partitioned_backend_matches_pandas_and_prunes(pqrs_frame, tmp_path):
+    """Merged partition reads give the in-memory answers; key filters only open matching partitions."""
+    snapshot = DataService().build_snapshot(pqrs_frame())
+    memory, partitioned = PandasBackend(), PartitionedBackend(str(tmp_path / "partitions"))
+    partitioned.publish(snapshot)
+
+    cases = [
+        ({}, None, None),
+        ({"estado": ["activo", "en_tramite"], "comuna_hecho": "Belén"}, 5, "-urgency_score"),
+        ({"numero_radicado_entrada": ["1003", 1010.0, "9999"]}, None, None),
+        ({"overdue": True, "estado": "activo"}, 20, "fecha_vencimiento"),
+        ({"ano": 2024, "mes": [3, 4]}, None, "-fecha_radicacion"),
+    ]
+    for filters, limit, order_by in cases:
+        expected = memory.select(snapshot, dict(filters), limit, order_by)
+        got = partitioned.select(snapshot, dict(filters), limit, order_by)
+        assert got["numero_radicado_entrada"].tolist() == \
+            expected["numero_radicado_entrada"].map(lambda v: str(int(v))).tolist(), filters
+        assert partitioned.count(snapshot, dict(filters)) == memory.count(snapshot, dict(filters))
+
+    key = lambda groups: sorted(groups, key=repr)
+    assert key(partitioned.aggregate(snapshot, ["comuna_hecho", "ano"], {"estado": "activo"})) == \
+        key(memory.aggregate(snapshot, ["comuna_hecho", "ano"], {"estado": "activo"}))
+
+    partitioned.count(snapshot, {"ano": 2024, "mes": [3, 4]})
+    assert partitioned.status()["last_scan"] == {"partitions_read": 2, "partitions_total": 24}
+    streamed = pd.concat(partitioned.iter_select(snapshot, {"comuna_hecho": "Popular"}, chunk_rows=7))
+    assert len(streamed) == memory.count(snapshot, {"comuna_hecho": "Popular"})
+
+
+def test_out_of_core_load_keeps_only_active_rows_in_memory(pqrs_frame, tmp_path):
+    """The archive is streamed to disk; archived rows are read back when a delta updates them."""
+    archive = tmp_path / "archive"
+    archive.mkdir()
+    frame = pqrs_frame(200)
+    frame.iloc[:120].to_csv(archive / "2024.csv", index=False)
+    frame.iloc[120:].to_json(archive / "2025.ndjson", orient="records", lines=True, date_format="iso")
+
+    previous = settings.pqrs_archive_dir, settings.load_chunk_rows
+    settings.pqrs_archive_dir, settings.load_chunk_rows = str(archive), 50
+    try:
+        service = DataService()
+        service.data_dir = tmp_path
+        service.storage = PartitionedBackend(str(tmp_path / "partitions"))
+        snapshot, stats = service.load_snapshot()
+    finally:
+        settings.pqrs_archive_dir, settings.load_chunk_rows = previous
+    service.publish(snapshot)
+
+    active = int((frame["estado"] == "activo").sum())
+    assert stats["pqrs_records"] == 200
+    assert len(snapshot.pqrs) == active
+    assert service.count_pqrs() == 200
+    assert service.get_data_statistics()["pqrs_in_memory"] == active
+    assert service.check_integrity()["issues"] == []
+
+    closed = frame.loc[frame["estado"] == "cerrado", "numero_radicado_entrada"].iloc[0]
+    before = service.snapshot
+    # A long stream of the loaded generation, started before any upsert
+    stream = service.iter_pqrs_records(chunk_rows=20)
+    streamed = list(next(stream))
+
+    snapshot, summary = service.upsert_pqrs(pd.DataFrame([{"numero_radicado_entrada": closed, "estado": "activo"}]))
+    service.publish(snapshot, changed_radicados=summary["radicados"])
+
+    assert summary["updated"] == 1
+    assert service.count_pqrs() == 200
+    assert service.count_pqrs({"estado": "activo"}) == active + 1
+    assert service.snapshot.cube.total({"estado": "activo"}) == active + 1
+    assert service.check_integrity()["issues"] == []
+
+    # The upsert went to a new version; only the partition holding the changed row was rewritten
+    assert snapshot.partitions != before.partitions
+    old, new = tmp_path / "partitions" / before.partitions, tmp_path / "partitions" / snapshot.partitions
+    rewritten = [path.relative_to(new) for path in new.rglob("*.db") if
+                 path.stat().st_ino != (old / path.relative_to(new)).stat().st_ino]
+    assert len(rewritten) == 1
+
+    # However many versions are published meanwhile, the stream reads its own to the end
+    for n in range(3):
+        later, summary = service.upsert_pqrs(pd.DataFrame([{"numero_radicado_entrada": str(9000 + n),
+                                                            "estado": "activo"}]))
+        service.publish(later, changed_radicados=summary["radicados"])
+    for batch in stream:
+        streamed += batch
+    assert len(streamed) == 200
+    assert next(r for r in streamed if r.numero_radicado_entrada == str(int(closed))).estado == "cerrado"
+
+    # Once nothing reads them, the old versions are deleted
+    assert not old.exists()
+    assert [path.name for path in (tmp_path / "partitions").iterdir() if path.is_dir()] == \
+        [service.snapshot.partitions]
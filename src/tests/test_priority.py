@@ -0,0 +1,81 @@
+"""Tests for the priority engine."""
+
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from ..config import settings
+from ..services.data_service import DataService
+from ..services.priority_engine import UrgencyQueue, score_frame
+
+
+NOW = datetime(2025, 3, 3, 8, 0)
+
+
+def test_score_frame_keeps_priority_rules():
+    """Keywords, critical types and long elapsed times make a PQRS high priority."""
+    df = pd.DataFrame({
+        "asunto": ["Poste caído URGENTE", "alumbrado", "alumbrado", "alumbrado"],
+        "tipo_solicitud": ["peticion", "Queja", "peticion", "peticion"],
+        "dias_transcurridos": [1, 1, 45, 1],
+        "fecha_vencimiento": [NOW + timedelta(days=10)] * 3 + [NOW - timedelta(days=5)],
+    })
+
+    scored = score_frame(df, now=NOW)
+
+    assert scored["priority"].tolist() == ["high", "high", "high", "medium"]
+    # Past its due date, a plain petition outranks an older one still within its SLA
+    assert scored["urgency_score"].iloc[3] > scored["urgency_score"].iloc[2]
+
+
+def test_type_weights_ignore_accents_and_case():
+    """Request types from the workbooks carry accents and capitals; they weigh like the bare keys."""
+    df = pd.DataFrame({"asunto": "alumbrado", "tipo_solicitud": ["Petición", "peticion", " PETICIÓN ", "Sugerencia"],
+                       "dias_transcurridos": 1, "fecha_vencimiento": NOW + timedelta(days=30)})
+
+    scores = score_frame(df, now=NOW)["urgency_score"].tolist()
+
+    assert scores[0] == scores[1] == scores[2] == 10.0
+    assert scores[3] == 5.0
+
+
+def test_urgency_queue_top_per_zone():
+    """The queue returns the most urgent radicados per zone in score order."""
+    queue = UrgencyQueue(
+        ["A", "B", "C", "D", "E"],
+        [10.0, 50.0, 30.0, 40.0, 20.0],
+        ["Popular", "Popular", "Laureles", "Popular", "Laureles"],
+    )
+
+    assert [r for r, _ in queue.top(2, zone="popular")] == ["B", "D"]
+    assert [r for r, _ in queue.top(3)] == ["B", "D", "C"]
+    assert [r for r, _ in queue.top(2, zone="Popular", exclude={"B"})] == ["D", "A"]
+    assert queue.top(5, zone="Belén") == []
+
+
+def test_urgency_is_rescored_against_the_current_date(monkeypatch):
+    """Scores follow the date: SLA and elapsed days are recomputed when the queue is read."""
+    today = datetime.now()
+    service = DataService()
+    service.publish(service.build_snapshot(pd.DataFrame({
+        "numero_radicado_entrada": ["A", "B", "C"],
+        "estado": "activo",
+        "tipo_solicitud": ["queja", "peticion", "sugerencia"],
+        "dias_transcurridos": [1, 1, 1],
+        "fecha_radicacion": [today, today, today - timedelta(days=25)],
+        "fecha_vencimiento": [today + timedelta(days=60), today + timedelta(days=20), today + timedelta(days=60)],
+    })))
+    assert [r.numero_radicado_entrada for r in service.get_most_urgent(n=2)] == ["A", "B"]
+    assert service.get_pqrs_by_radicado("C").priority == "medium"
+
+    # Two weeks on, B is close to its due date and C has been open more than 30 days
+    later = service.refresh_urgency(now=today + timedelta(days=15))
+    assert [r.numero_radicado_entrada for r in service.get_most_urgent(n=2)] == ["B", "A"]
+    assert service.get_pqrs_by_radicado("C").priority == "high"
+    assert service.generation == later.generation
+
+    monkeypatch.setattr(settings, "urgency_refresh_seconds", 0)
+    service.publish(service.build_snapshot(service.snapshot.pqrs))
+    generation = service.generation
+    service.get_most_urgent()
+    assert service.generation == generation + 1
@@ -0,0 +1,41 @@
+"""Route tests for the NDJSON PQRS export stream."""
+
+import json
+
+from fastapi.testclient import TestClient
+
+from ..main import app
+
+
+def _frames(response):
+    return [json.loads(line) for line in response.iter_lines() if line]
+
+
+def test_stream_sends_limited_record_batches_then_a_summary(services, pqrs_frame):
+    data_service, _ = services
+    data_service.publish(data_service.build_snapshot(pqrs_frame(25)))
+
+    response = TestClient(app).post("/api/query/pqrs/stream", json={"limit": 12, "batch_size": 5})
+    frames = _frames(response)
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert [f["type"] for f in frames] == ["records", "records", "records", "summary"]
+    assert [len(f["records"]) for f in frames[:-1]] == [5, 5, 2]
+    assert frames[-1]["total_streamed"] == 12
+    radicados = [r["numero_radicado_entrada"] for f in frames[:-1] for r in f["records"]]
+    assert len(set(radicados)) == 12
+
+
+def test_stream_ends_with_an_error_frame_when_reading_fails(services, pqrs_frame, monkeypatch):
+    data_service, _ = services
+    data_service.publish(data_service.build_snapshot(pqrs_frame(10)))
+
+    def failing(filters=None, chunk_rows=1000):
+        yield data_service.get_pqrs_records(limit=3)
+        raise RuntimeError("storage unavailable")
+
+    monkeypatch.setattr(data_service, "iter_pqrs_records", failing)
+    frames = _frames(TestClient(app).post("/api/query/pqrs/stream", json={"batch_size": 3}))
+
+    assert [f["type"] for f in frames] == ["records", "error"]
+    assert frames[-1]["error"] == "storage unavailable"
@@ -0,0 +1,69 @@
+"""Tests for the per-zone resource buckets and availability counters."""
+
+import pandas as pd
+
+from ..services.data_service import DataService
+from ..services.geo import normalize_name
+
+
+def _personnel(statuses):
+    return pd.DataFrame({
+        "employee_id": [f"E{i}" for i in range(len(statuses))],
+        "first_name": "Ana", "last_name": "Gómez", "role": "técnico",
+        "zone": ["Laureles" if i % 2 else "Belén" for i in range(len(statuses))],
+        "status": statuses,
+    })
+
+
+def _transport():
+    return pd.DataFrame({"license_plate": ["ABC123", "DEF456"], "vehicle_type": ["moto", "camioneta"],
+                         "zone": ["Belén", "Laureles"], "status": ["available", "maintenance"]})
+
+
+def _pqrs(estado):
+    return pd.DataFrame({"numero_radicado_entrada": ["1", "2"], "estado": estado, "comuna_hecho": "Belén"})
+
+
+def _assert_consistent(service, personnel, transport):
+    """Buckets and counters agree with a recount of the frames and the live statuses."""
+    for zone in set(personnel["zone"]) | set(transport["zone"]):
+        people = service.get_personnel_by_zone(zone)
+        vehicles = service.get_vehicles_by_zone(zone)
+        assert sorted(p.employee_id for p in people) == sorted(personnel[personnel["zone"] == zone]["employee_id"])
+        assert sorted(v.license_plate for v in vehicles) == \
+            sorted(transport[transport["zone"] == zone]["license_plate"])
+        assert all(service.get_personnel_by_id(p.employee_id) is p for p in people)
+        assert service.get_zone_availability(normalize_name(zone).upper()) == {
+            "personnel": sum(p.status == "available" for p in people),
+            "vehicles": sum(v.status == "available" for v in vehicles),
+        }
+
+
+def test_buckets_follow_status_changes_pqrs_upserts_and_resource_replacement():
+    service = DataService()
+    personnel, transport = _personnel(["available"] * 4), _transport()
+    service.publish(service.build_snapshot(_pqrs("activo"), personnel, transport))
+    _assert_consistent(service, personnel, transport)
+    assert service.get_zone_availability("Belén") == {"personnel": 2, "vehicles": 1}
+
+    service.set_personnel_status("E0", "busy")
+    service.set_vehicle_status("DEF456", "available")
+    assert service.get_zone_availability("Belén")["personnel"] == 1
+    assert service.get_zone_availability("Laureles")["vehicles"] == 1
+
+    # A PQRS-only generation keeps the live resource statuses
+    snapshot, _ = service.upsert_pqrs(pd.DataFrame({"numero_radicado_entrada": ["2", "3"],
+                                                    "estado": ["cerrado", "activo"]}))
+    service.publish(snapshot)
+    assert service.get_personnel_by_id("E0").status == "busy"
+    assert service.get_zone_availability("Belén")["personnel"] == 1
+    _assert_consistent(service, personnel, transport)
+
+    # Replacing the personnel rebuilds buckets and counters from the new frame
+    personnel = pd.concat([_personnel(["available", "busy", "available"]),
+                           _personnel(["available"]).assign(employee_id="E9", zone="Robledo")])
+    service.publish(service.replace_dataset("personnel", personnel))
+    _assert_consistent(service, personnel, transport)
+    assert service.get_zone_availability("Robledo") == {"personnel": 1, "vehicles": 0}
+    assert service.get_zone_availability("Laureles") == {"personnel": 0, "vehicles": 1}
+    assert service.get_personnel_by_id("E3") is None
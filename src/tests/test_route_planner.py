@@ -0,0 +1,55 @@
+"""Tests for the crew route planner."""
+
+import numpy as np
+
+from ..services.geo import haversine_matrix
+from ..services.route_planner import nearest_neighbor_path, path_length, route_planner, two_opt
+
+DEPOT = (6.2442, -75.5812)
+
+
+def _stops(n, seed=0, service_hours=0.5):
+    rng = np.random.default_rng(seed)
+    lats = DEPOT[0] + rng.uniform(-0.05, 0.05, n)
+    lons = DEPOT[1] + rng.uniform(-0.05, 0.05, n)
+    return [{"pqrs_id": f"R{i}", "location": (lat, lon), "service_hours": service_hours}
+            for i, (lat, lon) in enumerate(zip(lats, lons))]
+
+
+def test_two_opt_is_never_longer_than_nearest_neighbor_order():
+    for seed in range(20):
+        coords = np.array([DEPOT] + [s["location"] for s in _stops(30, seed)])
+        dist = haversine_matrix(coords[:, 0], coords[:, 1])
+        greedy = nearest_neighbor_path(dist, 0)
+        improved = two_opt(dist, greedy)
+
+        assert improved[0] == 0
+        assert sorted(improved) == list(range(len(coords)))
+        assert path_length(dist, improved) <= path_length(dist, greedy) + 1e-9
+
+
+def test_stops_past_the_shift_limit_are_deferred_and_not_counted():
+    stops = _stops(12, service_hours=1.0)
+    route = route_planner.plan_route(DEPOT, stops, shift_hours=4.0, vehicle_type="moto")
+
+    assert 0 < len(route["stops"]) < 4
+    assert sorted(route["stops"] + route["deferred"]) == sorted(s["pqrs_id"] for s in stops)
+    assert not route["fits_shift"]
+    assert route["travel_hours"] + route["service_hours"] <= 4.0
+
+    # Distances cover the served stops only, driven in the planned and the given order
+    by_id = {s["pqrs_id"]: s for s in stops}
+    served = [DEPOT] + [by_id[p]["location"] for p in route["stops"]]
+    given = [DEPOT] + [s["location"] for s in stops if s["pqrs_id"] in route["stops"]]
+    for points, key in ((served, "distance_km"), (given, "baseline_distance_km")):
+        coords = np.array(points)
+        dist = haversine_matrix(coords[:, 0], coords[:, 1])
+        assert route[key] == round(path_length(dist, np.arange(len(points))), 3)
+    assert route["distance_km"] <= route["travel_hours"] * route["speed_kmh"] + 1e-3
+
+
+def test_hundreds_of_stops_plan_in_under_a_second():
+    route = route_planner.plan_route(DEPOT, _stops(400, service_hours=0.01), shift_hours=24.0)
+    assert len(route["stops"]) + len(route["deferred"]) == 400
+    assert route["distance_km"] <= route["baseline_distance_km"]
+    assert route["planning_seconds"] < 1.0
@@ -0,0 +1,97 @@
+"""Tests for the multi-day schedule engine."""
+
+import random
+from datetime import datetime, time, timedelta
+
+from ..services.schedule_engine import CrewShift, ScheduleEngine, ScheduleTask
+
+
+START = datetime(2025, 3, 3, 7, 0)
+
+
+def _tasks(n, seed=3, due_hours=(4, 200)):
+    rng = random.Random(seed)
+    return [
+        ScheduleTask(f"R{i}", rng.choice(["high", "medium", "low"]),
+                     START + timedelta(hours=rng.randint(*due_hours)), rng.choice([1.0, 2.0, 3.0]))
+        for i in range(n)
+    ]
+
+
+def _crews(n):
+    return [CrewShift(f"E{i}", time(7 + i % 3), time(15 + i % 3)) for i in range(n)]
+
+
+def _visits(plan):
+    return {pqrs_id: (v.employee_id, v.start, v.end) for pqrs_id, v in plan.visits.items()}
+
+
+def _max_load(plan):
+    return max(plan.to_dict()["workload_distribution"].values())
+
+
+def test_no_crew_is_double_booked_or_outside_its_shift():
+    crews = _crews(4)
+    bookings = [{"resource_id": "E0", "pqrs_id": "OLD", "hours": 4.0,
+                 "start": datetime(2025, 3, 3, 8).isoformat(), "end": datetime(2025, 3, 3, 12).isoformat()}]
+    plan = ScheduleEngine().build_plan("Z", _tasks(150), crews, START, 7, bookings)
+
+    assert len(plan.visits) + len(plan.unscheduled) == 150
+    for crew in crews:
+        intervals = sorted((v.start, v.end) for v in plan.visits.values() if v.employee_id == crew.employee_id)
+        if crew.employee_id == "E0":
+            intervals = sorted(intervals + [(datetime(2025, 3, 3, 8), datetime(2025, 3, 3, 12))])
+        for (_, end), (start, _) in zip(intervals, intervals[1:]):
+            assert end <= start
+        for start, end in intervals:
+            assert start.date() == end.date()
+            assert crew.shift_start <= start.time() and end.time() <= crew.shift_end
+
+
+def test_swap_and_rebalance_passes_never_make_the_plan_worse():
+    # Greedy fills the first day with far-due high-priority visits, leaving the urgent low ones late
+    tasks = [ScheduleTask(f"H{i}", "high", START + timedelta(days=6), 1.0) for i in range(16)]
+    tasks += [ScheduleTask(f"L{i}", "low", START + timedelta(hours=3), 1.0) for i in range(4)]
+    tasks += _tasks(30)
+    engine = ScheduleEngine(max_improvement_rounds=0)
+    plan = engine.build_plan("Z", tasks, _crews(2), START, 7)
+    late = [pqrs_id for pqrs_id, v in plan.visits.items() if v.lateness_hours > 0]
+    assert late
+
+    lateness, load = plan.total_lateness(), _max_load(plan)
+    assert engine._swap_pass(plan, late) > 0
+    assert plan.total_lateness() < lateness
+    assert _max_load(plan) == load
+
+    lateness, scheduled = plan.total_lateness(), set(plan.visits)
+    engine._rebalance_pass(plan)
+    assert plan.total_lateness() <= lateness
+    assert _max_load(plan) <= load
+    assert set(plan.visits) == scheduled
+
+
+def test_adding_a_task_matches_a_full_rebuild():
+    base = _tasks(40)
+    new = ScheduleTask("NEW", "low", START + timedelta(days=14), 2.0)
+
+    # Without local search the incremental insert is exactly what the rebuild produces
+    greedy = ScheduleEngine(max_improvement_rounds=0)
+    plan = greedy.build_plan("Z", base, _crews(3), START, 7)
+    greedy.add_task(plan, new)
+    assert _visits(plan) == _visits(greedy.build_plan("Z", base + [new], _crews(3), START, 7))
+
+    # With it, rebalancing ties may pick another crew but the plan is as good
+    engine = ScheduleEngine()
+    plan = engine.build_plan("Z", base, _crews(3), START, 7)
+    engine.add_task(plan, new)
+    rebuilt = engine.build_plan("Z", base + [new], _crews(3), START, 7)
+    assert set(plan.visits) == set(rebuilt.visits)
+    assert plan.total_lateness() <= rebuilt.total_lateness()
+    assert sorted(plan.to_dict()["workload_distribution"].values()) == \
+        sorted(rebuilt.to_dict()["workload_distribution"].values())
+
+
+def test_a_commune_week_plans_in_under_a_second():
+    plan = ScheduleEngine().build_plan("Z", _tasks(700), _crews(25), START, 7)
+    assert len(plan.visits) > 600
+    assert plan.planning_seconds < 1.0
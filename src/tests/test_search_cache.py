@@ -0,0 +1,69 @@
+"""Tests for the query-embedding and search-result caches."""
+
+import time
+
+from langchain.docstore.document import Document
+from langchain_community.embeddings import DeterministicFakeEmbedding
+
+from ..services.search_cache import MISSING, CachedEmbeddings, LRUCache
+
+
+class _CountingEmbeddings(DeterministicFakeEmbedding):
+    calls: int = 0
+
+    def embed_query(self, text):
+        self.calls += 1
+        return super().embed_query(text)
+
+
+class _Store:
+    """Vector store double that counts searches and always returns radicado 1001."""
+
+    def __init__(self):
+        self.searches = 0
+
+    def similarity_search(self, query, k=4):
+        self.searches += 1
+        return [Document(page_content="Asunto: hueco", metadata={"radicado": "1001"})]
+
+
+def test_lru_cache_evicts_and_expires():
+    cache = LRUCache(maxsize=2, ttl_seconds=0.05)
+    cache.put("a", [1.0])
+    cache.put("b", [2.0])
+    assert cache.get("a") == [1.0]
+    cache.put("c", [3.0])
+    assert cache.get("b") is MISSING
+    time.sleep(0.06)
+    assert cache.get("a") is MISSING
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+
+def test_query_embeddings_are_computed_once():
+    inner = _CountingEmbeddings(size=8)
+    embeddings = CachedEmbeddings(inner, maxsize=10)
+    assert embeddings.embed_query("alumbrado") == embeddings.embed_query("alumbrado")
+    assert inner.calls == 1
+    assert embeddings.cache.stats()["hit_ratio"] == 0.5
+
+
+def test_search_results_are_reused_until_the_generation_changes(pqrs_frame, services, monkeypatch):
+    data_service, rag_service = services
+    store = _Store()
+    data_service.publish(data_service.build_snapshot(pqrs_frame(20)))
+    data_service.attach_vectorstore(store)
+    monkeypatch.setattr(rag_service, "_initialized", True)
+
+    first = rag_service.semantic_search("hueco en la vía", limit=5, filters={"comuna_hecho": "Popular"})
+    again = rag_service.semantic_search("hueco  en la vía", limit=5, filters={"comuna_hecho": "Popular"})
+    assert store.searches == 1
+    assert [r["record"].numero_radicado_entrada for r in again] == \
+        [r["record"].numero_radicado_entrada for r in first] == ["1001"]
+
+    rag_service.semantic_search("hueco en la vía", limit=5)
+    assert store.searches == 2
+
+    data_service.attach_vectorstore(store)
+    rag_service.semantic_search("hueco en la vía", limit=5, filters={"comuna_hecho": "Popular"})
+    assert store.searches == 3
+    assert rag_service.get_cache_stats()["search_results"]["entries"] == 1
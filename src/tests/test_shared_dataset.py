@@ -0,0 +1,61 @@
+"""Tests for the memory-mapped Arrow store shared by the uvicorn workers."""
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow", exc_type=ImportError)
+
+from ..config import settings
+from ..services import data_service as data_service_module
+from ..services.data_service import DataService
+from ..services.frame_dtypes import compact_pqrs
+from ..services.shared_dataset import SharedDatasetStore
+
+
+def test_mapped_frames_match_the_written_ones(pqrs_frame, tmp_path):
+    """Mapped frames equal the built ones; only columns pandas cannot view over the map are converted."""
+    frames = {"pqrs": compact_pqrs(pqrs_frame(50)).assign(urgency_score=0.5), "personnel": None}
+    fingerprint = {"pqrs": [1, 1], "personnel": None}
+    store = SharedDatasetStore(str(tmp_path))
+    mapped = store.load_or_build(lambda: frames, fingerprint, details=lambda: {"rows": 50})
+
+    assert mapped["personnel"] is None
+    pd.testing.assert_frame_equal(mapped["pqrs"].astype(object), frames["pqrs"].astype(object))
+    for column in ("estado", "comuna_hecho"):
+        assert mapped["pqrs"][column].dtype == frames["pqrs"][column].dtype
+
+    # Category codes, numbers and dates without nulls are views of the read-only map
+    assert not mapped["pqrs"]["estado"].array.codes.flags.writeable
+    assert not mapped["pqrs"]["urgency_score"].to_numpy().flags.writeable
+    assert not mapped["pqrs"]["fecha_radicacion"].to_numpy().flags.writeable
+    assert store.status()["converted_columns"] == ["pqrs.comuna_hecho", "pqrs.fecha_vencimiento"]
+
+    # Another worker maps the same version without building it
+    other = SharedDatasetStore(str(tmp_path))
+    again = other.load_or_build(lambda: pytest.fail("rebuilt an unchanged version"), fingerprint)
+    pd.testing.assert_frame_equal(again["pqrs"], mapped["pqrs"])
+    assert other.details == {"rows": 50}
+
+
+def test_workers_share_scores_indexes_and_memory_report(pqrs_frame, tmp_path, monkeypatch):
+    """The first worker scores and indexes the PQRS once; the next one maps and unpickles them."""
+    pqrs_frame(40).to_excel(tmp_path / settings.pqrs_data_file, index=False)
+
+    def worker():
+        monkeypatch.setattr(data_service_module, "shared_store", SharedDatasetStore(str(tmp_path / "shared")))
+        service = DataService()
+        service.data_dir = tmp_path
+        snapshot, _ = service.load_snapshot()
+        return service, snapshot
+
+    first, built = worker()
+    monkeypatch.setattr(DataService, "_score_pqrs", lambda *args: pytest.fail("rescored a shared frame"))
+    monkeypatch.setattr(DataService, "_pqrs_indexes", lambda *args: pytest.fail("reindexed a shared frame"))
+    second, mapped = worker()
+
+    assert mapped.scored_at == built.scored_at
+    assert mapped.pqrs["urgency_score"].tolist() == built.pqrs["urgency_score"].tolist()
+    assert mapped.urgency_queue.top(5) == built.urgency_queue.top(5)
+    assert mapped.cube.total({"estado": "activo"}) == built.cube.total({"estado": "activo"})
+    assert mapped.radicado_positions == built.radicado_positions
+    assert second.get_memory_report() == first.get_memory_report() != {}
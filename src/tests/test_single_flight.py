@@ -0,0 +1,43 @@
+"""Concurrency test for coalescing identical requests."""
+
+import asyncio
+import threading
+import time
+
+import httpx
+
+from ..main import app
+from ..agents.query_agent import query_agent
+from ..services.single_flight import single_flight
+
+
+def test_burst_of_identical_searches_runs_one_computation(monkeypatch):
+    """100 concurrent identical search requests wait on one computation and all get its result."""
+    calls = []
+    lock = threading.Lock()
+    shared_before = single_flight.shared
+
+    def process_query(query, query_type="semantic", filters=None, limit=10, collapse_duplicates=False):
+        with lock:
+            calls.append(query)
+        # Hold the computation until the other 99 requests have joined it
+        deadline = time.monotonic() + 5
+        while single_flight.shared - shared_before < 99 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return {"agent": "query_agent", "query": query, "results": [], "total_found": 0}
+
+    monkeypatch.setattr(query_agent, "process_query", process_query)
+
+    async def burst():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*[
+                client.get("/api/query/search-content", params={"q": "hueco en la vía", "limit": 5})
+                for _ in range(100)
+            ])
+
+    responses = asyncio.run(burst())
+
+    assert len(calls) == 1
+    assert all(r.status_code == 200 and r.json()["query"] == "hueco en la vía" for r in responses)
+    assert single_flight.stats()["in_flight"] == 0
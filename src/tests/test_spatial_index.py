@@ -0,0 +1,53 @@
+"""Tests for the KD-tree zone index against brute-force search."""
+
+import numpy as np
+
+from ..models.pqrs import ZoneRecord
+from ..services.geo import ZoneLocator, haversine_km
+from ..services.spatial_index import KDTree, ZoneSpatialIndex
+
+
+def test_kd_tree_matches_brute_force_with_a_predicate():
+    rng = np.random.default_rng(1)
+    points = rng.uniform(0, 100, (300, 2))
+    tree = KDTree(points)
+
+    for target in rng.uniform(0, 100, (50, 2)):
+        accepted = lambda i: i % 3 != 0
+        matches = tree.query(tuple(target), k=7, accept=accepted)
+
+        distances = np.hypot(*(points - target).T)
+        expected = [i for i in np.argsort(distances) if accepted(i)][:7]
+        assert [i for _, i in matches] == expected
+        assert np.allclose([d for d, _ in matches], distances[expected])
+
+
+def test_nearest_zones_match_a_haversine_search_over_zones_with_capacity():
+    rng = np.random.default_rng(2)
+    zones = [
+        ZoneRecord(name=f"Barrio {i}", code=str(i), commune=f"Comuna {i}",
+                   latitude=6.25 + rng.uniform(-0.08, 0.08), longitude=-75.57 + rng.uniform(-0.08, 0.08))
+        for i in range(60)
+    ]
+    capacity = {f"comuna {i}": {"personnel": int(rng.integers(0, 3)), "vehicles": int(rng.integers(0, 2))}
+                for i in range(60)}
+    index = ZoneSpatialIndex()
+    index.build(ZoneLocator(zones), lambda zone: capacity.get(zone, {}))
+
+    for zone in zones:
+        for resource in ("personnel", "vehicles"):
+            found = index.nearest_zones(zone.commune, k=4, resource=resource)
+
+            brute = sorted(
+                (haversine_km(zone.latitude, zone.longitude, other.latitude, other.longitude), other.commune)
+                for other in zones
+                if other is not zone and capacity[other.commune.lower()][resource] > 0
+            )[:4]
+            assert [z["zone"] for z in found] == [name for _, name in brute]
+            assert [z["distance_km"] for z in found] == [round(d, 3) for d, _ in brute]
+            assert all(z["available"] > 0 for z in found)
+
+    # Capacity is read live, without rebuilding the tree
+    nearest = index.nearest_zones("Comuna 0", k=1)[0]["zone"]
+    capacity[nearest.lower()]["personnel"] = 0
+    assert index.nearest_zones("Comuna 0", k=1)[0]["zone"] != nearest
@@ -0,0 +1,123 @@
+"""Parity tests between the in-memory and SQLite storage backends."""
+
+import multiprocessing
+import sqlite3
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from ..services.data_service import DataService
+from ..services.storage import PandasBackend, SQLiteBackend
+
+
+def test_sqlite_backend_matches_pandas(pqrs_frame, tmp_path):
+    """Filters, ordering, limits and aggregates give the same answers on both backends."""
+    snapshot = DataService().build_snapshot(pqrs_frame())
+    memory, sqlite = PandasBackend(), SQLiteBackend(str(tmp_path / "store.db"))
+    sqlite.publish(snapshot)
+
+    cases = [
+        ({}, None, None),
+        ({"estado": "activo"}, None, None),
+        ({"estado": ["activo", "en_tramite"], "comuna_hecho": "Belén"}, 5, "-urgency_score"),
+        ({"numero_radicado_entrada": ["1003", 1010.0, "9999"]}, None, None),
+        ({"overdue": True, "estado": "activo"}, 20, "fecha_vencimiento"),
+        ({"fecha_radicacion_from": (datetime.now() - timedelta(days=30)).date().isoformat()}, None, "-fecha_radicacion"),
+        ({"due_within_days": 7}, None, None),
+    ]
+    for filters, limit, order_by in cases:
+        expected = memory.select(snapshot, dict(filters), limit, order_by)
+        got = sqlite.select(snapshot, dict(filters), limit, order_by)
+        assert got["numero_radicado_entrada"].tolist() == \
+            expected["numero_radicado_entrada"].map(lambda v: str(int(v))).tolist(), filters
+        assert sqlite.count(snapshot, dict(filters)) == memory.count(snapshot, dict(filters))
+
+    for group_by, filters in [(["estado"], None), (["comuna_hecho", "ano"], {"estado": "activo"}), ([], {"mes": 3})]:
+        key = lambda groups: sorted(groups, key=repr)
+        assert key(sqlite.aggregate(snapshot, group_by, filters)) == key(memory.aggregate(snapshot, group_by, filters))
+
+
+def test_sqlite_backend_rewrites_only_changed_rows(pqrs_frame, tmp_path):
+    """An upserted generation is stored by replacing just its changed rows."""
+    service = DataService()
+    service.storage = SQLiteBackend(str(tmp_path / "store.db"))
+    service.publish(service.build_snapshot(pqrs_frame(50)))
+
+    snapshot, summary = service.upsert_pqrs(pd.DataFrame([
+        {"numero_radicado_entrada": "1001", "estado": "cerrado"},
+        {"numero_radicado_entrada": "2000", "estado": "activo", "comuna_hecho": "Popular"},
+    ]))
+    service.publish(snapshot, changed_radicados=summary["radicados"])
+
+    assert service.storage.serves(service.snapshot)
+    assert service.count_pqrs() == 51
+    assert service.get_pqrs_by_radicado("1001").estado == "cerrado"
+    assert service.get_pqrs_records({"comuna_hecho": "Popular"}, order_by="-numero_radicado_entrada",
+                                    limit=1)[0].numero_radicado_entrada == "2000"
+
+
+def _publish_rounds(path: str, frame: pd.DataFrame, rounds: int):
+    """Worker process: publish full and upserted generations, checking every read against its own frames."""
+    service = DataService()
+    service.storage = SQLiteBackend(path)
+    for round in range(rounds):
+        if round % 2:
+            snapshot, summary = service.upsert_pqrs(pd.DataFrame([
+                {"numero_radicado_entrada": str(5000 + round), "estado": "activo", "comuna_hecho": "Popular"}]))
+            service.publish(snapshot, changed_radicados=summary["radicados"])
+        else:
+            service.publish(service.build_snapshot(frame))
+        assert service.storage.generation == service.snapshot.generation
+
+        expected = PandasBackend().select(service.snapshot, {"estado": "activo"}, order_by="fecha_vencimiento")
+        got = service.storage.select(service.snapshot, {"estado": "activo"}, order_by="fecha_vencimiento")
+        radicados = lambda df: df["numero_radicado_entrada"].map(lambda v: str(int(float(v)))).tolist()
+        assert radicados(got) == radicados(expected)
+        assert service.count_pqrs() == len(service.snapshot.pqrs)
+
+
+def test_sqlite_backend_is_shared_safely_by_worker_processes(pqrs_frame, tmp_path):
+    """Workers publishing different data to one file never read each other's rows or corrupt it."""
+    path = str(tmp_path / "store.db")
+    sizes = (40, 50, 60)
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_publish_rounds, args=(path, pqrs_frame(size), 8)) for size in sizes]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(120)
+    assert [worker.exitcode for worker in workers] == [0, 0, 0]
+
+    conn = sqlite3.connect(path)
+    assert conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+    # The last round upserted one row on top of a worker's frame
+    assert conn.execute("SELECT COUNT(*) FROM pqrs").fetchone()[0] in {size + 1 for size in sizes}
+    assert [name for name, _ in conn.execute("SELECT name, content FROM _contents")] == ["pqrs"]
+
+
+def test_sqlite_workers_with_the_same_frames_share_the_tables(pqrs_frame, tmp_path, monkeypatch):
+    """A worker whose frames are already stored writes nothing and reads from SQL until the data diverges."""
+    path = str(tmp_path / "store.db")
+    first, second = DataService(), DataService()
+    first.storage, second.storage = SQLiteBackend(path), SQLiteBackend(path)
+    built = first.build_snapshot(pqrs_frame(30))
+    first.publish(built)
+
+    writes = []
+    monkeypatch.setattr(second.storage, "_write_table", lambda conn, table, *args: writes.append(table))
+    # The same scored frame, as every worker maps it from the shared dataset store
+    second.publish(second.build_snapshot(built.pqrs, scored_at=built.scored_at))
+    assert writes == []
+    assert first.storage.status()["rows"] == second.storage.status()["rows"] == {"pqrs": 30}
+
+    delta = pd.DataFrame([{"numero_radicado_entrada": "5000", "estado": "cerrado"}])
+    snapshot, summary = first.upsert_pqrs(delta)
+    first.publish(snapshot, changed_radicados=summary["radicados"])
+    assert second.storage.status()["pqrs_stored_by_other_process"]
+    assert (first.count_pqrs(), second.count_pqrs()) == (31, 30)
+
+    # Applying the same upsert makes the tables the second worker's again, without writing them
+    snapshot, summary = second.upsert_pqrs(delta)
+    second.publish(snapshot, changed_radicados=summary["radicados"])
+    assert writes == []
+    assert second.storage.status()["rows"] == {"pqrs": 31}
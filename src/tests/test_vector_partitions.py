@@ -0,0 +1,45 @@
+"""Tests for the vector index partitioned by comuna."""
+
+from langchain.docstore.document import Document
+from langchain_community.embeddings import DeterministicFakeEmbedding
+
+from ..services.vector_partitions import PartitionedVectorStore
+
+
+def _documents():
+    comunas = ["Popular", "Belén", "La Candelaria", None]
+    return [Document(page_content=f"Asunto: hueco {i}", metadata={"radicado": str(i), "comuna": comunas[i % 4]})
+            for i in range(40)]
+
+
+def test_comuna_filters_route_to_their_shards(tmp_path):
+    """Filtered searches only open the matching shards; unfiltered ones merge every shard's top-k."""
+    store = PartitionedVectorStore("pqrs_test", "comuna_hecho", str(tmp_path), DeterministicFakeEmbedding(size=16))
+    store.add_documents(_documents())
+
+    assert store.partitions == ["belen", "la-candelaria", "none", "popular"]
+    assert store.partitions_for({"comuna_hecho": ["BELÉN", "Popular"]}) == ["belen", "popular"]
+
+    scoped = store.similarity_search("Asunto: hueco 5", k=3, filters={"comuna_hecho": "Belén"})
+    assert {doc.metadata["comuna"] for doc in scoped} == {"Belén"}
+    assert scoped[0].metadata["radicado"] == "5"
+
+    merged = store.similarity_search_with_score("Asunto: hueco 6", k=5)
+    assert merged[0][0].metadata["radicado"] == "6"
+    assert [score for _, score in merged] == sorted(score for _, score in merged)
+
+
+def test_shard_rebuild_swaps_one_collection(tmp_path):
+    """A rebuilt shard replaces only its own collection and is found again on reopen."""
+    embeddings = DeterministicFakeEmbedding(size=16)
+    store = PartitionedVectorStore("pqrs_test", "comuna_hecho", str(tmp_path), embeddings)
+    store.add_documents(_documents())
+
+    rebuilt = [Document(page_content="Asunto: poste", metadata={"radicado": "99", "comuna": "Popular"})]
+    assert store.rebuild_partition("popular", [rebuilt]) == 1
+    assert store.count() == 31
+
+    reopened = PartitionedVectorStore("pqrs_test", "comuna_hecho", str(tmp_path), embeddings)
+    assert reopened.count() == 31
+    assert [doc.metadata["radicado"] for doc in
+            reopened.similarity_search("Asunto: poste", k=5, filters={"comuna_hecho": "popular"})] == ["99"]
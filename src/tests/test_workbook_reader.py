@@ -0,0 +1,31 @@
+"""Tests for the streaming workbook reader."""
+
+from datetime import datetime
+
+import pandas as pd
+
+from ..services.workbook_reader import read_workbook, read_workbooks
+
+
+def test_streaming_read_matches_read_excel(tmp_path):
+    """Same columns, dtypes and values as ``pd.read_excel``; projection keeps only the asked columns."""
+    path = tmp_path / "data-pqrs.xlsx"
+    pd.DataFrame({
+        " Numero_Radicado_Entrada": ["2024001", 2024002, "2024003"],
+        "ESTADO": ["activo", None, "cerrado"],
+        "ano": [2024, None, 2025],
+        "fecha_radicacion": [datetime(2024, 1, 2), datetime(2024, 3, 4), None],
+        "observaciones": ["a", "b", "c"],
+    }).to_excel(path, index=False)
+
+    expected = pd.read_excel(path)
+    expected.columns = expected.columns.str.strip().str.lower()
+    frame, seconds = read_workbook(str(path))
+    pd.testing.assert_frame_equal(frame, expected)
+    assert seconds > 0
+
+    projected, _ = read_workbook(str(path), ["numero_radicado_entrada", "estado", "no_such_column"])
+    assert list(projected.columns) == ["numero_radicado_entrada", "estado"]
+
+    results = read_workbooks({"pqrs": (str(path), None), "missing": (str(tmp_path / "none.xlsx"), None)}, 2)
+    assert len(results["pqrs"][0]) == 3 and results["missing"] == (None, 0.0)